@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Active-set engine: only the cells that changed at the previous generation and their 8 neighbours are evaluated. The
+neighbour counts are kept from one generation to the next and updated from the changes, instead of being rebuilt by
+get_neighbour at every generation.
+"""
+from Engine_GoL import configuration, get_neighbour, rule_table
+
+
+class ActiveGrid(object):
+    """
+    Grid of states stepped by only looking at the cells around the last changes. The grid of states is modified in
+    place, so the list given to the constructor always holds the current generation.
+    """
+
+    def __init__(self, grid, hybridization=False):
+        """
+        :param grid: 2D list containing the states of the cells. It is modified in place at each step.
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        """
+        self.grid = grid
+        self.hybridization = hybridization
+        self.changes = []
+        # List of (row, column, new state) tuples for the cells changed by the last step.
+        self.reset()
+
+    def reset(self):
+        """
+        Rebuilds the neighbour counts from the grid and marks every cell as active. Must be called if the grid is
+        modified from outside; it is called automatically when the rules or the hybridization mode change.
+        """
+        self.count_neigh = get_neighbour(self.grid)
+        self.table = rule_table()
+        # Compiled rules, used to detect changes made in the Settings window during a simulation.
+        self.active = set((i, j) for i in range(len(self.grid)) for j in range(len(self.grid[i])))
+        self.counts = [0] * len(configuration["colors"])
+        for row in self.grid:
+            for color in range(1, len(configuration["colors"])):
+                self.counts[color] += row.count(color)
+        # Number of cells of each color, updated from the changes at each step.
+
+    def step(self, hybridization=None):
+        """
+        Computes the next generation. Only the active cells are evaluated, then the neighbour counts around each cell
+        that changed are updated and those cells become the active set of the next step.
+        :param hybridization: New hybridization mode. If None, the current one is kept.
+        :return: The grid of states, modified in place.
+        """
+        if hybridization is not None and hybridization != self.hybridization:
+            self.hybridization = hybridization
+            self.reset()
+        if self.table is not rule_table():
+            self.reset()
+        table = self.table
+        grid = self.grid
+        count_neigh = self.count_neigh
+        to_check = set()
+        for (i, j) in self.active:
+            # Only the changed cells and their neighbours can change at the next generation.
+            for x in range(i - 1, i + 2):
+                if 0 <= x < len(grid):
+                    for y in range(j - 1, j + 2):
+                        if 0 <= y < len(grid[x]):
+                            to_check.add((x, y))
+        self.changes = []
+        for (i, j) in to_check:
+            new_state = table.next_state(grid[i][j], count_neigh[i][j], self.hybridization)
+            if new_state != grid[i][j]:
+                self.changes.append((i, j, new_state))
+        # All the new states are computed before any modification, since they depend on the current generation.
+        self.active = set()
+        for (i, j, new_state) in self.changes:
+            old_state = grid[i][j]
+            grid[i][j] = new_state
+            self.counts[old_state] -= 1
+            self.counts[new_state] += 1
+            self.active.add((i, j))
+            for x in range(i - 1, i + 2):
+                if 0 <= x < len(grid):
+                    for y in range(j - 1, j + 2):
+                        if 0 <= y < len(grid[x]) and not (x == i and y == j):
+                            # The neighbours lose one neighbour of the old color and gain one of the new color.
+                            if old_state:
+                                count_neigh[x][y][old_state] -= 1
+                            if new_state:
+                                count_neigh[x][y][new_state] += 1
+        self.counts[0] = 0
+        return grid
+
+    def population(self):
+        """
+        :return: List of the number of cells of each color (index 0 is left to 0), maintained from the changes.
+        """
+        return list(self.counts)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Array engine: the same rules as get_neighbour and process_changes, computed on whole NumPy arrays instead of cell by
+cell. NumPy is optional; numpy_available tells if this engine can be used.
+"""
+try:
+    import numpy as np
+    numpy_available = True
+except ImportError:
+    np = None
+    numpy_available = False
+from Engine_GoL import configuration, rule_table
+
+
+def to_array(grid):
+    """
+    Converts a grid of states into a 2D NumPy array.
+    :param grid: A 2D list (or array) of states.
+    :return: A 2D array of small unsigned integers, one per cell.
+    """
+    return np.array(grid, dtype=np.uint8)
+
+
+def get_neighbour_array(state):
+    """
+    Array version of get_neighbour. The grid is padded with a border of dead cells, so that the 8 shifted views of each
+    color plane can simply be summed; cells outside the grid are considered dead, as in get_neighbour.
+    :param state: A 2D list or array containing the states of the cells.
+    :return: An array of shape (number of colors, rows, columns). count[x][i][j] is the number of neighbours of color x
+    around the cell [i][j] (the same values as count_neigh[i][j][x] in get_neighbour).
+    """
+    state = np.asarray(state, dtype=np.uint8)
+    rows, columns = state.shape
+    padded = np.zeros((rows + 2, columns + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = state
+    count_neigh = np.zeros((len(configuration["colors"]), rows, columns), dtype=np.uint8)
+    for color in range(1, len(configuration["colors"])):
+        # Color 0 (dead cells) is never counted, as in get_neighbour.
+        plane = (padded == color).view(np.uint8)
+        for x in range(0, 3):
+            for y in range(0, 3):
+                if not (x == 1 and y == 1):
+                    # The plane shifted by (x - 1, y - 1) gives the state of that neighbour for every cell at once.
+                    count_neigh[color] += plane[x:x + rows, y:y + columns]
+    return count_neigh
+
+
+def counts_in(count, runs):
+    """
+    :param count: Array of neighbour counts of one color.
+    :param runs: List of (lowest, highest) ranges of counts, see count_runs.
+    :return: A boolean array of the cells whose count is in one of the ranges. Comparing ranges is faster than
+    indexing a lookup table with the whole array.
+    """
+    mask = np.zeros(count.shape, dtype=bool)
+    for low, high in runs:
+        if low == high:
+            mask |= count == low
+        else:
+            mask |= (low <= count) & (count <= high)
+    return mask
+
+
+def process_changes_array(count_neigh, grid, hybridization=False):
+    """
+    Array version of process_changes. The rules of birth and survival are evaluated as boolean masks for each color,
+    from the ranges of neighbour counts compiled in the RuleTable, then the masks are applied in increasing color order
+    so that the last color wins, exactly like the loop over indexes in process_changes.
+    :param count_neigh: Array of neighbour counts obtained with get_neighbour_array.
+    :param grid: A 2D list or array containing the states of the cells.
+    :param hybridization: If True, a cell that can become both colors x and x-2 (x > 2) becomes x-1.
+    :return: A new 2D array containing the states of the next generation.
+    """
+    grid = np.asarray(grid, dtype=np.uint8)
+    table = rule_table()
+    result_neighbor = np.zeros(count_neigh.shape, dtype=bool)
+    for x in range(1, len(configuration["colors"])):
+        same_color = grid == x
+        born = ~same_color & counts_in(count_neigh[x], table.birth_runs[x])
+        survive = same_color & counts_in(count_neigh[x], table.survival_runs[x])
+        result_neighbor[x] = born | survive
+    new_grid = np.zeros(grid.shape, dtype=np.uint8)
+    # Cells for which no color is possible die/stay empty.
+    for index in range(1, len(configuration["colors"])):
+        new_grid[result_neighbor[index]] = index
+        if hybridization and index > 2:
+            new_grid[result_neighbor[index] & result_neighbor[index - 2]] = index - 1
+    return new_grid
+
+
+def array_changes(before, after):
+    """
+    Lists the cells that differ between two arrays of states.
+    :param before: 2D array of the states before.
+    :param after: 2D array of the states after.
+    :return: List of (row, column, new state) tuples.
+    """
+    rows, columns = np.nonzero(before != after)
+    return list(zip(rows.tolist(), columns.tolist(), after[rows, columns].tolist()))
+
+
+def array_population(grid, n_colors):
+    """
+    Counts the cells of each color in an array of states.
+    :param grid: 2D array of states.
+    :param n_colors: Number of colors (including white).
+    :return: List of the number of cells of each color, index 0 (white) being left to 0.
+    """
+    counts = np.bincount(grid.ravel(), minlength=n_colors).tolist()
+    counts[0] = 0
+    return counts
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Command line runner, for simulations without a display. It does not import tkinter.
+
+Example: python Batch_GoL.py Canon -n 1000 --engine auto
+runs 1000 generations of the seed "Canon" from the seed library and writes the population of each color in data.txt.
+
+Example: python Batch_GoL.py --random --size 500 --density 0.05 --random-seed 42 -n 1000
+runs a random board of 500 X 500 cells, 5% of which are alive, which is generated again with the same --random-seed.
+
+Example: python Batch_GoL.py Canon -n 1000000 --checkpoint run.ckp
+saves the simulation in run.ckp every 1000 generations. After an interruption, python Batch_GoL.py --resume run.ckp
+-n 1000000 continues it from the last checkpoint, and continues its population table.
+
+Example: python Batch_GoL.py Canon -n 200 --export canon.gif --export-scale 4
+also draws every generation into an animated GIF, with 4 X 4 pixels per cell (see Export_GoL).
+"""
+import argparse
+import sys
+from os import getcwd
+from os.path import join
+from Engine_GoL import configuration, compile_rules, generate_empty_grid
+from Simulation_GoL import Simulation, engine_names
+from Population_GoL import PopulationWriter
+from Series_GoL import SeriesWriter
+from Seeds_GoL import SeedStore, read_seed_file
+from Rle_GoL import read_rle
+from Metrics_GoL import PhaseTimer, clock
+from Random_GoL import random_fill, parse_densities
+from Checkpoint_GoL import Checkpoint, write_checkpoint
+from Export_GoL import FrameExporter
+
+
+def load_seed(name=None, seeds_path=None, seed_path=None):
+    """
+    Loads a seed, either by name from the seed library or a file of seeds (like seeds.txt), or from a file containing
+    a single seed.
+    :param name: Name of the seed in the library or the file of seeds.
+    :param seeds_path: Path of a file of seeds. By default, the seed library of the current directory is used.
+    :param seed_path: Path of a file containing a single seed, i.e. a dictionary with "colors", "rules" and "seed".
+    :return: The seed dictionary.
+    """
+    if seed_path is not None:
+        return read_seed_file(seed_path)
+    if seeds_path is None:
+        seed_store = SeedStore(getcwd())
+        seeds_path = seed_store.index_path
+    else:
+        seed_store = read_seed_file(seeds_path)
+    if name not in seed_store:
+        raise KeyError("No seed called " + str(name) + " in " + seeds_path)
+    return seed_store[name]
+
+
+def run(seed, generations, output, engine="reference", hybridization=None, processes=None, binary=False,
+        cycles=None, metrics=None, checkpoint=None, checkpoint_every=1000, resume=None, export=None):
+    """
+    Runs a simulation and writes the population table, with the same format as the data.txt file of the interface.
+    :param seed: Seed dictionary with "colors", "rules" and "seed" (and optionally "hybrid").
+    :param generations: Number of iterations.
+    :param output: Path of the population table.
+    :param engine: Name of the engine.
+    :param hybridization: Hybridization mode. If None, the one of the seed is used (competition if it has none).
+    :param processes: Number of processes of the tiled engine.
+    :param binary: If True, the population table is written in the binary format of Series_GoL instead of text.
+    :param cycles: What to do when the grid comes back to an earlier generation: None does not look for cycles,
+    "report" only detects them (see Simulation.cycle), "stop" stops the table at the first repeated generation and
+    "extrapolate" writes the rest of the table from the populations of the cycle, without computing the generations.
+    :param metrics: Path of a metrics file (see Metrics_GoL) receiving the generations per second and the time of each
+    phase every second, or None.
+    :param checkpoint: Path of a checkpoint (see Checkpoint_GoL) in which the simulation is saved every
+    checkpoint_every generations, or None.
+    :param checkpoint_every: Number of generations between two checkpoints.
+    :param resume: Checkpoint from which the simulation continues, or None. The seed must be the one of the
+    checkpoint (Checkpoint.seed). If output is the population table of the checkpoint, it is continued.
+    :param export: FrameExporter receiving the grid of every generation, from the first one, or None. It is closed at
+    the end of the simulation, once all the frames are written.
+    :return: The Simulation object after the last computed generation.
+    """
+    if hybridization is None:
+        hybridization = seed.get("hybrid", False)
+    timer = PhaseTimer(metrics) if metrics is not None else None
+    position = None
+    if resume is not None:
+        simulation = resume.simulation(engine, processes, detect_cycles=cycles is not None, timer=timer)
+        simulation.hybridization = hybridization
+        if resume.log is not None and resume.log["path"] == output and resume.log["binary"] == binary:
+            position = resume.log["position"]
+            # The table is cut at the checkpoint, since the generations after it are computed again.
+    else:
+        configuration["colors"] = seed["colors"]
+        configuration["rules"] = seed["rules"]
+        compile_rules()
+        simulation = Simulation([list(row) for row in seed["seed"]], hybridization, engine, processes,
+                                detect_cycles=cycles is not None, timer=timer)
+    if binary:
+        population_log = SeriesWriter(output, configuration["colors"], configuration["rules"], hybridization,
+                                      simulation.generation + 1, position=position)
+    else:
+        population_log = PopulationWriter(output, configuration["colors"], position=position)
+    # A new table continuing a checkpoint starts at the iteration following it.
+    try:
+        if export is not None:
+            export.add(simulation.generation, simulation.to_grid())
+        for iteration in range(simulation.generation, generations):
+            if simulation.cycle() is not None and cycles in ("stop", "extrapolate"):
+                if cycles == "extrapolate":
+                    for later in range(iteration, generations):
+                        population_log.write(later + 1, simulation.cycles.population_at(later))
+                break
+            population = simulation.population()
+            if timer is not None:
+                start = clock()
+            population_log.write(iteration + 1, population)
+            # As in the interface, the line of iteration n contains the population before the n-th generation.
+            if timer is not None:
+                timer.add("log", start)
+            simulation.step()
+            if checkpoint is not None and simulation.generation % checkpoint_every == 0:
+                if timer is not None:
+                    start = clock()
+                write_checkpoint(checkpoint, simulation, population_log, output, seed.get("random"))
+                if timer is not None:
+                    timer.add("checkpoint", start)
+            if export is not None:
+                if timer is not None:
+                    start = clock()
+                export.add(simulation.generation, simulation.to_grid())
+                # Only copies the grid: the frame is drawn and written by the process of the exporter.
+                if timer is not None:
+                    timer.add("export", start)
+            if timer is not None:
+                timer.tick(simulation.generation)
+    finally:
+        population_log.close()
+        simulation.close()
+        if timer is not None:
+            timer.close()
+        if export is not None:
+            export.close()
+    return simulation
+
+
+def main(argv=None):
+    """
+    Entry point of the command line runner.
+    :param argv: List of the command line arguments. By default, sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Runs a Game of Life simulation without a display.")
+    parser.add_argument("seed", nargs="?", help="Name of the seed in the file of seeds.")
+    parser.add_argument("-n", "--generations", type=int, default=400, help="Number of iterations (default: 400).")
+    parser.add_argument("-s", "--seeds", help="File of seeds (default: the seed library of the current directory).")
+    parser.add_argument("-f", "--file", help="File containing a single seed, instead of a name.")
+    parser.add_argument("-r", "--rle", help="Pattern in RLE format, instead of a name.")
+    parser.add_argument("--size", type=int, help="Size of the grid in which the RLE pattern is centred (default: the "
+                                                 "size of the pattern), or of the random board (default: 100).")
+    parser.add_argument("--random", action="store_true", help="Fills the grid of the seed (or an empty grid of --size "
+                                                              "cells with the default colors) with random states.")
+    parser.add_argument("--random-seed", type=int, help="Seed of the random fill (default: a new one, which is "
+                                                        "printed so that the board can be generated again).")
+    parser.add_argument("--density", default="uniform", help="Densities of the random fill: uniform (every state is "
+                                                             "equally likely), one density shared by the colors, or "
+                                                             "one per color separated by commas.")
+    parser.add_argument("--area", help="Rectangle of the random fill: row,column,rows,columns (default: whole grid).")
+    parser.add_argument("-o", "--output", help="Population table (default: data.txt, or data.gol with --binary, in "
+                                                "the current directory).")
+    parser.add_argument("-b", "--binary", action="store_true", help="Writes the population table in binary format.")
+    parser.add_argument("-e", "--engine", choices=engine_names,
+                        help="Engine computing the generations (default: auto, the fastest engine giving the same "
+                             "grids as the reference engine, or the engine of the checkpoint with --resume). Hashlife "
+                             "and sparse simulate an unbounded plane, and are only used when asked for; hashlife-auto "
+                             "switches to hashlife for single color seeds.")
+    parser.add_argument("-p", "--processes", type=int, help="Number of processes of the tiled engine.")
+    parser.add_argument("-c", "--cycles", choices=["report", "stop", "extrapolate"],
+                        help="Detects when the grid repeats an earlier generation and reports the cycle; stop: ends "
+                             "the table there; extrapolate: writes the rest of the table without computing it.")
+    parser.add_argument("--checkpoint", help="Checkpoint in which the simulation is saved regularly, to be continued "
+                                             "with --resume after an interruption.")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="Number of generations between two "
+                                                                            "checkpoints (default: 1000).")
+    parser.add_argument("--resume", help="Checkpoint from which the simulation continues, instead of a seed. It goes "
+                                         "on with the engine, population table and checkpoint of the checkpoint, "
+                                         "unless they are given.")
+    parser.add_argument("--export", help="Draws the generations into PNG images (.png, numbered after the "
+                                         "generation), an animated GIF (.gif) or a frame stack (other extensions).")
+    parser.add_argument("--export-every", type=int, default=1, help="Number of generations between two exported "
+                                                                    "frames (default: 1).")
+    parser.add_argument("--export-scale", type=int, default=1, help="Number of pixels per cell of the exported "
+                                                                    "frames (default: 1).")
+    parser.add_argument("--export-delay", type=int, default=100, help="Time between two frames of the GIF, in "
+                                                                      "milliseconds (default: 100).")
+    parser.add_argument("-m", "--metrics", help="Metrics file receiving the generations per second and the time of "
+                                                "each phase every second, as JSON lines.")
+    hybrid = parser.add_mutually_exclusive_group()
+    hybrid.add_argument("--hybrid", dest="hybrid", action="store_true", default=None, help="Colors hybridize.")
+    hybrid.add_argument("--compete", dest="hybrid", action="store_false", help="Colors compete.")
+    args = parser.parse_args(argv)
+    if args.seed is None and args.file is None and args.rle is None and not args.random and args.resume is None:
+        parser.error("a seed name, --file, --rle, --random or --resume is required")
+    if args.checkpoint_every < 1:
+        parser.error("--checkpoint-every must be at least 1")
+    if args.export_every < 1 or args.export_scale < 1:
+        parser.error("--export-every and --export-scale must be at least 1")
+    resume = None
+    try:
+        if args.resume is not None:
+            resume = Checkpoint(args.resume)
+            seed = resume.seed()
+            if resume.log is not None and args.output is None:
+                args.output = resume.log["path"]
+                args.binary = resume.log["binary"]
+            print("Resuming from generation %d." % resume.generation)
+        elif args.rle is not None:
+            seed = read_rle(args.rle, args.size)
+        elif args.seed is None and args.file is None:
+            seed = {"colors": configuration["colors"], "rules": configuration["rules"],
+                    "seed": generate_empty_grid(args.size or 100)}
+        else:
+            seed = load_seed(args.seed, args.seeds, args.file)
+        if args.random:
+            area = [int(value) for value in args.area.split(",")] if args.area else None
+            if area is not None and len(area) != 4:
+                raise ValueError("--area is written row,column,rows,columns")
+            info = random_fill(seed["seed"], args.random_seed, parse_densities(args.density, len(seed["colors"])),
+                               area)
+            print("Random fill: --random-seed %d --density %s%s" % (info["seed"], ",".join(
+                repr(density) for density in info["densities"]), " --area " + args.area if args.area else ""))
+            seed["random"] = info
+            # The random seed is recorded, so that an interesting board can be generated again.
+    except (IOError, KeyError, ValueError, SyntaxError) as error:
+        parser.error(str(error))
+    if args.output is None:
+        args.output = join(getcwd(), "data.gol" if args.binary else "data.txt")
+    if args.engine is None:
+        args.engine = "auto" if resume is None else resume.engine
+    if args.checkpoint is None and resume is not None:
+        args.checkpoint = args.resume
+        # A resumed simulation goes on saving itself in the same checkpoint.
+    export = None
+    try:
+        if args.export is not None:
+            export = FrameExporter(args.export, seed["colors"], len(seed["seed"]), args.export_scale,
+                                   args.export_every, args.export_delay / 1000.0)
+        simulation = run(seed, args.generations, args.output, args.engine, args.hybrid, args.processes, args.binary,
+                         args.cycles, args.metrics, args.checkpoint, args.checkpoint_every, resume, export)
+    except (IOError, ValueError) as error:
+        parser.error(str(error))
+    finally:
+        if resume is not None:
+            resume.close()
+    if args.cycles is not None:
+        if simulation.cycle() is None:
+            print("No cycle found in %d generations." % simulation.generation)
+        else:
+            print("Cycle of period %d from generation %d (line %d of the table)." %
+                  (simulation.cycle()[1], simulation.cycle()[0], simulation.cycle()[0] + 1))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the engines and of the seed library, without a display. Each case (a grid, a number of colors, a
+hybridization mode and an engine) is run for a given time, and the number of generations per second, the time spent in
+each phase of a generation and the peak memory are measured. The results are saved as JSON, so that the results of two
+versions can be compared with --compare.
+
+Phases (see Metrics_GoL): "neighbour" and "rules" (the two functions of the reference and array engines), "step" (a
+whole generation, for the other engines), "population" (counting the cells of each color, as written in data.txt) and
+"changes" (listing the changed cells, from which the canvas is redrawn). Drawing on the canvas itself requires a
+display and is not measured.
+
+Example: python Bench_GoL.py --sizes 50,200,500 --colors 2,4 --engines reference,array -o bench.json
+         python Bench_GoL.py --full -o after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from os.path import dirname, join, abspath
+from Engine_GoL import configuration, color_list
+from Array_GoL import numpy_available
+from Simulation_GoL import Simulation, engine_names
+from Metrics_GoL import PhaseTimer, clock, phase_names
+from Seeds_GoL import SeedStore, read_seed_file
+from Random_GoL import random_grid
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+full_sizes = [50, 100, 200, 500, 1000, 2000]
+full_colors = [2, 3, 4, 8, len(color_list)]
+random_density = 0.3
+# Proportion of non-empty cells of the random grids, shared equally by the colors. The random seed is fixed, so that
+# every run benchmarks the same grids.
+
+
+def make_cases(sizes, colors, hybrids, engines, sources, seeds):
+    """
+    :return: Iterator of (description, seed dictionary, hybridization, engine) tuples, the description being a
+    dictionary identifying the case in the results.
+    """
+    for source in sources:
+        if source == "random":
+            grids = [({"source": "random", "size": size, "colors": n_colors},
+                      {"colors": list(color_list[0:n_colors]), "rules": None, "size": size})
+                     for size in sizes for n_colors in colors]
+        else:
+            grids = [({"source": name, "size": len(seeds[name]["seed"]), "colors": len(seeds[name]["colors"])},
+                      seeds[name]) for name in sorted(seeds)]
+        for description, seed in grids:
+            for hybridization in hybrids:
+                for engine in engines:
+                    case = dict(description)
+                    case["hybrid"] = hybridization
+                    case["engine"] = engine
+                    yield case, seed, hybridization, engine
+
+
+def case_key(case):
+    """
+    :return: The string identifying a case, used to compare results.
+    """
+    return "%s %d %d %s %s" % (case["source"], case["size"], case["colors"], "H" if case["hybrid"] else "C",
+                               case["engine"])
+
+
+def prepare(seed):
+    """
+    Sets the configuration for a seed and returns a copy of its grid.
+    """
+    configuration["colors"] = seed["colors"]
+    configuration["rules"] = seed["rules"] or [{"born": 3, "lower": 2, "upper": 3} for _ in seed["colors"]]
+    if "seed" in seed:
+        return [list(row) for row in seed["seed"]]
+    n_colors = len(seed["colors"])
+    return random_grid(seed["size"], n_colors, 0, [random_density / (n_colors - 1)] * (n_colors - 1))[0]
+
+
+def bench_case(seed, hybridization, engine, seconds, max_generations, memory=True):
+    """
+    Runs a case for at least one generation and until seconds or max_generations are reached.
+    :return: Dictionary with the engine used (engines that cannot be used fall back to the reference engine), the
+    number of generations, the time, the generations per second, the time per generation
+    of each phase (in seconds) and the peak memory (in bytes, None if it is not measured).
+    """
+    grid = prepare(seed)
+    timer = PhaseTimer(every=float("inf"))
+    simulation = Simulation(grid, hybridization, engine, track_changes=True, timer=timer)
+    generations = 0
+    start = clock()
+    try:
+        while generations < max_generations and (not generations or clock() - start < seconds):
+            simulation.step()
+            simulation.population()
+            timer.tick(simulation.generation)
+            generations += 1
+        elapsed = clock() - start
+        timer.close()
+    finally:
+        simulation.close()
+    peak = None
+    if memory and tracemalloc is not None:
+        grid = prepare(seed)
+        tracemalloc.start()
+        simulation = Simulation(grid, hybridization, engine, track_changes=True)
+        try:
+            for _ in range(2):
+                simulation.step()
+                simulation.population()
+            peak = tracemalloc.get_traced_memory()[1]
+            # Python objects and NumPy arrays only; the memory of the worker processes of the tiled engine is not
+            # included.
+        finally:
+            tracemalloc.stop()
+            simulation.close()
+    return {"engine_used": simulation.engine, "generations": generations, "seconds": elapsed,
+            "gens_per_sec": generations / elapsed,
+            "phases": dict((name, timer.totals[name] / generations) for name in timer.totals),
+            "peak_memory": peak}
+
+
+def bench_seeds(seeds_path, repeat=20):
+    """
+    Benchmarks the seed library against the former seeds.txt dictionary, in a temporary directory.
+    :param seeds_path: File of seeds in the original format, copied as seeds.txt.
+    :param repeat: Number of times each operation is repeated.
+    :return: Dictionary of the time of each operation, in seconds.
+    """
+    directory = tempfile.mkdtemp()
+    results = {}
+    try:
+        shutil.copy(seeds_path, join(directory, "seeds.txt"))
+        shutil.copy(seeds_path, join(directory, "default.txt"))
+        seeds = read_seed_file(join(directory, "seeds.txt"))
+        names = sorted(seeds)
+        start = clock()
+        for _ in range(repeat):
+            read_seed_file(join(directory, "seeds.txt"))
+        results["text_load"] = (clock() - start) / repeat
+        start = clock()
+        for _ in range(repeat):
+            with open(join(directory, "text.txt"), "w") as seed_file:
+                seed_file.write(str(seeds))
+        results["text_save"] = (clock() - start) / repeat
+        # Former load_seeds and write_file, which read and wrote the whole dictionary at each operation.
+        start = clock()
+        store = SeedStore(directory)
+        results["library_migrate"] = clock() - start
+        start = clock()
+        for _ in range(repeat):
+            store = SeedStore(directory)
+        results["library_open"] = (clock() - start) / repeat
+        start = clock()
+        for _ in range(repeat):
+            for name in names:
+                store[name]
+        results["library_import"] = (clock() - start) / (repeat * len(names))
+        start = clock()
+        for _ in range(repeat):
+            store["AutoSave"] = seeds[names[0]]
+        results["library_save"] = (clock() - start) / repeat
+        start = clock()
+        for k in range(repeat):
+            store["Bench" + str(k)] = seeds[names[0]]
+            del store["Bench" + str(k)]
+        results["library_save_remove"] = (clock() - start) / repeat
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def compare(old, new):
+    """
+    Prints the generations per second of the cases of two results, and their ratio.
+    """
+    old_cases = dict((case_key(case), case) for case in old["cases"])
+    for case in new["cases"]:
+        key = case_key(case)
+        if key in old_cases:
+            ratio = case["gens_per_sec"] / old_cases[key]["gens_per_sec"]
+            print("%-45s %12.2f %12.2f %7.2fx" % (key, old_cases[key]["gens_per_sec"], case["gens_per_sec"], ratio))
+    for name in sorted(new.get("seeds", {})):
+        if name in old.get("seeds", {}):
+            print("%-45s %12.6f %12.6f %7.2fx" % ("seeds " + name, old["seeds"][name], new["seeds"][name],
+                                                   old["seeds"][name] / new["seeds"][name]))
+
+
+def main(argv=None):
+    """
+    Entry point of the benchmarks.
+    :param argv: List of the command line arguments. By default, sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the engines and the seed library without a display.")
+    parser.add_argument("--sizes", default="50,200,500", help="Sizes of the random grids (default: 50,200,500).")
+    parser.add_argument("--colors", default="2,4", help="Numbers of colors, including white (default: 2,4).")
+    parser.add_argument("--hybrid", choices=["off", "on", "both"], default="both", help="Hybridization modes.")
+    parser.add_argument("--engines", default=None, help="Engines, comma separated (default: reference, array if "
+                                                        "NumPy is installed, active, bitboard and compact).")
+    parser.add_argument("--sources", default="random,seeds", help="random: random grids of every size and number of "
+                                                                  "colors; seeds: the shipped seeds.")
+    parser.add_argument("--seeds-file", default=join(dirname(abspath(__file__)), "default.txt"),
+                        help="File of seeds benchmarked (default: the shipped default.txt).")
+    parser.add_argument("--full", action="store_true",
+                        help="All sizes from 50 to 2000 and numbers of colors from 2 to " + str(len(color_list)) + ".")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Minimum time of each case (default: 1).")
+    parser.add_argument("--max-generations", type=int, default=1000, help="Maximum generations of each case.")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Does not measure the peak memory.")
+    parser.add_argument("--no-io", dest="io", action="store_false", help="Does not benchmark the seed library.")
+    parser.add_argument("-o", "--output", help="JSON file of the results.")
+    parser.add_argument("--compare", help="JSON file of earlier results to compare with.")
+    args = parser.parse_args(argv)
+    sizes = full_sizes if args.full else [int(size) for size in args.sizes.split(",")]
+    colors = full_colors if args.full else [int(n) for n in args.colors.split(",")]
+    if args.engines is None:
+        engines = ["reference"] + (["array"] if numpy_available else []) + ["active", "bitboard", "compact"]
+    else:
+        engines = args.engines.split(",")
+    for engine in engines:
+        if engine not in engine_names:
+            parser.error("unknown engine: " + engine)
+    if any(n < 2 or n > len(color_list) for n in colors):
+        parser.error("numbers of colors must be between 2 and " + str(len(color_list)))
+    hybrids = {"off": [False], "on": [True], "both": [False, True]}[args.hybrid]
+    seeds = read_seed_file(args.seeds_file)
+    numpy_version = None
+    if numpy_available:
+        import numpy
+        numpy_version = numpy.__version__
+    results = {"version": 1, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+               "numpy": numpy_version, "platform": platform.platform(), "cases": [], "seeds": {}}
+    print("%-45s %8s %10s %12s  %s" % ("Case", "Gens", "Gens/s", "Peak (MB)", "Phases (ms per generation)"))
+    for case, seed, hybridization, engine in make_cases(sizes, colors, hybrids, engines, args.sources.split(","),
+                                                        seeds):
+        case.update(bench_case(seed, hybridization, engine, args.seconds, args.max_generations, args.memory))
+        results["cases"].append(case)
+        print("%-45s %8d %10.2f %12s  %s" % (case_key(case), case["generations"], case["gens_per_sec"],
+                                             "-" if case["peak_memory"] is None else
+                                             "%.1f" % (case["peak_memory"] / 1048576.0),
+                                             " ".join("%s=%.3f" % (name, 1000 * case["phases"][name])
+                                                      for name in phase_names if name in case["phases"])))
+        sys.stdout.flush()
+    if args.io:
+        results["seeds"] = bench_seeds(args.seeds_file)
+        for name in sorted(results["seeds"]):
+            print("seeds %-39s %10.3f ms" % (name, 1000 * results["seeds"][name]))
+    if resource is not None:
+        results["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Peak resident memory of the whole run, in kilobytes on Linux.
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare, "r") as compare_file:
+            compare(json.load(compare_file), results)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
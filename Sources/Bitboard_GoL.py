@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Bitboard engine: each color is stored as a single Python integer used as a plane of bits (one bit per cell) instead of
+one Python int per cell. The neighbours are counted for all the cells at once with bit-sliced adders, and the rules of
+configuration are applied with bitwise operations, with the same competition/hybridization as process_changes.
+"""
+from Engine_GoL import configuration, rule_table
+
+
+class BitboardGrid(object):
+    """
+    Grid of states stored as bit planes. The bit of the cell [i][j] is i * width + j, where width is the size of the
+    grid plus one: the extra column is always empty and prevents the cells of a row from touching those of the next one
+    when the planes are shifted.
+    """
+
+    def __init__(self, grid, hybridization=False):
+        """
+        :param grid: 2D list containing the states of the cells.
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        """
+        self.size = len(grid)
+        self.width = self.size + 1
+        self.hybridization = hybridization
+        self.full = int(("0" + "1" * self.size) * self.size, 2)
+        # Mask of the bits that are cells of the grid (every bit except the empty column).
+        self.planes = [0] * len(configuration["colors"])
+        for color in range(1, len(configuration["colors"])):
+            bits = []
+            for row in reversed(grid):
+                bits.append("0")
+                bits.append("".join("1" if cell == color else "0" for cell in reversed(row)))
+                # The highest bits come first in the string, so rows and columns are written in reverse order.
+            self.planes[color] = int("".join(bits), 2)
+
+    def count_neighbours(self, plane):
+        """
+        Counts the neighbours of every cell in a color plane, using bit-sliced adders.
+        :param plane: Bit plane of one color.
+        :return: A list of 4 bit planes. The number of neighbours of a cell is written in binary with the bits of that
+        cell in these 4 planes (bit 0 first).
+        """
+        width = self.width
+        full = self.full
+        shifted = [plane << 1, plane >> 1, plane << width, plane >> width,
+                   plane << (width + 1), plane >> (width + 1), plane << (width - 1), plane >> (width - 1)]
+        # The 8 neighbours of all the cells. Bits shifted out of the grid are removed by the mask below.
+        count = [0, 0, 0, 0]
+        for neighbour in shifted:
+            carry = neighbour & full
+            for bit in range(0, 4):
+                # Adds the neighbour plane to the counter, propagating the carry from bit to bit.
+                count[bit], carry = count[bit] ^ carry, count[bit] & carry
+        return count
+
+    def equal(self, count, value):
+        """
+        :param count: Neighbour count planes obtained with count_neighbours.
+        :param value: Number of neighbours.
+        :return: A bit plane of the cells having exactly that number of neighbours.
+        """
+        result = self.full
+        for bit in range(0, 4):
+            if (value >> bit) & 1:
+                result &= count[bit]
+            else:
+                result &= ~count[bit]
+        return result
+
+    def step(self, hybridization=None):
+        """
+        Computes the next generation.
+        :param hybridization: New hybridization mode. If None, the current one is kept.
+        :return: The list of the bit planes of each color.
+        """
+        if hybridization is not None:
+            self.hybridization = hybridization
+        table = rule_table()
+        result_neighbor = [0] * len(configuration["colors"])
+        for x in range(1, len(configuration["colors"])):
+            plane = self.planes[x]
+            count = self.count_neighbours(plane)
+            born = 0
+            for value in table.birth[x]:
+                born |= self.equal(count, value)
+            survive = 0
+            for value in table.survival[x]:
+                survive |= self.equal(count, value)
+            result_neighbor[x] = (~plane & born) | (plane & survive)
+            # Born where the cell is not of that color, survives where it is, as in process_changes.
+        planes = [0] * len(configuration["colors"])
+        for index in range(1, len(configuration["colors"])):
+            mask = result_neighbor[index]
+            for color in range(1, index):
+                planes[color] &= ~mask
+            planes[index] = mask
+            # The last possible color wins.
+            if self.hybridization and index > 2:
+                hybrid = mask & result_neighbor[index - 2]
+                planes[index] &= ~hybrid
+                planes[index - 1] |= hybrid
+        self.planes = planes
+        return planes
+
+    def changes_since(self, planes):
+        """
+        Lists the cells that differ from older bit planes.
+        :param planes: The list of bit planes of an earlier generation.
+        :return: List of (row, column, new state) tuples.
+        """
+        changed = 0
+        for color in range(1, len(self.planes)):
+            changed |= self.planes[color] ^ planes[color]
+        length = self.size * self.width
+        bits = [bin(plane)[2:].zfill(length)[::-1] for plane in self.planes]
+        # As in to_grid, the character at index i * width + j of these strings is the bit of the cell [i][j].
+        changes = []
+        changed_bits = bin(changed)[2:].zfill(length)[::-1]
+        position = changed_bits.find("1")
+        while position != -1:
+            new_state = 0
+            for color in range(1, len(self.planes)):
+                if bits[color][position] == "1":
+                    new_state = color
+            changes.append((position // self.width, position % self.width, new_state))
+            position = changed_bits.find("1", position + 1)
+        return changes
+
+    def population(self):
+        """
+        :return: List of the number of cells of each color (index 0 is left to 0, like the neighbour counts).
+        """
+        return [bin(plane).count("1") if color else 0 for color, plane in enumerate(self.planes)]
+
+    def to_grid(self):
+        """
+        Builds the grid of states from the bit planes.
+        :return: A 2D list containing the states of the cells.
+        """
+        grid = [[0] * self.size for _ in range(self.size)]
+        length = self.size * self.width
+        for color in range(1, len(self.planes)):
+            bits = bin(self.planes[color])[2:].zfill(length)[::-1]
+            # After reversing, the character at index i * width + j is the bit of the cell [i][j].
+            position = bits.find("1")
+            while position != -1:
+                grid[position // self.width][position % self.width] = color
+                position = bits.find("1", position + 1)
+        return grid
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints: the whole state of a running simulation (grid, number of the generation, colors, rules, hybridization
+mode, engine, random fill and position in the population table) saved in a compact binary file, from which the
+simulation can be continued after an interruption. The file is read by memory mapping it: the grid is copied from the
+file without parsing, so resuming takes a time proportional to the size of the file.
+
+File layout:
+- the 8 bytes b"GOLCKP1\\n";
+- the length of the header, as a 4 bytes little-endian unsigned integer;
+- the header, a JSON dictionary with the size of the grid, the generation, the colors, rules, hybridization mode,
+  engine, view of the sparse engine, random fill of the first generation, population table ("path", "position" from
+  which it is continued and "binary" format) and number of plane cells, padded with spaces so that the grid starts at
+  a multiple of 8 bytes;
+- the grid, one byte per cell, row after row, padded with zeros to a multiple of 8 bytes;
+- for the Hashlife and sparse engines, whose plane extends beyond the grid, the live cells of the whole plane, as
+  (row, column, state) triplets of little-endian signed 64 bits integers.
+A checkpoint is written into a temporary file which then replaces the previous one, so that an interruption while
+writing leaves the previous checkpoint intact.
+
+Example: python Batch_GoL.py Canon -n 1000000 --checkpoint run.ckp
+then, after an interruption: python Batch_GoL.py --resume run.ckp -n 1000000
+"""
+import json
+import mmap
+import os
+import struct
+from Engine_GoL import configuration, compile_rules
+from Seeds_GoL import replace_file
+from Series_GoL import SeriesWriter
+from Simulation_GoL import Simulation
+
+magic = b"GOLCKP1\n"
+
+
+def write_checkpoint(path, simulation, population_log=None, log_path=None, random_info=None):
+    """
+    Saves the state of a simulation, between two generations.
+    :param path: Path of the checkpoint. An existing checkpoint is replaced once the new one is complete.
+    :param simulation: The Simulation.
+    :param population_log: PopulationWriter or SeriesWriter of the simulation, or None. Its waiting lines are written,
+    so that the table continues from the checkpoint.
+    :param log_path: Path of the population table.
+    :param random_info: Random fill of the first generation (see Random_GoL.random_fill), or None.
+    """
+    grid = simulation.to_grid()
+    size = len(grid)
+    cells = simulation.plane_cells()
+    header = {"size": size, "generation": simulation.generation, "colors": configuration["colors"],
+              "rules": configuration["rules"], "hybrid": simulation.hybridization, "engine": simulation.engine,
+              "view": list(simulation.view), "random": random_info, "log": None,
+              "cells": len(cells) if cells is not None else None}
+    if population_log is not None:
+        header["log"] = {"path": log_path, "position": population_log.tell(),
+                         "binary": isinstance(population_log, SeriesWriter)}
+    header = json.dumps(header).encode("utf-8")
+    header += b" " * (-(len(magic) + 4 + len(header)) % 8)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as checkpoint_file:
+        checkpoint_file.write(magic + struct.pack("<I", len(header)) + header)
+        checkpoint_file.write(b"".join([bytes(bytearray(row)) for row in grid]))
+        checkpoint_file.write(b"\0" * (-size * size % 8))
+        if cells is not None:
+            checkpoint_file.write(struct.pack("<%dq" % (3 * len(cells)), *[value for cell in cells for value in cell]))
+            # struct rather than an array of 64 bits integers, which Python 2 does not have.
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    replace_file(temporary, path)
+    # The previous checkpoint is only replaced by a complete one.
+
+
+class Checkpoint(object):
+    """
+    Memory mapped access to a checkpoint.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the checkpoint.
+        """
+        self.checkpoint_file = open(path, "rb")
+        start = self.checkpoint_file.read(len(magic) + 4)
+        if start[:len(magic)] != magic:
+            raise ValueError(path + " is not a checkpoint")
+        header_length = struct.unpack("<I", start[len(magic):])[0]
+        header = json.loads(self.checkpoint_file.read(header_length).decode("utf-8"))
+        self.size = header["size"]
+        self.generation = header["generation"]
+        self.colors = header["colors"]
+        self.rules = header["rules"]
+        self.hybridization = header["hybrid"]
+        self.engine = header["engine"]
+        self.view = tuple(header["view"])
+        self.random = header["random"]
+        self.log = header["log"]
+        # Dictionary with the "path", "position" and "binary" format of the population table, or None.
+        self.n_cells = header["cells"]
+        self.offset = len(magic) + 4 + header_length
+        # Position of the grid.
+        self.data = mmap.mmap(self.checkpoint_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.cells_offset = self.offset + self.size * self.size + (-self.size * self.size % 8)
+        if len(self.data) < self.cells_offset + 24 * (self.n_cells or 0):
+            raise ValueError(path + " is incomplete")
+
+    def grid(self):
+        """
+        :return: The grid of states, as a 2D list, copied row by row from the file.
+        """
+        size = self.size
+        return [list(bytearray(self.data[self.offset + i * size:self.offset + (i + 1) * size]))
+                for i in range(0, size)]
+
+    def cells(self):
+        """
+        :return: List of (row, column, state) tuples of the live cells of the whole plane, for the Hashlife and sparse
+        engines, or None.
+        """
+        if self.n_cells is None:
+            return None
+        values = struct.unpack_from("<%dq" % (3 * self.n_cells), self.data, self.cells_offset)
+        return list(zip(values[0::3], values[1::3], values[2::3]))
+
+    def seed(self):
+        """
+        :return: A seed dictionary with the colors, rules, hybridization mode and grid of the checkpoint.
+        """
+        return {"colors": self.colors, "rules": self.rules, "seed": self.grid(), "hybrid": self.hybridization,
+                "random": self.random}
+
+    def simulation(self, engine=None, processes=None, track_changes=False, detect_cycles=False, timer=None):
+        """
+        Sets the colors and rules of the checkpoint as the current configuration, and continues the simulation.
+        :param engine: Name of the engine, or None for the engine of the checkpoint.
+        :param processes: Number of processes of the tiled engine.
+        :param track_changes: See Simulation.
+        :param detect_cycles: See Simulation. Cycles are detected again from the generation of the checkpoint.
+        :param timer: See Simulation.
+        :return: A Simulation at the generation of the checkpoint.
+        """
+        configuration["colors"] = self.colors
+        configuration["rules"] = self.rules
+        compile_rules()
+        simulation = Simulation(self.grid(), self.hybridization, engine or self.engine, processes, track_changes,
+                                detect_cycles, timer=timer)
+        simulation.restore(self.generation, self.view, self.cells())
+        return simulation
+
+    def close(self):
+        self.data.close()
+        self.checkpoint_file.close()
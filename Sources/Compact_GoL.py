@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Compact engine: the grid of states is stored in two preallocated bytearrays (one byte per cell) instead of a list of
+lists, and the neighbour counts in one preallocated bytearray per color. At each generation the next states are
+written into the second state buffer, then the two buffers are swapped; the counts are cleared and filled again in
+place. Once the engine is created, stepping allocates no list or buffer, unlike get_neighbour which builds a new list
+for every cell at every generation.
+
+Each buffer has a border of dead cells around the grid, so that the neighbours of the cells of the border need no
+special case: the cell [i][j] is at position (i + 1) * width + j + 1, where width is the size of the grid plus 2.
+GridView gives access to the current generation as if it were a 2D list, for the code written for lists of lists.
+"""
+from array import array
+from Engine_GoL import configuration, rule_table
+
+
+class RowView(object):
+    """
+    A row of the current generation of a CompactGrid, behaving like a list of states.
+    """
+    __slots__ = ("grid", "row")
+
+    def __init__(self, grid, row):
+        self.grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self.grid.size
+
+    def position(self, column):
+        """
+        :return: Position of a cell of the row in the buffers, with negative columns counted from the end.
+        """
+        if column < 0:
+            column += self.grid.size
+        if not 0 <= column < self.grid.size:
+            raise IndexError("Column " + str(column) + " is out of the grid")
+        return (self.row + 1) * self.grid.width + column + 1
+
+    def __getitem__(self, column):
+        if isinstance(column, slice):
+            return list(self)[column]
+        return self.grid.buffers[self.grid.current][self.position(column)]
+
+    def __setitem__(self, column, state):
+        self.grid.buffers[self.grid.current][self.position(column)] = state
+
+    def __iter__(self):
+        start = (self.row + 1) * self.grid.width + 1
+        return iter(self.grid.buffers[self.grid.current][start:start + self.grid.size])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def count(self, state):
+        """
+        :return: Number of cells of the row in the given state.
+        """
+        start = (self.row + 1) * self.grid.width + 1
+        return self.grid.buffers[self.grid.current].count(state, start, start + self.grid.size)
+
+
+class GridView(object):
+    """
+    The current generation of a CompactGrid, behaving like a 2D list of states: grid[i][j] reads and writes the cell
+    [i][j], and the rows can be iterated, copied with list(row) or saved with encode_grid. The view follows the grid
+    from one generation to the next, like the grid modified in place by the reference engine.
+    """
+
+    def __init__(self, grid):
+        """
+        :param grid: The CompactGrid.
+        """
+        self.rows = [RowView(grid, i) for i in range(0, grid.size)]
+        # The row views are created once and reused.
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, row):
+        return self.rows[row]
+
+    def __setitem__(self, row, states):
+        if len(states) != len(self.rows):
+            raise ValueError("A row of the grid has " + str(len(self.rows)) + " cells")
+        for column, state in enumerate(states):
+            self.rows[row][column] = state
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def tolist(self):
+        """
+        :return: A copy of the grid as a 2D list.
+        """
+        return [list(row) for row in self.rows]
+
+
+class CompactGrid(object):
+    """
+    Grid of states stored in two bytearrays used in turn, stepped without allocating memory.
+    """
+
+    def __init__(self, grid, hybridization=False):
+        """
+        :param grid: 2D list containing the states of the cells. It is copied into the buffers.
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        """
+        self.size = len(grid)
+        self.width = self.size + 2
+        self.area = self.width * self.width
+        self.hybridization = hybridization
+        self.buffers = [bytearray(self.area), bytearray(self.area)]
+        self.current = 0
+        # Index of the buffer holding the current generation. The other one receives the next generation.
+        for i in range(0, self.size):
+            start = (i + 1) * self.width + 1
+            self.buffers[0][start:start + self.size] = bytearray(grid[i])
+        self.interior = array("I", [(i + 1) * self.width + j + 1 for i in range(0, self.size)
+                                    for j in range(0, self.size)])
+        # Positions of the cells of the grid, without the border.
+        self.around = [-self.width - 1, -self.width, -self.width + 1, -1, 1,
+                       self.width - 1, self.width, self.width + 1]
+        # Offsets of the 8 neighbours of a position.
+        self.total = bytearray(self.area)
+        # Number of live neighbours of any color of each position, to skip the empty regions.
+        self.no_total = bytearray(self.area)
+        self.changed = array("I", bytes(4 * self.size * self.size))
+        self.n_changed = 0
+        # Positions of the cells changed by the last step, in the first n_changed items.
+        self.n_colors = 0
+        self.allocate_counts(len(configuration["colors"]))
+        self.grid = GridView(self)
+
+    def allocate_counts(self, n_colors):
+        """
+        Allocates the neighbour counts for a number of colors. Only called again if the colors change.
+        :param n_colors: Number of colors, including white.
+        """
+        self.n_colors = n_colors
+        self.counts = bytearray(self.area * n_colors)
+        # counts[x * area + position] is the number of neighbours of color x of the cell at that position.
+        self.no_counts = bytearray(self.area * n_colors)
+        # Zeros copied over the counts at each step.
+
+    def step(self, hybridization=None):
+        """
+        Computes the next generation into the other state buffer, and swaps the buffers.
+        :param hybridization: New hybridization mode. If None, the current one is kept.
+        """
+        if hybridization is not None:
+            self.hybridization = hybridization
+        table = rule_table()
+        if table.n_colors != self.n_colors:
+            self.allocate_counts(table.n_colors)
+        source = self.buffers[self.current]
+        target = self.buffers[1 - self.current]
+        counts = self.counts
+        total = self.total
+        counts[:] = self.no_counts
+        total[:] = self.no_total
+        # Cleared in place: a same length slice assignment from another bytearray copies the zeros without resizing the
+        # buffers or converting the zeros.
+        area = self.area
+        around = self.around
+        interior = self.interior
+        for position in interior:
+            state = source[position]
+            if state:
+                base = state * area + position
+                for offset in around:
+                    counts[base + offset] += 1
+                    total[position + offset] += 1
+        allowed = table.allowed
+        colors = range(1, table.n_colors)
+        hybridization = self.hybridization
+        born_alone = any(allowed[x][0][0] for x in colors)
+        # If a color is born without neighbours, the empty regions cannot be skipped.
+        single = table.n_colors == 2
+        changed = self.changed
+        n_changed = 0
+        for position in interior:
+            cell = source[position]
+            if not cell and not total[position] and not born_alone:
+                target[position] = 0
+                continue
+            if single:
+                new_state = 1 if allowed[1][cell == 1][counts[area + position]] else 0
+            else:
+                new_state = 0
+                before_last = last = False
+                # If the colors x-2 and x-1 are possible, for the hybridization.
+                for x in colors:
+                    possible = allowed[x][cell == x][counts[x * area + position]]
+                    if possible:
+                        new_state = x - 1 if hybridization and before_last else x
+                        # The last possible color wins, as in process_changes.
+                    before_last, last = last, possible
+            target[position] = new_state
+            if new_state != cell:
+                changed[n_changed] = position
+                n_changed += 1
+        self.n_changed = n_changed
+        self.current = 1 - self.current
+
+    def changes(self):
+        """
+        :return: List of (row, column, new state) tuples of the cells changed by the last step.
+        """
+        width = self.width
+        states = self.buffers[self.current]
+        return [(position // width - 1, position % width - 1, states[position])
+                for position in self.changed[0:self.n_changed]]
+
+    def population(self):
+        """
+        :return: List of the number of cells of each color (index 0 is left to 0), counted in the current buffer.
+        """
+        states = self.buffers[self.current]
+        return [0] + [states.count(color) for color in range(1, len(configuration["colors"]))]
+
+    def to_grid(self):
+        """
+        :return: The GridView of the current generation. Use its tolist method to get a copy.
+        """
+        return self.grid
@@ -5,14 +5,23 @@ except ImportError:
     import tkinter as tk
 from os import getcwd
 from os.path import join
-import random
-import ast
-
-configuration = {"colors": ["white", "black", "red", "blue"]}
-configuration["rules"] = [{"born": 3, "lower": 2, "upper": 3} for x in range(len(configuration["colors"]))]
-
-color_list = ["white", "black", "red", "blue", "dark green", "orange", "purple", "pink", "yellow", "peach puff",
-              "firebrick", "royal blue", "chocolate", "turquoise", "gold", "sienna", "green", "deep pink", "cyan"]
+try:
+    import tkFileDialog as filedialog
+except ImportError:
+    from tkinter import filedialog
+from Engine_GoL import configuration, color_list, generate_empty_grid, compile_rules
+from Simulation_GoL import Simulation
+from Array_GoL import numpy_available
+from Worker_GoL import SimulationWorker
+from Population_GoL import PopulationWriter
+from Series_GoL import SeriesWriter
+from Seeds_GoL import SeedStore
+from Rle_GoL import read_rle, write_rle, parse_rule, format_rule
+from History_GoL import History
+from Random_GoL import random_fill, parse_densities
+from Viewport_GoL import Viewport
+from Export_GoL import FrameExporter
+from Metrics_GoL import PhaseTimer, clock
 
 
 def keypress(event):
@@ -20,118 +29,6 @@ def keypress(event):
         return 'break'
 
 
-def generate_empty_grid(size, nei=False):
-    """
-    This function generates an empty square grid (i.e. made only of 0's). The size of the grid is chosen by the user.
-    :param nei: Boolean to check if the grid generated needs to be a triple nested to represent the empty grid of
-    neighbour count.
-    :param size: the length of the grid's sides. (width = height)
-    :return: A 2D list containing only 0's representing the initial state (no live cell).
-    """
-    empty_grid = [[0] * size for _ in range(size)]
-    # For loop because simply multiplying a list to reproduce it would cause python to consider all sub-lists to be the
-    # same item and any modification would apply to all the sub-lists.
-    if nei:
-        for width in range(0, len(empty_grid)):
-            for height in range(0, len(empty_grid[width])):
-                empty_grid[width][height] = [0] * len(configuration["colors"])
-                # Iterates over lines and columns to generate a list of 0's from each cell. This list is as long as
-                # the number of colors there are in configuration. This will allow to store different neighbours.
-    return empty_grid
-
-
-def get_neighbour(state):
-    """
-    This function calculates the number of live neighbours for each cell on the grid.
-    :param state: This is the list containing all the states live/dead of the cells
-    :return: A list with the same structure as the input list is returned. However, instead of representing the state
-    (0/1), the values represent the number of living neighbours for each cell.
-    """
-    count_neigh = generate_empty_grid(len(state), True)
-    # Generates an empty grid for neighbour counting, same size as the game grid.
-
-    for i in range(0, len(state)):
-        # Iterates over each line of the game grid
-        for j in range(len(state[i])):
-            # Iterates over each column within the line of the game grid
-            for x in range(i - 1, i + 2):
-                # Iterates vertically over each neighbour of the current cell.
-                if 0 <= x < len(state):
-                    # Prevents the iterations from exiting the upper and lower borders of the game grid.
-                    for y in range(j - 1, j + 2):
-                        # Iterates horizontally over neighbours of the current cell.
-                        if 0 <= y < len(state[x]) and not (state[x][y] == 0 or (x == i and y == j)):
-                            # Prevents the iterations from exiting the left and right borders of the game grid.
-                            # Adding 1 neighbour to the count if the neighbour is alive and not on the
-                            # same position as the cell in game grid (cannot be a neighbour of itself).
-                            count_neigh[i][j][state[x][y]] += 1
-                            # The count is added to the corresponding color. (for example if the color of the
-                            # neighbouring cell is red, its state is 2. It will then add a count to the index 2 in the
-                            # list for the cell in [i][j] in neighbour count.
-    return count_neigh
-
-
-def process_changes(count_neigh, grid, hybridization=False):
-    """
-    This function processes the new number of live cells in the grid, based on a set of rules. The modifications are
-    directly applied on the input grid.
-    :param hybridization: blabla
-    :param count_neigh: This is a 2D list containing the number of live neighbours for each cell. This list is obtained
-    with the get_neighbour(state) function.
-    :param grid: This is the grid containing all the states of the cells (0/1). The modifications are directly applied
-    on this list.
-    :return: The returned grid is simply the same list that has been used as an input, after modifications.
-    (0/1), the values represent the number of living neighbours for each cell.
-    """
-    for i in range(0, len(grid)):
-        # Iterating over lines in the grid.
-        for j in range(0, len(grid[i])):
-            # Iterating over columns in a line of the grid.
-            result_neighbor = [0] * len(configuration["colors"])
-            # Generates a temporary list containing booleans for each colors, indicating if the cell should be of that
-            # color at the next iteration.
-            for x in range(1, len(configuration["colors"])):
-                # Iterating over colors.
-                if not grid[i][j] == x and count_neigh[i][j][x] == configuration["rules"][x]["born"]:
-                    # If the cell is not of tht color, and the number of surrounding cell of that color is equal to the
-                    # number required for birth.
-                    result_neighbor[x] = 1
-                    # It should become (be born) that color on the next iteration.
-
-                elif (configuration["rules"][x]["lower"] <= count_neigh[i][j][x] <= configuration["rules"][x]["upper"]) \
-                        and grid[i][j] == x:
-                    # Else, if the cell is of that color and it has enough neighbouts of the same color to survive, and
-                    # less than the overpopulation limit.
-                    result_neighbor[x] = 1
-                    # It should stay of that color (survive) in the next iteration.
-
-                else:
-                    result_neighbor[x] = 0
-                    # Otherwise, it should not be of that color in the next iteration.
-            for index in range(1, len(configuration["colors"])):
-                # Iterating over colors
-                if hybridization:
-                    # If in hybridization mode
-                    if index > 2 and result_neighbor[index] and result_neighbor[index - 2]:
-                        # If the color has a higher index than 2 and there is more than 0 neighbours of that color as
-                        # well as more than 0 neighbours of the color with an index inferior by 2
-                        grid[i][j] = index - 1
-                        # The cell will take the color with an index between the two colors.(hybridization)
-                    elif result_neighbor[index]:
-                        # Else, the cell will
-                        grid[i][j] = index
-                else:
-                    # If in competition mode.
-                    if result_neighbor[index]:
-                        # If there are neighbours of this color
-                        grid[i][j] = index
-                        # The cell will become the color of the last index.
-                if not sum(result_neighbor):
-                    grid[i][j] = 0
-                    # If there are not any neighbours of any colors, the cell will die/stay empty.
-    return grid
-
-
 class MainWindow(tk.Frame):  # creates the main window
     """
     This class contains all the elements of the game. It consists of a window made of two frames: the game frame and the
@@ -139,11 +36,48 @@ class MainWindow(tk.Frame):  # creates the main window
     """
     var_hybrid = False
     # This variable defines if the cells are hybridizing or in competition.
-    seed_store = {}  # Dictionary containing the save for all the seeds in the text file.
+    var_engine = "reference"
+    # Name of the engine used to compute the generations (see Simulation_GoL.engine_names).
+    worker = None
+    # SimulationWorker computing the generations of the running simulation in a background thread.
+    frame_interval = 20
+    # Time between two checks for new generations to draw, in milliseconds.
+    plane = None
+    # Simulation of the sparse engine holding the whole plane between two simulations, of which the grid is a view.
+    view = (0, 0)
+    # Plane coordinates of the top left cell of the canvas, for the sparse engine.
+    viewport = None
+    # Viewport giving the part of the grid shown on the canvas and the zoom.
+    var_density = False
+    # This variable defines if the blocks of cells drawn when zoomed out show their density instead of their dominant
+    # state.
+    drag_start = None
+    # Position of the mouse when the canvas started to be dragged, to move the viewport.
+    export_path = None
+    # Path to which the iterations of the simulations are exported as images (see Export_GoL), or None.
+    var_binary_log = False
+    # This variable defines if the population table is written in binary format (data.gol) instead of data.txt.
+    var_stop_cycle = False
+    # This variable defines if a simulation stops when the grid comes back to an earlier generation.
+    cycle_reported = False
+    # States whether the cycle of the current simulation has already been reported to the user.
+    history = None
+    # History of the generations of the last simulation, to go back to any of them.
+    history_budget = 64 << 20
+    # Memory the history may use, in bytes. The oldest generations are forgotten first.
+    history_position = 0
+    # Iteration currently displayed.
+    timer = None
+    # PhaseTimer measuring the phases of the iterations when "Show timings" is checked, otherwise None.
+    seed_store = {}  # SeedStore giving access to the seeds saved in the seed library.
+    color_codes = {}  # Hexadecimal codes of the color names, filled by color_code.
     game_grid = []
     game_state = False  # Safety
-    game_to_stop = False  # Variable used to stop an ongoing simulation
-    win_open = {"op": False, "sw": False}  # Boolean used to know if the Windows are open (Seeds or Settings).
+    win_open = {"op": False, "sw": False, "rd": False}
+    # Boolean used to know if the Windows are open (Seeds, Settings or Random Seed).
+    random_info = None
+    # Random seed, densities and rectangle of the random fill of the current grid, saved with it instead of its cells,
+    # or None if the grid cannot be generated again from them (it was drawn or simulated since).
     ite_incre = 0  # Number defining the current iteration
     options_label = [0] * len(configuration["colors"])
     # Will contain the frames of the configuration["colors"] names that will be displayed next to the options.
@@ -153,6 +87,8 @@ class MainWindow(tk.Frame):  # creates the main window
     # List stocking the frames the minimum number of similar neighbours required to for each cell color to survive.
     options_upper = [0] * len(configuration["colors"])
     # List stocking the frames the number of similar neighbours above which the cell dies of overpopulation.
+    options_sets = [0] * len(configuration["colors"])
+    # List stocking the entries of the rules written in the B/S notation, which replace the spinboxes when filled
     label_title = [0] * len(configuration["rules"][1])
 
     # Serves to stock the labels informing the user about the options described above.
@@ -249,6 +185,60 @@ class MainWindow(tk.Frame):  # creates the main window
         # following a priority order (their order in the list); for example if an empty tile is surrounded by 3 black
         # cells and 3 red cells, it will become red becomes red is the color number 2 while black is number 1 (2>1).
 
+        self.label_history = tk.Label(self.options_frame, text="History :")
+        self.label_history.grid(row=3, column=0, sticky="w")
+        self.button_back = tk.Button(self.options_frame, cursor="hand2", text="<",
+                                     command=lambda: self.show_generation(self.history_position - 1))
+        self.button_back.grid(row=3, column=1, sticky="w")
+        self.button_forward = tk.Button(self.options_frame, cursor="hand2", text=">",
+                                        command=lambda: self.show_generation(self.history_position + 1))
+        self.button_forward.grid(row=3, column=1, sticky="e")
+        self.history_entry = tk.Entry(self.options_frame, bd=2, width=5)
+        self.history_entry.grid(row=3, column=2)
+        self.button_go = tk.Button(self.options_frame, cursor="hand2", text="Go to iteration",
+                                   command=lambda: self.go_to_generation())
+        self.button_go.grid(row=3, column=3, sticky="w")
+        self.history_text = tk.StringVar(self.options_frame)
+        self.label_history_range = tk.Label(self.options_frame, textvariable=self.history_text)
+        self.label_history_range.grid(row=3, column=4, columnspan=3, sticky="w")
+        # When no simulation is running, these buttons display the previous or next iteration of the last simulation,
+        # or the iteration written in the entry, if it is still in the history.
+        self.status_text = tk.StringVar(self.options_frame)
+        self.label_status = tk.Label(self.options_frame, textvariable=self.status_text)
+        self.label_status.grid(row=4, column=0, columnspan=7, sticky="w")
+        # Status line showing the timings, when they are enabled.
+        self.label_view = tk.Label(self.options_frame, text="View :")
+        self.label_view.grid(row=5, column=0, sticky="w")
+        self.button_view_left = tk.Button(self.options_frame, cursor="hand2", text="Left",
+                                          command=lambda: self.move_view(-1, 0))
+        self.button_view_left.grid(row=5, column=1, sticky="w")
+        self.button_view_right = tk.Button(self.options_frame, cursor="hand2", text="Right",
+                                           command=lambda: self.move_view(1, 0))
+        self.button_view_right.grid(row=5, column=1, sticky="e")
+        self.button_view_up = tk.Button(self.options_frame, cursor="hand2", text="Up",
+                                        command=lambda: self.move_view(0, -1))
+        self.button_view_up.grid(row=5, column=2, sticky="w")
+        self.button_view_down = tk.Button(self.options_frame, cursor="hand2", text="Down",
+                                          command=lambda: self.move_view(0, 1))
+        self.button_view_down.grid(row=5, column=2, sticky="e")
+        self.button_view_centre = tk.Button(self.options_frame, cursor="hand2", text="Centre on cells",
+                                            command=lambda: self.centre_view())
+        self.button_view_centre.grid(row=5, column=3, sticky="w")
+        # With the sparse engine, these buttons move the canvas on the unbounded plane by a quarter of its size.
+        self.label_zoom = tk.Label(self.options_frame, text="Zoom :")
+        self.label_zoom.grid(row=6, column=0, sticky="w")
+        self.button_zoom_out = tk.Button(self.options_frame, cursor="hand2", text="-",
+                                         command=lambda: self.zoom(-1))
+        self.button_zoom_out.grid(row=6, column=1, sticky="w")
+        self.button_zoom_in = tk.Button(self.options_frame, cursor="hand2", text="+",
+                                        command=lambda: self.zoom(1))
+        self.button_zoom_in.grid(row=6, column=1, sticky="e")
+        self.button_zoom_fit = tk.Button(self.options_frame, cursor="hand2", text="Whole grid",
+                                         command=lambda: self.zoom_fit())
+        self.button_zoom_fit.grid(row=6, column=2, sticky="w")
+        # The canvas only shows a part of the grids that are too large for it. The mouse wheel also zooms, and dragging
+        # the canvas with the right button moves the part shown.
+
         self.load_seeds()
         # Now that most widgets have been generated on the main window, the seeds are loaded from a text file into the
         # dictionary.
@@ -268,6 +258,45 @@ class MainWindow(tk.Frame):  # creates the main window
         self.options_menu.add_separator()
         self.options_menu.add_command(label="Settings", command=lambda: self.window_options())
         # Opens a new window in which the user can change the birth/survival rules for each cell type
+        self.engine_value = tk.StringVar(self, value=self.var_engine)
+        self.engine_menu = tk.Menu(self.options_menu, tearoff=0)
+        self.engine_menu.add_radiobutton(label="Reference", variable=self.engine_value, value="reference",
+                                         command=lambda: self.change_engine())
+        self.engine_menu.add_radiobutton(label="Array (NumPy)", variable=self.engine_value, value="array",
+                                         command=lambda: self.change_engine(),
+                                         state="normal" if numpy_available else "disabled")
+        # Computes the generations on whole arrays instead of cell by cell. Only available if NumPy is installed.
+        self.engine_menu.add_radiobutton(label="Active cells", variable=self.engine_value, value="active",
+                                         command=lambda: self.change_engine())
+        # Only recomputes the cells around those that changed at the previous generation.
+        self.engine_menu.add_radiobutton(label="Hashlife (single color)", variable=self.engine_value,
+                                         value="hashlife", command=lambda: self.change_engine())
+        # Quadtree engine for a single color. The plane is unbounded: cells are not destroyed at the border.
+        self.engine_menu.add_radiobutton(label="Hashlife if single color", variable=self.engine_value,
+                                         value="hashlife-auto", command=lambda: self.change_engine())
+        # Switches to Hashlife when the seed has a single color, otherwise uses the fastest bounded engine.
+        self.engine_menu.add_radiobutton(label="Bitboard", variable=self.engine_value, value="bitboard",
+                                         command=lambda: self.change_engine())
+        # Stores each color as a plane of bits and counts the neighbours of all cells at once.
+        self.engine_menu.add_radiobutton(label="Sparse (unbounded)", variable=self.engine_value, value="sparse",
+                                         command=lambda: self.change_engine())
+        # Only stores the live cells, on an unbounded plane. The canvas is a view that can be moved on the plane.
+        self.engine_menu.add_radiobutton(label="Compact buffers", variable=self.engine_value, value="compact",
+                                         command=lambda: self.change_engine())
+        # Stores the grid in two preallocated byte buffers used in turn, without allocating memory at each generation.
+        self.options_menu.add_cascade(label="Engine", menu=self.engine_menu)
+        self.options_menu.add_checkbutton(label="Binary population table", command=lambda: self.change_binary_log())
+        # Writes the population of each color in data.gol, a compact binary file, instead of data.txt.
+        self.options_menu.add_checkbutton(label="Stop on cycles", command=lambda: self.change_stop_cycle())
+        # Stops the simulation when the grid repeats an earlier generation, since nothing new can happen after that.
+        self.options_menu.add_checkbutton(label="Show timings", command=lambda: self.change_timings())
+        # Displays the number of iterations per second and the time spent in each phase of an iteration.
+        self.options_menu.add_checkbutton(label="Density when zoomed out", command=lambda: self.change_density())
+        # When several cells share a pixel, the pixel shows the density of their live cells instead of their most
+        # frequent state.
+        self.options_menu.add_command(label="Export frames...", command=lambda: self.choose_export())
+        # Draws every iteration of the next simulations into PNG images, an animated GIF or a frame stack, without
+        # going through the canvas.
         self.options_menu.add_separator()
         self.menu_bar.add_cascade(label="Options", menu=self.options_menu)
 
@@ -291,66 +320,285 @@ class MainWindow(tk.Frame):  # creates the main window
         instead becomes a cell of color x+1.
         """
         self.var_hybrid = not self.var_hybrid
+        if self.worker is not None:
+            self.worker.hybridization = self.var_hybrid
+            # The running simulation uses the new mode from its next generation.
 
-    def iterate_sim(self):
+    def change_binary_log(self):
         """
-        This command goes through each iteration while calculating the next generation and apply the changes to the
-        grid. It is called when the user presses the button 'Start Simulation'.
+        This method switches the format of the population table between text (data.txt) and binary (data.gol). The
+        new format is used from the next simulation.
         """
-        if not self.game_state:
-            self.save_seed({"AutoSave": self.game_grid})
-            # At the moment the user starts a simulation, an autosave of the current grid is generated. This feature
-            # allows the user to retrieve a seed that generated an interesting pattern.
+        self.var_binary_log = not self.var_binary_log
 
-        if self.game_to_stop and self.game_state:
-            # The method will not do anything if the user pressed the 'Stop' button (game_to_stop = True)
-            # while the game is running (game_state = True). It will stop the game from running.
-            self.game_to_stop = False
-            self.game_state = False
+    def change_stop_cycle(self):
+        """
+        This method defines if the simulations stop as soon as the grid comes back to an earlier generation. Cycles are
+        reported in both cases.
+        """
+        self.var_stop_cycle = not self.var_stop_cycle
+
+    def change_timings(self):
+        """
+        This method switches the timing of the phases of the iterations on or off. When it is off, the simulation does
+        not measure anything.
+        """
+        self.timer = None if self.timer is not None else PhaseTimer()
+        if self.worker is not None:
+            self.worker.simulation.timer = self.timer
+        self.status_text.set("")
+
+    def change_density(self):
+        """
+        This method switches the drawing of the blocks of cells shared by a pixel, when the canvas is zoomed out,
+        between their most frequent state and the density of their live cells.
+        """
+        self.var_density = not self.var_density
+        self.viewport.mode = "density" if self.var_density else "dominant"
+        self.update_grid()
+
+    def choose_export(self):
+        """
+        This method asks the user for the file to which the iterations of the next simulations are exported. The kind
+        of export is given by its extension. Cancelling stops the export.
+        """
+        path = filedialog.asksaveasfilename(defaultextension=".gif", filetypes=[
+            ("Animated GIF", "*.gif"), ("PNG images (one per iteration)", "*.png"), ("Frame stack", "*.frames")])
+        self.export_path = path or None
+
+    def change_engine(self):
+        """
+        This method changes the engine used to compute the generations to the one selected in the Engine menu. The
+        bounded engines give exactly the same grids as the reference engine, they only differ in speed. The Hashlife and
+        sparse engines simulate an unbounded plane instead: cells are not destroyed at the border of the grid, so the
+        grids and populations may differ. The engine is used from the next simulation.
+        """
+        self.var_engine = self.engine_value.get()
+        self.forget_plane()
+
+    def iterate_sim(self):
+        """
+        This command starts a simulation. It is called when the user presses the button 'Start Simulation'. The
+        generations are computed by a background thread (see Worker_GoL), while the window only draws them, so that it
+        stays responsive.
+        """
+        if self.game_state:
+            return
+            # A simulation is already running.
+        try:
+            delay = int(self.time_entry.get()) / 1000.0
+        except ValueError:
+            self.alert("Please enter an Integer !")
             return
+        if self.worker is not None:
+            self.worker.join()
+            # A stopped simulation may still be finishing its last generation, and writing the population table.
+            self.end_worker(self.worker)
+        simulation = self.plane if self.var_engine == "sparse" else None
+        self.plane = None
+        # With the sparse engine, the simulation continues on the plane of the previous one, including the cells
+        # outside of the view.
+        self.save_seed({"AutoSave": self.game_grid})
+        # At the moment the user starts a simulation, an autosave of the current grid is generated. This feature
+        # allows the user to retrieve a seed that generated an interesting pattern.
+        self.random_info = None
+        # The grid is about to change, so it can no longer be generated again from its random seed.
+        if self.var_binary_log:
+            population_log = SeriesWriter(join(getcwd(), "data.gol"), configuration["colors"],
+                                          configuration["rules"], self.var_hybrid)
+        else:
+            population_log = PopulationWriter(join(getcwd(), "data.txt"), configuration["colors"])
+        # The file data.txt (or data.gol) is written by the thread at every generation, through a buffer. It is
+        # closed when the simulation ends.
+        self.history = History(self.game_grid, budget=self.history_budget)
+        # The history of the new simulation starts with the current grid.
+        exporter = None
+        if self.export_path is not None:
+            exporter = FrameExporter(self.export_path, configuration["colors"], len(self.game_grid))
+            # The exporter draws the iterations from the grid of states, in its own process, at the speed of the
+            # simulation instead of the speed of the canvas.
+        self.worker = SimulationWorker(self.game_grid, int(self.n_ite.get()), self.var_hybrid, self.var_engine, delay,
+                                       population_log, self.history, self.var_stop_cycle, self.timer,
+                                       simulation=simulation, exporter=exporter)
+        self.ite_incre = 0
+        self.cycle_reported = False
         self.game_state = True
         # Game is running.
-        if self.ite_incre < int(self.n_ite.get()):
-            # If the current iteration has not reached the desired maximum number chosen with the slider.
-            if not self.ite_incre:
-                # If we are at iteration 0, we need to create the file data.txt
-                graph_file = open(join(getcwd(),"data.txt"), 'w')
-                graph_file.write("Iteration")
-                graph_file.close()
-                graph_file = open(join(getcwd(), "data.txt"), 'a')
-                # After writing "Iteration" in this data.txt, we add every name of colors in the current simulation
-                for color in range(1, len(configuration["colors"])):
-                    graph_file.write(" " + str.upper(configuration["colors"][color].replace(" ", "")))
-                graph_file.write("\n")
-                graph_file.close()
-            graph_file = open(join(getcwd(), "data.txt"), 'a')
-            graph_file.write(str(self.ite_incre + 1))
-            for color in range(1, len(configuration["colors"])):
-                n = 0
-                for i in range(0, len(self.game_grid)):
-                    # Iterates over each line of the game grid
-                    for j in range(0, len(self.game_grid[i])):
-                        if self.game_grid[i][j] == color:
-                            n += 1
-                graph_file.write(" " + str(n))
-            graph_file.write("\n")
-            # Before closing the file, we create the table showing the population of each color. We add a line at each
-            # iteration of the simulation
-            graph_file.close()
-            self.game_grid = process_changes(get_neighbour(self.game_grid), self.game_grid, self.var_hybrid)
-            # Calculates number of neighbours and process the changes. This line only works with nested lists.
-            self.update_grid()
-            # Apply changes to the canvas.
-            self.ite_incre += 1
-            # Sets current iteration as iteration n+1
-            self.after(int(self.time_entry.get()), self.iterate_sim)
-            # Wait before next iteration, the time is taken from the current value entered in the entry in milliseconds.
-        else:
-            # If the iteration number (self.ite_incre) has reached nmax (self.nite)
-            self.ite_incre = 0
-            # Iteration number is reset
+        self.worker.start()
+        self.after(self.frame_interval, self.draw_frames, self.worker)
+
+    def draw_frames(self, worker):
+        """
+        Draws the generations computed by the thread since the last call. If several generations are waiting, only
+        the last one is drawn. This method calls itself again until the simulation ends.
+        :param worker: The SimulationWorker of the simulation being drawn.
+        """
+        if worker is not self.worker:
+            return
+            # A new simulation was started in the meantime.
+        if worker.stopped():
+            if worker.is_alive():
+                self.after(self.frame_interval, self.draw_frames, worker)
+            else:
+                self.end_worker(worker)
+            return
+            # The user stopped the simulation: nothing is drawn anymore, the thread only finishes its generation.
+        frame = worker.take()
+        if frame is not None:
+            generation, changes, cycle, grid = frame
+            phase_start = clock()
+            if grid is not None:
+                self.game_grid = grid
+                self.update_grid()
+                # The view was moved: the whole canvas is redrawn.
+            else:
+                for i, j, state in changes:
+                    self.game_grid[i][j] = state
+                self.update_cells(changes)
+                # Apply changes to the canvas, only redrawing the cells that changed.
+            if self.timer is not None:
+                self.timer.add("redraw", phase_start)
+                # The redraw is added from this thread to the timer of the simulation thread, under the lock of the
+                # timer; in the worst case the time of a redraw is counted in the next interval.
+                self.status_text.set(self.timer.status())
+            self.ite_incre = generation
+            self.history_position = generation
+            self.update_history_text()
+            if cycle is not None and not self.cycle_reported:
+                self.cycle_reported = True
+                start, period = cycle
+                if period == 1:
+                    message = "The grid does not change any more since iteration " + str(start) + "."
+                else:
+                    message = "The grid repeats every " + str(period) + " iterations since iteration " + \
+                              str(start) + "."
+                if self.var_stop_cycle:
+                    message += " The simulation was stopped."
+                self.alert(message)
+                # The cycle is reported once. The simulation goes on unless "Stop on cycles" is checked.
+        if worker.finished():
+            self.end_worker(worker)
             self.game_state = False
-            # Game stops running
+            self.ite_incre = 0
+            # The simulation reached the number of iterations of the slider.
+            if worker.error is not None:
+                self.alert("The simulation failed: " + str(worker.error))
+        else:
+            self.after(self.frame_interval, self.draw_frames, worker)
+
+    def end_worker(self, worker):
+        """
+        Forgets the thread of a simulation that has ended. With the sparse engine, its plane is kept so that the view
+        can still be moved and the next simulation continues on it.
+        :param worker: The SimulationWorker that has ended.
+        """
+        self.worker = None
+        if worker.simulation.engine == "sparse":
+            self.plane = worker.simulation
+
+    def forget_plane(self):
+        """
+        Forgets the plane of the sparse engine, when the grid is replaced. The next simulation starts from the grid.
+        """
+        self.plane = None
+        self.view = (0, 0)
+
+    def move_view(self, horizontal, vertical):
+        """
+        Moves the canvas on the plane of the sparse engine, by a quarter of its size.
+        :param horizontal: -1 to move left, 1 to move right, 0 otherwise.
+        :param vertical: -1 to move up, 1 to move down, 0 otherwise.
+        """
+        step = max(len(self.game_grid) // 4, 1)
+        self.set_view(self.view[0] + horizontal * step, self.view[1] + vertical * step)
+
+    def centre_view(self):
+        """
+        Moves the canvas to the centre of the live cells of the plane of the sparse engine.
+        """
+        plane = self.plane
+        if self.worker is not None and not self.worker.stopped():
+            plane = self.worker.simulation
+        if plane is None or plane.engine != "sparse":
+            self.set_view(0, 0)
+            return
+        bounds = list(plane.state.bounds() or (0, 0, 0, 0))
+        # Read while a simulation may be running: a few cells may be missing, which only moves the centre slightly.
+        size = len(self.game_grid)
+        self.set_view((bounds[0] + bounds[2] - size) // 2 + 1, (bounds[1] + bounds[3] - size) // 2 + 1)
+
+    def set_view(self, row, column):
+        """
+        Shows another part of the plane of the sparse engine on the canvas. During a simulation, the view moves after
+        the generation being computed.
+        :param row: Plane coordinate of the left column of the canvas.
+        :param column: Plane coordinate of the top row of the canvas.
+        """
+        if self.worker is not None:
+            if self.worker.stopped():
+                return
+                # The last simulation is still finishing its generation.
+            if self.worker.simulation.engine != "sparse":
+                self.alert("Only the Sparse engine has an unbounded plane !")
+                return
+            self.view = (row, column)
+            self.worker.move_view(row, column)
+            return
+        if self.plane is None:
+            if self.var_engine != "sparse":
+                self.alert("Only the Sparse engine has an unbounded plane !")
+                return
+            self.plane = Simulation(self.game_grid, self.var_hybrid, "sparse", track_changes=True,
+                                    detect_cycles=True)
+            if self.plane.engine != "sparse":
+                self.plane = None
+                self.alert("The Sparse engine cannot be used when a color is born without neighbours !")
+                return
+        self.view = (row, column)
+        self.plane.set_view(row, column)
+        self.game_grid = self.plane.to_grid()
+        self.update_grid()
+
+    def show_generation(self, generation):
+        """
+        Displays an iteration of the last simulation, rebuilt from the history. Starting a simulation afterwards starts
+        from this iteration.
+        :param generation: Number of the iteration.
+        """
+        if self.game_state:
+            return
+            # The history cannot be browsed while a simulation is running.
+        if self.worker is not None:
+            self.worker.join()
+            # A stopped simulation may still be finishing its last generation, and adding it to the history.
+            self.end_worker(self.worker)
+        if self.history is None or generation not in self.history:
+            self.alert("This iteration is not in the history !")
+            return
+        self.game_grid = self.history.get(generation)
+        self.forget_plane()
+        self.random_info = None
+        self.history_position = generation
+        self.update_grid()
+        self.update_history_text()
+
+    def go_to_generation(self):
+        """
+        Displays the iteration written in the history entry.
+        """
+        try:
+            generation = int(self.history_entry.get())
+        except ValueError:
+            self.alert("Please enter an Integer !")
+            return
+        self.show_generation(generation)
+
+    def update_history_text(self):
+        """
+        Updates the label showing the displayed iteration and the iterations kept in the history.
+        """
+        self.history_text.set("Iteration " + str(self.history_position) + " (" + str(self.history.first) + " to " +
+                              str(self.history.last) + " kept)")
 
     def create(self):
         """
@@ -370,16 +618,29 @@ class MainWindow(tk.Frame):  # creates the main window
         self.game_grid = []
         self.game_grid = generate_empty_grid(gridsize)
         # Creation of the list containing state of every cells (all empty by default).
+        self.random_info = None
+        self.history = None
+        self.history_text.set("")
+        self.forget_plane()
+        # The history of the previous simulation does not apply to the new grid.
         self.game_frame.destroy()
         # Clean the previous grid by removing the frame.
         self.game_frame = tk.Frame(self)
         self.game_frame.grid(sticky="w", column=1, row=2)
         # Creates a new frame in the mainwindow. This frame is placed below the option frame and will only contain the
         # game grid.
-        self.canvas_grid = tk.Canvas(self.game_frame, width=10 * gridsize, height=10 * gridsize, highlightthickness=0,
+        self.viewport = Viewport(gridsize)
+        self.viewport.mode = "density" if self.var_density else "dominant"
+        # Each cell is 10X10 pixels large if the grid fits in the canvas. Larger grids start zoomed out, to show the
+        # whole grid.
+        extent = self.viewport.extent
+        self.canvas_grid = tk.Canvas(self.game_frame, width=extent, height=extent, highlightthickness=0,
                                      relief="ridge", bg="white")
-        # The canvas size will be 10 times that of the grid size. This unit is in pixel, meaning each cell will be 10X10
         self.canvas_grid.pack()
+        self.grid_image = tk.PhotoImage(width=extent, height=extent)
+        self.canvas_grid.create_image(0, 0, image=self.grid_image, anchor="nw")
+        # The cells are drawn as pixels in a single image instead of one rectangle per cell, so that changing a cell
+        # does not require deleting and creating canvas items.
         self.update_grid()
         # Filling the frame with a white canvas that will act as the grid.
         self.canvas_grid.bind("<Button 1>", self.get_coord)
@@ -388,6 +649,13 @@ class MainWindow(tk.Frame):  # creates the main window
         self.canvas_grid.bind("<B1-Motion>", self.get_coord)
         # This line allows to capture the coordinates when the user click-draw somewhere on the canvas. <B1-Motion>
         # refers to the mouse left click being pressed and mouse moving.
+        self.canvas_grid.bind("<MouseWheel>", lambda event: self.zoom(1 if event.delta > 0 else -1, event.x, event.y))
+        self.canvas_grid.bind("<Button 4>", lambda event: self.zoom(1, event.x, event.y))
+        self.canvas_grid.bind("<Button 5>", lambda event: self.zoom(-1, event.x, event.y))
+        # The mouse wheel zooms around the cell under the mouse (<Button 4> and <Button 5> are the wheel on Linux).
+        self.canvas_grid.bind("<Button 3>", self.start_drag)
+        self.canvas_grid.bind("<B3-Motion>", self.drag_view)
+        # Dragging the canvas with the right button moves the part of the grid shown.
 
     def get_coord(self, event):
         """
@@ -395,15 +663,51 @@ class MainWindow(tk.Frame):  # creates the main window
         grid.
         :param event: a tkinter object with x and y coordinates.
         """
-        if int(event.x / 10) >= len(self.game_grid) or int(event.y / 10) >= len(self.game_grid):
+        cell = self.viewport.cell_at(event.x, event.y)
+        if cell is None:
+            return
+        # The click may be outside of the grid, when the canvas is zoomed out beyond the whole grid or dragged out of
+        # the canvas.
+        self.toggle(cell[0], cell[1])
+        # The viewport divides the mouse coordinates by the number of pixels per cell and adds the first cell shown.
+        # For example, at 10 pixels per cell, a click on (49, 13) (pixel units) of a canvas showing the grid from its
+        # first cell is the cell (4, 1). When zoomed out, the click is on the top left cell of the block of the pixel.
+
+    def zoom(self, steps, x=None, y=None):
+        """
+        Zooms the canvas in or out, keeping the cell under the mouse in place.
+        :param steps: Number of levels to zoom in (positive) or out (negative).
+        :param x: Horizontal coordinate of the mouse on the canvas, or None for the centre of the canvas.
+        :param y: Vertical coordinate of the mouse on the canvas.
+        """
+        if self.viewport.zoom(steps, x, y):
+            self.update_grid()
+
+    def zoom_fit(self):
+        """
+        Zooms out enough to show the whole grid on the canvas.
+        """
+        self.viewport.fit()
+        self.update_grid()
+
+    def start_drag(self, event):
+        """
+        Remembers where the user started to drag the canvas.
+        :param event: a tkinter object with x and y coordinates.
+        """
+        self.drag_start = (event.x, event.y)
+
+    def drag_view(self, event):
+        """
+        Moves the part of the grid shown as the user drags the canvas.
+        :param event: a tkinter object with x and y coordinates.
+        """
+        if self.drag_start is None:
             return
-        # Because of the canvas generation, there is 1 line/column dead pixel on the right and on the bottom of the
-        # canvas, so we need to check if it's clicked in this dead line/column pixel
-        self.toggle(int(event.x / 10), int(event.y / 10))
-        # The canvas coordinates span from 0 to 10 times the number of rows or columns. Each cell is 10X10 pixel large.
-        # The coordinates on which the user clicks are here transformed into rows and column by dividing the mouse
-        # coordinates by 10. For example, if the user clicks on (49, 13) (pixel units), the integer division will
-        # transform the pixels into rows columns by rounding to the inferior integer = (4, 1).
+        if self.viewport.pan_pixels(self.drag_start[0] - event.x, self.drag_start[1] - event.y):
+            self.drag_start = (event.x, event.y)
+            self.update_grid()
+        # The start is kept until the mouse has moved by a whole cell.
 
     def toggle(self, row, column):
         """
@@ -418,70 +722,239 @@ class MainWindow(tk.Frame):  # creates the main window
         # If a simulation is currently running, toggle will do nothing, meaning it will have no effect when the user
         # clicks on the canvas.
         self.game_grid[row][column] = configuration["colors"].index(str.lower(self.drop_menu_cell_type.cget("text")))
-        self.canvas_grid.create_rectangle(row * 10, column * 10,
-                                          10 + (row * 10), 10 + (column * 10), outline="",
-                                          fill=str.lower(self.drop_menu_cell_type.cget("text")))
+        self.draw_cell(row, column, self.game_grid[row][column])
+        self.random_info = None
+        if self.plane is not None:
+            self.plane.set_cell(row, column, self.game_grid[row][column])
+            # The cell is also changed on the plane of the sparse engine, on which the next simulation continues.
         # Otherwise, it will change the state of the cell on which the function is called to the value selected in the
         # cell type drop menu. It will also change the color of the corresponding canvas area to the color matching the
         # index of the string of the drop menu.
 
-    def random_seed(self, grid):
+    def random_seed(self, grid, seed=None, densities=None, area=None):
         """
-        Generates random states for every cell in the current grid.
+        Generates random states for the cells of the current grid (see Random_GoL.random_fill).
         :param grid: Grid of state.
+        :param seed: Seed of the random generator, or None for a new one.
+        :param densities: Densities of each color, or None to make every state (including white) equally likely.
+        :param area: (first row, first column, number of rows, number of columns) of the rectangle to fill, or None for
+        the whole grid.
+        :return: The dictionary describing the fill, with the seed used.
         """
-        for i in range(0, len(grid)):
-            # Iterating over lines in the grid.
-            for j in range(0, len(grid[i])):
-                # Iterating over columns in a line of the grid.
-                grid[i][j] = random.randint(0, len(configuration["colors"]) - 1)
-                # Every cell in the grid is assigned a random state in the colour list.
+        empty = not any(any(row) for row in grid)
+        info = random_fill(grid, seed, densities, area)
+        self.forget_plane()
+        if empty or info["area"] == [0, 0, len(grid), len(grid)]:
+            self.random_info = info
+            # The grid can be generated again from an empty grid with the same fill.
+        else:
+            self.random_info = None
         self.update_grid()
         # The randomized grid is passed to the update_grid method to apply changes to the canvas.
+        return info
+
+    def window_random(self):
+        """
+        Opens a window in which the user chooses the random seed, the densities of the colors and the rectangle of a
+        random fill of the grid.
+        """
+        if self.win_open["rd"]:
+            return
+        self.win_open["rd"] = True
+        self.rd = tk.Toplevel()
+        self.rd.title("Random Seed")
+        self.rd.protocol('WM_DELETE_WINDOW', self.close_random)
+        tk.Label(self.rd, text="Random seed :").grid(column=0, row=0, sticky="w")
+        self.entry_random_seed = tk.Entry(self.rd, width=14)
+        self.entry_random_seed.grid(column=1, row=0, padx=4, pady=5)
+        tk.Label(self.rd, text="(empty: new seed)").grid(column=2, row=0, sticky="w")
+        tk.Label(self.rd, text="Densities :").grid(column=0, row=1, sticky="w")
+        self.entry_densities = tk.Entry(self.rd, width=14)
+        self.entry_densities.insert(0, "uniform")
+        self.entry_densities.grid(column=1, row=1, padx=4, pady=5)
+        tk.Label(self.rd, text="(uniform, 0.05 or one per color: 0.1,0.2...)").grid(column=2, row=1, sticky="w")
+        tk.Label(self.rd, text="Rectangle :").grid(column=0, row=2, sticky="w")
+        self.entry_random_area = tk.Entry(self.rd, width=14)
+        self.entry_random_area.grid(column=1, row=2, padx=4, pady=5)
+        tk.Label(self.rd, text="(row,column,rows,columns; empty: whole grid)").grid(column=2, row=2, sticky="w")
+        tk.Button(self.rd, text="Fill", command=lambda: self.fill_random()).grid(column=0, row=3, pady=5)
+        tk.Button(self.rd, text="Close", command=lambda: self.close_random()).grid(column=1, row=3, pady=5)
+        # The seed used by the last fill is written in the seed entry, so that the same board can be generated again.
+
+    def fill_random(self):
+        """
+        Fills the grid with the values of the Random Seed window.
+        """
+        if self.game_state:
+            return
+            # The grid cannot be changed during a simulation.
+        try:
+            seed = int(self.entry_random_seed.get()) if self.entry_random_seed.get().strip() else None
+            densities = parse_densities(self.entry_densities.get(), len(configuration["colors"]))
+            area = None
+            if self.entry_random_area.get().strip():
+                area = [int(value) for value in self.entry_random_area.get().split(",")]
+                if len(area) != 4:
+                    raise ValueError("The rectangle is written row,column,rows,columns")
+            info = self.random_seed(self.game_grid, seed, densities, area)
+        except ValueError as error:
+            self.alert(str(error))
+            return
+        self.entry_random_seed.delete(0, "end")
+        self.entry_random_seed.insert(0, str(info["seed"]))
+
+    def close_random(self):
+        """
+        Closes the Random Seed window.
+        """
+        self.rd.destroy()
+        self.win_open["rd"] = False
 
     def update_grid(self):
         """
-        This method updates the color of the canvas grid  using the values in the grid of states.
+        This method updates the color of the canvas grid  using the values in the grid of states. Only the cells shown
+        by the viewport are read.
         :return: The updated canvas.
         """
-        self.canvas_grid.delete(tk.ALL)
-        # Deletes all rectangles existing on the canvas.
-        for i in range(0, len(self.game_grid)):
-            for j in range(0, len(self.game_grid[i])):
-                # Loops through lines and columns of the grid of states.
-                if configuration["colors"][self.game_grid[i][j]] != "white":
-                    self.canvas_grid.create_rectangle(10 * i, 10 * j, (10 * i) + 10, (10 * j) + 10, outline="",
-                                                      fill=configuration["colors"][self.game_grid[i][j]])
-                    # For each cell, creates a rectangle on the canvas, with a color corresponding to the state in the
-                    # game grid.
+        extent = self.viewport.extent
+        self.grid_image.put(self.color_code("gray80"), to=(0, 0, extent, extent))
+        # Clears the whole image. The part of the canvas beyond the grid, when zoomed out, stays gray.
+        rows = self.viewport.image_rows(self.game_grid, self.state_codes())
+        if not rows:
+            return
+        units = tk.PhotoImage(width=len(rows[0].split()), height=len(rows))
+        units.put(" ".join(rows), to=(0, 0))
+        # The image of the cells (or blocks of cells) shown is written at once, one pixel per cell.
+        pixels = self.viewport.pixels
+        self.grid_image.tk.call(str(self.grid_image), "copy", str(units), "-zoom", pixels, pixels)
+        # Then it is enlarged into the image of the canvas, each cell becoming a square of pixels.
+
+    def update_cells(self, changes):
+        """
+        This method only redraws the cells that changed since the last frame. Its cost depends on the number of changes
+        instead of the size of the grid.
+        :param changes: List of (row, column, new state) tuples, as given by the simulation.
+        """
+        units = self.viewport.units()
+        if len(changes) > units[0] * units[1] // 8:
+            self.update_grid()
+            return
+            # When a large part of the canvas changed, drawing it at once is faster.
+        if self.viewport.block == 1:
+            for i, j, state in changes:
+                self.draw_cell(i, j, state)
+            return
+        boxes = {}
+        for i, j, state in changes:
+            box = self.viewport.cell_box(i, j)
+            if box is not None:
+                boxes[box] = (i, j)
+        # When zoomed out, several changes may fall in the same block, which is redrawn once.
+        codes = self.state_codes()
+        for box in boxes:
+            self.grid_image.put(self.viewport.unit_code(self.game_grid, boxes[box][0], boxes[box][1], codes), to=box)
+
+    def draw_cell(self, row, column, state):
+        """
+        Fills the square of pixels of a cell with the color of its state, if it is shown. When zoomed out, the pixel of
+        its block is drawn again instead, from the grid of states.
+        :param row: Row of the cell in the grid of states.
+        :param column: Column of the cell in the grid of states.
+        :param state: State of the cell.
+        """
+        box = self.viewport.cell_box(row, column)
+        if box is None:
+            return
+        if self.viewport.block == 1:
+            self.grid_image.put(self.color_code(configuration["colors"][state]), to=box)
+        else:
+            self.grid_image.put(self.viewport.unit_code(self.game_grid, row, column, self.state_codes()), to=box)
+
+    def state_codes(self):
+        """
+        :return: The "#rrggbb" codes of the colors of the states.
+        """
+        return [self.color_code(color) for color in configuration["colors"]]
+
+    def color_code(self, color):
+        """
+        Converts a color name into the "#rrggbb" code used to fill the image. Names such as "dark green" contain spaces,
+        which the image would read as two colors.
+        :param color: Name of the color.
+        :return: The hexadecimal code of the color.
+        """
+        if color not in self.color_codes:
+            red, green, blue = self.winfo_rgb(color)
+            self.color_codes[color] = "#%02x%02x%02x" % (red // 256, green // 256, blue // 256)
+        return self.color_codes[color]
 
     def import_seed(self, seed_name):
         """
         This method applies the seed chosen by the user to both the grid of states and the canvas grid.
         :param seed_name: The name of the seed to import
         """
-        self.load_seeds()
         self.size_entry.delete(0, "end")
         # Deletes the current value in the entry defining the size of the grid.
-        self.size_entry.insert(0, len(self.seed_store[seed_name]["seed"]))
+        self.size_entry.insert(0, self.seed_store.info(seed_name)["size"])
         # Insert a new value corresponding to the length of the grid of the desired seed in the same entry.
         self.create()
         # An empty grid of states and a corresponding grid of buttons is generated using the value in self.size_entry.
-        self.game_grid = self.seed_store[seed_name]["seed"]
-        configuration["rules"] = self.seed_store[seed_name]["rules"]
-        configuration["colors"] = self.seed_store[seed_name]["colors"]
+        seed = self.seed_store[seed_name]
+        # The grid of the seed is only read and decoded from the library at this moment.
+        self.game_grid = seed["seed"]
+        self.random_info = seed.get("random")
+        configuration["rules"] = seed["rules"]
+        configuration["colors"] = seed["colors"]
+        compile_rules()
+        # The rules are compiled once into the lookup tables used by the engines.
         self.update_colors()
         # The empty grid of states is replaced by the grid of the seed
         self.update_grid()
         # The buttons are updated according to the new grid of states.
 
+    def import_rle(self):
+        """
+        This method asks the user for a pattern in RLE format and applies it to both the grid of states and the canvas
+        grid. The pattern is centred in a grid of the size written in the size entry, or of its own size if it is
+        larger.
+        """
+        path = filedialog.askopenfilename(filetypes=[("RLE patterns", "*.rle"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            size = int(self.size_entry.get())
+        except ValueError:
+            size = None
+        try:
+            seed = read_rle(path, size)
+        except (IOError, ValueError) as error:
+            self.alert(str(error))
+            return
+        self.size_entry.delete(0, "end")
+        self.size_entry.insert(0, len(seed["seed"]))
+        self.create()
+        self.game_grid = seed["seed"]
+        configuration["rules"] = seed["rules"]
+        configuration["colors"] = seed["colors"]
+        compile_rules()
+        self.update_colors()
+        self.update_grid()
+        # Same steps as when a seed of the library is imported.
+
+    def export_rle(self):
+        """
+        This method asks the user for a file name and writes the current grid of states in it, in RLE format.
+        """
+        path = filedialog.asksaveasfilename(defaultextension=".rle", filetypes=[("RLE patterns", "*.rle")])
+        if path:
+            write_rle(path, self.game_grid)
+
     def save_seed(self, my_seed):
         """
-        This method should save the seed on which it is called into the text file and create a new command in the seed
-        menu of the main window, allowing the user to import it.
+        This method should save the seed on which it is called into the seed library and create a new command in the
+        seed menu of the main window, allowing the user to import it.
         :param my_seed: a dictionary with a single entry. The key is the name of the seed, the value is its state grid.
         """
-        self.load_seeds()
         for name in my_seed:
             if not str(name) == "AutoSave":
                 if str(name) in self.seed_store:
@@ -493,13 +966,17 @@ class MainWindow(tk.Frame):  # creates the main window
                 self.alert("Emtpy String !")
                 # Displays another alert message if the name is empty
                 return
-            self.seed_store[str(name)] = {"colors": configuration["colors"], "rules": configuration["rules"],
-                                          "seed": my_seed[name]}
-            # If none of those case happened, the function proceeds normally and adds the seed to the seed_store
-            # dictionary. Note if this is an autosave, it will erase the previous autosave.
-        self.write_file()
+            seed = {"colors": configuration["colors"], "rules": configuration["rules"], "seed": my_seed[name],
+                    "hybrid": self.var_hybrid}
+            if self.random_info is not None:
+                seed["random"] = self.random_info
+                # A random board is saved as its random seed, densities and rectangle, and generated again when it
+                # is imported.
+            self.seed_store[str(name)] = seed
+            # If none of those case happened, the function proceeds normally and adds the seed to the seed library,
+            # which writes it to the disk. Note if this is an autosave, it will erase the previous autosave.
         self.refresh_seeds_menu()
-        # Writing the new seed into the seeds.txt file and refreshing the dropdown menu.
+        # Refreshing the dropdown menu.
 
         if self.win_open["sw"]:
             self.sw.destroy()
@@ -509,40 +986,22 @@ class MainWindow(tk.Frame):  # creates the main window
 
     def load_seeds(self):
         """
-        This method loads the seeds from the text file and stores it in the seed_store dictionary.
+        This method opens the seed library (seeds.idx) in the same directory as the program. Only the index of the seeds
+        is read; their grids are read when they are imported. The library stays open, and is only opened again when its
+        files are replaced. If the library does not exist yet, it is created from
+        seeds.txt, or from the backup file default.txt.
         """
-        try:
-            seed_file = open(join(getcwd(), "seeds.txt"), 'r')
-            # Tries to open the file called seeds.txt in the same directory as the program in read mode.
-            seed_string = seed_file.read()
-            # Reads the file content and assigns it to a variable as a string.
-            self.seed_store = ast.literal_eval(seed_string)
-            # This function detects the dictionary structure in the file and converts the string into a dictionary
-            # object. This dictionary object is stored in the seed_store.
-            seed_file.close()
-
-        except IOError:
-            # Calls this method, creating a new file.
-            seed_file = open(join(getcwd(), "seeds.txt"), 'w')
-            # In case there was no file called seeds.txt in the directory, a new empty file is created.
-            seed_file.close()
-            self.restore_seed()
-            # This function call will rewrite the new file from a backup file.
+        self.seed_store = SeedStore(getcwd())
 
     def restore_seed(self):
         """
-        This method retrieves the original seeds from the backup file and stores this data inside a dictionary. It then
-        calls another method to rewrite the seeds.txt file from this dictionary.
+        This method retrieves the original seeds from the backup file and replaces the content of the seed library with
+        them.
         :return:
         """
-        default_file = open(join(getcwd(), "default.txt"), 'r')
-        default_string = default_file.read()
-        # Storing the original seeds in the backup file as a string.
-        self.seed_store = ast.literal_eval(default_string)
-        # Transforming the string into a dictionary.
-        default_file.close()
-        self.write_file()
-        # Rewrite seeds.txt with the content of the seed_store dictionary.
+        self.seed_store.restore()
+        self.load_seeds()
+        # The files of the library were replaced: the library is opened again from them.
         try:
             self.refresh_seeds_menu()
             # Updates the options in the seeds_menu with the new seeds.
@@ -553,24 +1012,13 @@ class MainWindow(tk.Frame):  # creates the main window
             # If the seeds management window is open, it is closed.
         self.win_open["sw"] = False
         # States the seeds management window is closed.
-        self.load_seeds()
 
     def remove_seed(self, seed_name):
         """
-        Removes a seed from the seedstore dictionary and rewrite the seeds.txt file from the dictionary, thereby
-        removing that seed from the file as well.
+        Removes a seed from the seed library, which updates its index on the disk.
         :param seed_name: The name of the seed to be removed.
         """
         del self.seed_store[str(seed_name)]
-        self.write_file()
-
-    def write_file(self):
-        """
-        Writes the seed_store dictionary into the seeds.txt file.
-        """
-        seed_file = open(join(getcwd(), "seeds.txt"), 'w')
-        seed_file.write(str(self.seed_store))
-        seed_file.close()
 
     def refresh_seeds_menu(self):
         """
@@ -581,7 +1029,9 @@ class MainWindow(tk.Frame):  # creates the main window
         self.seeds_menu.add_separator()
         self.seeds_menu.add_command(label="Manage seeds", command=lambda: self.seed_window())
         self.seeds_menu.add_separator()
-        self.seeds_menu.add_command(label="Random Seed Generation", command=lambda: self.random_seed(self.game_grid))
+        self.seeds_menu.add_command(label="Random Seed Generation", command=lambda: self.window_random())
+        self.seeds_menu.add_command(label="Import RLE pattern", command=lambda: self.import_rle())
+        self.seeds_menu.add_command(label="Export RLE pattern", command=lambda: self.export_rle())
         self.seeds_menu.add_separator()
         for name in self.seed_store:
             self.seeds_menu.add_command(label=str(name), command=lambda s=name: self.import_seed(s))
@@ -630,7 +1080,7 @@ class MainWindow(tk.Frame):  # creates the main window
     def ite_removal(self, rm_list):
         """
         Takes a list of seeds names associated with 1 or 0 values. Every seed that has its name associated with a
-        non-zero value is removed from the seed_store dictionary and the seeds.txt file.
+        non-zero value is removed from the seed library.
         :param rm_list: List of seeds to be removed.
         """
         for k in range(len(rm_list)):
@@ -643,10 +1093,12 @@ class MainWindow(tk.Frame):  # creates the main window
 
     def stop(self):
         """
-        This method changes causes the game to stop at the next iteration (iterate_sim())if a simulation is running.
+        This method stops the simulation immediately if one is running: no generation is drawn after it. The thread
+        computing the generations ends once the generation it is computing is finished.
         """
         if self.game_state:
-            self.game_to_stop = True
+            self.worker.stop()
+            self.game_state = False
             self.ite_incre = 0
 
     def window_options(self):
@@ -669,6 +1121,7 @@ class MainWindow(tk.Frame):  # creates the main window
             self.label_title[0] = tk.Label(self.wo, text="Born").grid(column=2, row=0)
             self.label_title[1] = tk.Label(self.wo, text="Lower").grid(column=3, row=0)
             self.label_title[2] = tk.Label(self.wo, text="Upper").grid(column=4, row=0)
+            self.label_title_sets = tk.Label(self.wo, text="Or B/S rule").grid(column=5, row=0)
             # Generates labels to inform the user on what the widgets do.
             for x in range(1, len(configuration["colors"])):
                 # Iterates over colors, creating 3 spinboxes for each color.
@@ -686,6 +1139,12 @@ class MainWindow(tk.Frame):  # creates the main window
                 self.options_upper[x].grid(column=4, row=x, padx=4, pady=5)
                 self.options_upper[x].delete(0, "end")
                 self.options_upper[x].insert(0, configuration["rules"][x]["upper"])
+                self.options_sets[x] = tk.Entry(self.wo, width=12)
+                self.options_sets[x].grid(column=5, row=x, padx=4, pady=5)
+                if "birth" in configuration["rules"][x]:
+                    self.options_sets[x].insert(0, format_rule(configuration["rules"][x]))
+                    # Rules with several birth values, or survival values that are not a range (such as B36/S23),
+                    # can only be written in this entry.
                 # Stores spinbox values in lists that will be used to define new rules. The default values of the
                 # spinboxes are those in the current configuration dictionary.
             self.button_save = tk.Button(self.wo, text="Save and Close", command=lambda: self.close_option(True)) \
@@ -699,19 +1158,29 @@ class MainWindow(tk.Frame):  # creates the main window
         window.
         """
         if save:
+            rules = [configuration["rules"][0]]
             try:
                 for x in range(1, len(configuration["colors"])):
+                    if self.options_sets[x].get().strip():
+                        rules.append(parse_rule(self.options_sets[x].get().strip()))
+                        if rules[x] is None:
+                            self.alert("Please enter a rule such as B36/S23 !")
+                            return
+                        continue
+                        # A rule written in the B/S notation replaces the spinboxes.
                     if not int(self.options_lower[x].get()) <= int(self.options_upper[x].get()):
                         self.alert("Lower value has to be smaller than Upper value !")
                         return
-                    configuration["rules"][x]["born"] = int(self.options_born[x].get())
-                    configuration["rules"][x]["lower"] = int(self.options_lower[x].get())
-                    configuration["rules"][x]["upper"] = int(self.options_upper[x].get())
-                    # For each color, the rules are updated in the configuration dictionary.
+                    rules.append({"born": int(self.options_born[x].get()), "lower": int(self.options_lower[x].get()),
+                                  "upper": int(self.options_upper[x].get())})
             except ValueError:
                 self.alert("Please enter an Integer !")
                 # Error message in case there is a non numeric value in one of the spinboxes.
                 return
+            configuration["rules"] = rules
+            compile_rules()
+            # The rules of all colors are updated in the configuration dictionary, then compiled once into the lookup
+            # tables used by the engines.
         if self.win_open["op"]:
             self.wo.destroy()
             self.win_open["op"] = False
@@ -737,6 +1206,7 @@ class MainWindow(tk.Frame):  # creates the main window
             configuration["colors"] = color_list[0:int(self.spinbox_cell_n_color.get()) + 1]
             configuration["rules"] = [{"born": 3, "lower": 2, "upper": 3} for length in
                                       range(len(configuration["colors"]))]
+            compile_rules()
             # The configuration dictionary is updated from the value in the spinbox.
             self.update_colors()
             self.create()
@@ -754,6 +1224,7 @@ class MainWindow(tk.Frame):  # creates the main window
         self.options_born = [0] * len(configuration["colors"])
         self.options_lower = [0] * len(configuration["colors"])
         self.options_upper = [0] * len(configuration["colors"])
+        self.options_sets = [0] * len(configuration["colors"])
         self.label_title = [0] * len(configuration["rules"][1])
         self.drop_menu_cell_type.destroy()
         self.value.set(str.upper(configuration["colors"][1]))
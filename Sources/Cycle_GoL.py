@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Detection of cycles: a grid that comes back to a previous generation repeats the same generations forever (a steady
+state is a cycle of period 1). Each generation is identified by a 64 bits hash of the grid, the XOR of a key for every
+non-empty cell and its color. The hash is updated from the cells that changed at each step, so it costs the number of
+changes and not the size of the grid. The hashes of the last generations are kept in a table; when the hash of a new
+generation is found in it (with the same population), the period and the first generation of the cycle are known, and
+the population of any later generation can be given without computing it.
+"""
+from collections import deque
+
+mask = (1 << 64) - 1
+
+
+def cell_key(index, color):
+    """
+    Key of a cell in the hash of a grid, obtained by mixing its position and color (splitmix64), so that no table of
+    keys needs to be stored.
+    :param index: Position of the cell, row * size + column.
+    :param color: Color of the cell, not 0.
+    :return: A 64 bits integer.
+    """
+    z = ((index << 8) + color + 0x9E3779B97F4A7C15) & mask
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+    return z ^ (z >> 31)
+
+
+class CycleDetector(object):
+    """
+    Rolling hash of a grid and table of the hashes of its last generations.
+    """
+
+    def __init__(self, grid, history=4096):
+        """
+        :param grid: 2D list containing the states of the first generation. It is copied.
+        :param history: Number of generations kept in the table. Cycles longer than this are not detected.
+        """
+        self.size = len(grid)
+        self.grid = [list(row) for row in grid]
+        # States of the current generation, needed to know the previous color of the changed cells.
+        self.history = history
+        self.hash = 0
+        for i in range(0, self.size):
+            for j in range(0, self.size):
+                if self.grid[i][j]:
+                    self.hash ^= cell_key(i * self.size + j, self.grid[i][j])
+        self.table = {}
+        # Generation of each hash of the table.
+        self.recorded = deque()
+        # (generation, hash) of the generations of the table, oldest first, to remove them from the table.
+        self.populations = {}
+        # Population of each generation of the table.
+        self.cycle = None
+        # (first generation, period) of the cycle, once it is found.
+
+    def update(self, changes):
+        """
+        Updates the hash with the cells that changed during a step.
+        :param changes: List of (row, column, new state) tuples.
+        """
+        for i, j, state in changes:
+            old = self.grid[i][j]
+            if old:
+                self.hash ^= cell_key(i * self.size + j, old)
+            if state:
+                self.hash ^= cell_key(i * self.size + j, state)
+            self.grid[i][j] = state
+
+    def record(self, generation, population):
+        """
+        Adds the current generation to the table, and checks if it repeats an earlier one.
+        :param generation: Number of the current generation.
+        :param population: List of the number of cells of each color of the current generation.
+        :return: (first generation, period) of the cycle if one was found, otherwise None.
+        """
+        if self.cycle is not None:
+            return self.cycle
+        previous = self.table.get(self.hash)
+        if previous is not None and self.populations[previous] == list(population):
+            # With 64 bits hashes, the chance that two different grids have the same hash and population is negligible.
+            self.cycle = (previous, generation - previous)
+            return self.cycle
+        self.table[self.hash] = generation
+        self.recorded.append((generation, self.hash))
+        self.populations[generation] = list(population)
+        if len(self.recorded) > self.history:
+            old_generation, old_hash = self.recorded.popleft()
+            if self.table.get(old_hash) == old_generation:
+                del self.table[old_hash]
+            del self.populations[old_generation]
+        return None
+
+    def population_at(self, generation):
+        """
+        Gives the population of a generation from the cycle, without computing it. Requires a cycle to be found.
+        :param generation: Number of a generation, at least the first generation of the cycle.
+        :return: List of the number of cells of each color.
+        """
+        start, period = self.cycle
+        return list(self.populations[start + (generation - start) % period])
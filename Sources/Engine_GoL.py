@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Core rules of the game: the shared configuration and the functions computing one generation on a grid of states.
+This module does not depend on tkinter, so it can be used without a display.
+"""
+
+configuration = {"colors": ["white", "black", "red", "blue"]}
+configuration["rules"] = [{"born": 3, "lower": 2, "upper": 3} for x in range(len(configuration["colors"]))]
+
+color_list = ["white", "black", "red", "blue", "dark green", "orange", "purple", "pink", "yellow", "peach puff",
+              "firebrick", "royal blue", "chocolate", "turquoise", "gold", "sienna", "green", "deep pink", "cyan"]
+
+compiled_rules = None
+# RuleTable of the current configuration, see rule_table.
+
+
+def rule_sets(rule):
+    """
+    :param rule: Rules of a color: a dictionary with "born", "lower" and "upper" (born with exactly born neighbours,
+    survives with lower to upper neighbours) and optionally "birth" and "survival", the lists of all the numbers of
+    neighbours for which the cell is born and survives (for example [3, 6] and [2, 3] for B36/S23). When they are
+    present, "birth" and "survival" are used instead of the first three.
+    :return: The numbers of neighbours for which the cell is born and for which it survives, as two frozensets.
+    """
+    if "birth" in rule:
+        return frozenset(rule["birth"]), frozenset(rule["survival"])
+    return frozenset([rule["born"]]), frozenset(range(rule["lower"], rule["upper"] + 1))
+
+
+def make_rule(birth, survival):
+    """
+    :param birth: Numbers of neighbours for which a cell is born.
+    :param survival: Numbers of neighbours for which a cell survives.
+    :return: The rule dictionary of a color. "birth" and "survival" are only added when the rule cannot be written with
+    a single born value and a range of survival values; "born", "lower" and "upper" are then the nearest such rule.
+    """
+    birth, survival = sorted(set(birth)), sorted(set(survival))
+    rule = {"born": birth[0] if birth else 9, "lower": survival[0] if survival else 9,
+            "upper": survival[-1] if survival else 0}
+    # 9 neighbours is never reached, and lower > upper never survives: empty sets are written exactly.
+    if len(birth) > 1 or (survival and survival != list(range(survival[0], survival[-1] + 1))):
+        rule["birth"] = birth
+        rule["survival"] = survival
+    return rule
+
+
+def count_runs(values):
+    """
+    :param values: Set of numbers of neighbours.
+    :return: List of the (lowest, highest) bounds of the ranges of consecutive numbers in values, for example
+    [(3, 3), (6, 8)] for {3, 6, 7, 8}.
+    """
+    runs = []
+    for n in sorted(values):
+        if runs and runs[-1][1] == n - 1:
+            runs[-1] = (runs[-1][0], n)
+        else:
+            runs.append((n, n))
+    return runs
+
+
+class RuleTable(object):
+    """
+    Rules of the configuration compiled into lookup tables, so that the engines do not read the rule dictionaries for
+    every cell. allowed[x][same][count] is True if a cell can be of color x at the next generation, where same is 1 if
+    the cell is already of color x (survival) and 0 otherwise (birth), and count its number of neighbours of color x.
+    The engines working on whole planes use the birth and survival sets, or their ranges of consecutive values.
+    """
+
+    def __init__(self, colors, rules):
+        """
+        :param colors: List of the colors.
+        :param rules: List of the rule dictionaries of each color (see rule_sets).
+        """
+        self.colors = list(colors)
+        self.rules = [dict(rule) for rule in rules]
+        # Copy of the rules, to detect later changes of the configuration.
+        self.n_colors = len(colors)
+        self.birth = [frozenset()]
+        self.survival = [frozenset()]
+        self.birth_runs = [[]]
+        self.survival_runs = [[]]
+        self.allowed = [((False,) * 9, (False,) * 9)]
+        # Color 0 is never "possible": a cell for which no color is possible dies.
+        for x in range(1, self.n_colors):
+            birth, survival = rule_sets(rules[x])
+            self.birth.append(birth)
+            self.survival.append(survival)
+            self.birth_runs.append(count_runs(birth))
+            self.survival_runs.append(count_runs(survival))
+            self.allowed.append((tuple(n in birth for n in range(9)), tuple(n in survival for n in range(9))))
+
+    def matches(self, config):
+        """
+        :param config: Dictionary with "colors" and "rules", like configuration.
+        :return: True if the table was compiled from these colors and rules.
+        """
+        return self.colors == config["colors"] and self.rules == config["rules"]
+
+    def next_state(self, cell, counts, hybridization=False):
+        """
+        Computes the next state of a single cell. Colors are visited in increasing order, so the last possible color
+        wins; with hybridization, a cell that can become both colors x and x-2 (x > 2) becomes x-1.
+        :param cell: The current state of the cell.
+        :param counts: List of the number of neighbours of each color around the cell.
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        :return: The state of the cell at the next generation.
+        """
+        allowed = self.allowed
+        if self.n_colors == 2:
+            return 1 if allowed[1][cell == 1][counts[1]] else 0
+        new_state = 0
+        possible = [False] * self.n_colors
+        for x in range(1, self.n_colors):
+            if allowed[x][cell == x][counts[x]]:
+                possible[x] = True
+                if hybridization and x > 2 and possible[x - 2]:
+                    new_state = x - 1
+                else:
+                    new_state = x
+        return new_state
+
+
+def compile_rules(config=configuration):
+    """
+    Compiles the rules of a configuration into the RuleTable used by the engines. It is called when the rules are
+    saved in the Settings window or a seed is imported.
+    :param config: Dictionary with "colors" and "rules", like configuration.
+    :return: The new RuleTable.
+    """
+    global compiled_rules
+    compiled_rules = RuleTable(config["colors"], config["rules"])
+    return compiled_rules
+
+
+def rule_table():
+    """
+    :return: The RuleTable of the current configuration. It is compiled again if the colors or rules were changed
+    without calling compile_rules (by a script, or in a worker process of the tiled engine).
+    """
+    if compiled_rules is None or not compiled_rules.matches(configuration):
+        return compile_rules()
+    return compiled_rules
+
+
+def generate_empty_grid(size, nei=False):
+    """
+    This function generates an empty square grid (i.e. made only of 0's). The size of the grid is chosen by the user.
+    :param nei: Boolean to check if the grid generated needs to be a triple nested to represent the empty grid of
+    neighbour count.
+    :param size: the length of the grid's sides. (width = height)
+    :return: A 2D list containing only 0's representing the initial state (no live cell).
+    """
+    empty_grid = [[0] * size for _ in range(size)]
+    # For loop because simply multiplying a list to reproduce it would cause python to consider all sub-lists to be the
+    # same item and any modification would apply to all the sub-lists.
+    if nei:
+        for width in range(0, len(empty_grid)):
+            for height in range(0, len(empty_grid[width])):
+                empty_grid[width][height] = [0] * len(configuration["colors"])
+                # Iterates over lines and columns to generate a list of 0's from each cell. This list is as long as
+                # the number of colors there are in configuration. This will allow to store different neighbours.
+    return empty_grid
+
+
+def get_neighbour(state):
+    """
+    This function calculates the number of live neighbours for each cell on the grid.
+    :param state: This is the list containing all the states live/dead of the cells
+    :return: A list with the same structure as the input list is returned. However, instead of representing the state
+    (0/1), the values represent the number of living neighbours for each cell.
+    """
+    count_neigh = generate_empty_grid(len(state), True)
+    # Generates an empty grid for neighbour counting, same size as the game grid.
+
+    for i in range(0, len(state)):
+        # Iterates over each line of the game grid
+        for j in range(len(state[i])):
+            # Iterates over each column within the line of the game grid
+            for x in range(i - 1, i + 2):
+                # Iterates vertically over each neighbour of the current cell.
+                if 0 <= x < len(state):
+                    # Prevents the iterations from exiting the upper and lower borders of the game grid.
+                    for y in range(j - 1, j + 2):
+                        # Iterates horizontally over neighbours of the current cell.
+                        if 0 <= y < len(state[x]) and not (state[x][y] == 0 or (x == i and y == j)):
+                            # Prevents the iterations from exiting the left and right borders of the game grid.
+                            # Adding 1 neighbour to the count if the neighbour is alive and not on the
+                            # same position as the cell in game grid (cannot be a neighbour of itself).
+                            count_neigh[i][j][state[x][y]] += 1
+                            # The count is added to the corresponding color. (for example if the color of the
+                            # neighbouring cell is red, its state is 2. It will then add a count to the index 2 in the
+                            # list for the cell in [i][j] in neighbour count.
+    return count_neigh
+
+
+def process_changes(count_neigh, grid, hybridization=False):
+    """
+    This function processes the new number of live cells in the grid, based on a set of rules. The modifications are
+    directly applied on the input grid.
+    :param hybridization: blabla
+    :param count_neigh: This is a 2D list containing the number of live neighbours for each cell. This list is obtained
+    with the get_neighbour(state) function.
+    :param grid: This is the grid containing all the states of the cells (0/1). The modifications are directly applied
+    on this list.
+    :return: The returned grid is simply the same list that has been used as an input, after modifications.
+    (0/1), the values represent the number of living neighbours for each cell.
+    """
+    table = rule_table()
+    # The rules are only read from the configuration once per generation, see RuleTable.
+    for i in range(0, len(grid)):
+        # Iterating over lines in the grid.
+        for j in range(0, len(grid[i])):
+            # Iterating over columns in a line of the grid.
+            grid[i][j] = table.next_state(grid[i][j], count_neigh[i][j], hybridization)
+            # For each color, the table tells if the cell is born (it is not of that color and the number of
+            # surrounding cells of that color allows birth) or survives (it is of that color and the number of
+            # neighbours of that color allows survival). The cell takes the last possible color, or the color between
+            # x and x-2 when both are possible in hybridization mode, and dies/stays empty when no color is possible.
+    return grid
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+Export of the generations of a simulation as images, without the display: each generation is drawn directly from the
+grid of states, with the colors of the configuration, as a sequence of PNG images, an animated GIF or a frame stack.
+The simulation only copies the grid of each exported generation into a bounded queue; a separate process takes the
+frames from the queue, draws, compresses and writes them, so that the simulation does not wait for the encoding (it
+only waits if the queue is full, which keeps the memory bounded). The images are oriented like the canvas of the
+interface: the cell grid[i][j] is drawn at x = i, y = j.
+
+The kind of export is given by the extension of the path:
+- ".png": one PNG image per generation, numbered after the generation (run.png gives run_000000.png,
+  run_000001.png...), or with a pattern such as "frames/%05d.png";
+- ".gif": an animated GIF, looping forever;
+- any other extension: a frame stack, i.e. all the frames one after the other, one byte per pixel (the state of the
+  cell drawn there), which can be memory mapped with FrameStack, for example as a NumPy array of shape (frames,
+  height, width).
+
+Frame stack layout:
+- the 8 bytes b"GOLFRM1\\n";
+- the length of the header, as a 4 bytes little-endian unsigned integer;
+- the header, a JSON dictionary with the width and height of the frames, the colors and their (red, green, blue)
+  values, the scale (pixels per cell), the first generation and the number of generations between two frames, padded
+  with spaces so that the frames start at a multiple of 8 bytes;
+- the frames, width X height bytes each, row after row.
+As for the binary population table, the number of frames is given by the size of the file.
+
+The PNG and GIF encoders are written in Python, with the zlib module, so that no image library is required.
+"""
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import zlib
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+rgb_codes = {"white": (255, 255, 255), "black": (0, 0, 0), "red": (255, 0, 0), "blue": (0, 0, 255),
+             "dark green": (0, 100, 0), "orange": (255, 165, 0), "purple": (160, 32, 240), "pink": (255, 192, 203),
+             "yellow": (255, 255, 0), "peach puff": (255, 218, 185), "firebrick": (178, 34, 34),
+             "royal blue": (65, 105, 225), "chocolate": (210, 105, 30), "turquoise": (64, 224, 208),
+             "gold": (255, 215, 0), "sienna": (160, 82, 45), "green": (0, 255, 0), "deep pink": (255, 20, 147),
+             "cyan": (0, 255, 255)}
+# (red, green, blue) values of the colors of color_list, as displayed by Tk.
+magic = b"GOLFRM1\n"
+
+
+def color_rgb(color):
+    """
+    :param color: Name of a color of color_list, or "#rrggbb" code.
+    :return: The (red, green, blue) values of the color.
+    """
+    if color.startswith("#") and len(color) == 7:
+        return tuple(int(color[k:k + 2], 16) for k in (1, 3, 5))
+    if color not in rgb_codes:
+        raise ValueError("Unknown color: " + color)
+    return rgb_codes[color]
+
+
+def export_kind(path):
+    """
+    :param path: Path of an export.
+    :return: "png", "gif" or "stack", from the extension of the path.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".png":
+        return "png"
+    if extension == ".gif":
+        return "gif"
+    return "stack"
+
+
+def render(data, size, scale):
+    """
+    Draws a frame.
+    :param data: States of the cells, grid[i][j] being at position i * size + j.
+    :param size: Length of the sides of the grid.
+    :param scale: Number of pixels per cell.
+    :return: List of the rows of pixels, each a bytes object containing the state of every pixel of the row.
+    """
+    rows = [data[j::size] for j in range(0, size)]
+    # The row y of the image shows the cells grid[i][y], i.e. a column of the grid.
+    if scale == 1:
+        return rows
+    squares = [bytes(bytearray([state])) * scale for state in range(0, 256)]
+    pixels = []
+    for row in rows:
+        line = b"".join([squares[state] for state in bytearray(row)])
+        pixels.extend([line] * scale)
+    return pixels
+
+
+def png_image(rows, palette):
+    """
+    Encodes an image in the PNG format, with a palette.
+    :param rows: List of the rows of pixels, as bytes of palette indices.
+    :param palette: List of the (red, green, blue) values of the palette.
+    :return: The content of the PNG file.
+    """
+    def chunk(kind, content):
+        return struct.pack(">I", len(content)) + kind + content + \
+            struct.pack(">I", zlib.crc32(kind + content) & 0xffffffff)
+    header = struct.pack(">IIBBBBB", len(rows[0]), len(rows), 8, 3, 0, 0, 0)
+    # 8 bits per pixel, color type 3 (palette indices).
+    raw = b"".join([b"\0" + row for row in rows])
+    # Each row starts with its filter type, 0 (none): the palette indices compress well without filter.
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + \
+        chunk(b"PLTE", b"".join([struct.pack("BBB", *rgb) for rgb in palette])) + \
+        chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+def lzw_codes(data, code_size):
+    """
+    Compresses the pixels of a GIF image with the variable length LZW codes of the format.
+    :param data: The palette indices of the pixels, row after row.
+    :param code_size: Minimum code size, i.e. the number of bits of the palette indices (at least 2).
+    :return: The compressed bytes.
+    """
+    clear = 1 << code_size
+    end = clear + 1
+    output = bytearray()
+    bits = 0
+    n_bits = 0
+    size = code_size + 1
+    next_code = end + 1
+    table = {}
+    # Code of each string already met, keyed by (code of the string without its last pixel) << 8 | last pixel.
+    bits |= clear << n_bits
+    n_bits += size
+    data = bytearray(data)
+    prefix = data[0]
+    for pixel in data[1:]:
+        key = prefix << 8 | pixel
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        bits |= prefix << n_bits
+        n_bits += size
+        while n_bits >= 8:
+            output.append(bits & 255)
+            bits >>= 8
+            n_bits -= 8
+        if next_code < 4096:
+            table[key] = next_code
+            if next_code == 1 << size:
+                size += 1
+            next_code += 1
+        else:
+            bits |= clear << n_bits
+            n_bits += size
+            table = {}
+            size = code_size + 1
+            next_code = end + 1
+            # The table is full: it is cleared and built again.
+        prefix = pixel
+    for code in (prefix, end):
+        bits |= code << n_bits
+        n_bits += size
+    while n_bits > 0:
+        output.append(bits & 255)
+        bits >>= 8
+        n_bits -= 8
+    return bytes(output)
+
+
+class GifWriter(object):
+    """
+    Writes an animated GIF, one frame at a time.
+    """
+
+    def __init__(self, path, width, height, palette, delay=0.1):
+        """
+        :param path: Path of the GIF.
+        :param width: Width of the frames, in pixels.
+        :param height: Height of the frames, in pixels.
+        :param palette: List of the (red, green, blue) values of the palette.
+        :param delay: Time between two frames, in seconds.
+        """
+        self.code_size = max(2, (len(palette) - 1).bit_length())
+        palette = list(palette) + [(0, 0, 0)] * ((1 << self.code_size) - len(palette))
+        # The table of colors of a GIF has a power of 2 entries.
+        self.delay = int(round(delay * 100))
+        # In hundredths of a second.
+        self.width = width
+        self.height = height
+        self.gif_file = open(path, "wb")
+        self.gif_file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xf0 | (self.code_size - 1), 0, 0) +
+                            b"".join([struct.pack("BBB", *rgb) for rgb in palette]))
+        self.gif_file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+        # Application extension making the animation loop forever.
+
+    def write(self, rows):
+        """
+        Adds a frame.
+        :param rows: List of the rows of pixels, as bytes of palette indices.
+        """
+        codes = lzw_codes(b"".join(rows), self.code_size)
+        self.gif_file.write(b"!\xf9\x04\x00" + struct.pack("<H", self.delay) + b"\x00\x00")
+        # Graphic control extension, giving the delay before the next frame.
+        self.gif_file.write(b"," + struct.pack("<HHHHB", 0, 0, self.width, self.height, 0) +
+                            struct.pack("B", self.code_size))
+        self.gif_file.write(b"".join([struct.pack("B", len(codes[k:k + 255])) + codes[k:k + 255]
+                                      for k in range(0, len(codes), 255)]) + b"\x00")
+        # The codes are written in blocks of at most 255 bytes.
+
+    def close(self):
+        if not self.gif_file.closed:
+            self.gif_file.write(b";")
+            self.gif_file.close()
+
+
+def png_path(path, generation):
+    """
+    :param path: Path of a PNG export, with or without a pattern such as "%06d".
+    :param generation: Number of a generation.
+    :return: The path of the image of the generation.
+    """
+    if "%" in path:
+        return path % generation
+    root, extension = os.path.splitext(path)
+    return root + "_%06d" % generation + extension
+
+
+def write_frames(frames, path, colors, size, scale, every, delay):
+    """
+    Body of the writing process: takes the frames from the queue and writes them, until it gets None.
+    :param frames: Queue of (generation, states of the cells) frames.
+    :param path: Path of the export.
+    :param colors: Colors of the states.
+    :param size: Length of the sides of the grid.
+    :param scale: Number of pixels per cell.
+    :param every: Number of generations between two frames, saved in the header of a frame stack.
+    :param delay: Time between two frames of a GIF, in seconds.
+    """
+    kind = export_kind(path)
+    palette = [color_rgb(color) for color in colors]
+    width = size * scale
+    writer = None
+    try:
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break
+            generation, data = frame
+            rows = render(data, size, scale)
+            if kind == "png":
+                with open(png_path(path, generation), "wb") as png_file:
+                    png_file.write(png_image(rows, palette))
+            elif kind == "gif":
+                if writer is None:
+                    writer = GifWriter(path, width, width, palette, delay)
+                writer.write(rows)
+            else:
+                if writer is None:
+                    header = json.dumps({"width": width, "height": width, "colors": colors, "palette": palette,
+                                         "scale": scale, "first": generation, "every": every}).encode("utf-8")
+                    header += b" " * (-(len(magic) + 4 + len(header)) % 8)
+                    writer = open(path, "wb")
+                    writer.write(magic + struct.pack("<I", len(header)) + header)
+                writer.write(b"".join(rows))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+class FrameExporter(object):
+    """
+    Exports generations through a bounded queue, written by a separate process.
+    """
+
+    def __init__(self, path, colors, size, scale=1, every=1, delay=0.1, max_frames=16):
+        """
+        Starts the writing process.
+        :param path: Path of the export (see the kinds of export above). Existing files are overwritten.
+        :param colors: Colors of the states, names of color_list or "#rrggbb" codes.
+        :param size: Length of the sides of the grid.
+        :param scale: Number of pixels per cell.
+        :param every: Only the generations that are a multiple of every are exported.
+        :param delay: Time between two frames of a GIF, in seconds.
+        :param max_frames: Number of frames that can wait in the queue. When it is full, add waits.
+        """
+        for color in colors:
+            color_rgb(color)
+            # Unknown colors are reported before the simulation starts.
+        self.path = path
+        self.size = size
+        self.every = every
+        self.frames = multiprocessing.Queue(max_frames)
+        self.process = multiprocessing.Process(target=write_frames, args=(self.frames, path, list(colors), size,
+                                                                          scale, every, delay))
+        self.process.daemon = True
+        self.process.start()
+
+    def add(self, generation, grid):
+        """
+        Exports a generation, if it is a multiple of every. Only the copy of the grid is made here; the drawing and
+        the encoding are done by the writing process.
+        :param generation: Number of the generation.
+        :param grid: 2D list (or array, or GridView) of the states of the generation.
+        """
+        if generation % self.every:
+            return
+        self.put((generation, b"".join([bytes(bytearray(row)) for row in grid])))
+
+    def put(self, frame):
+        """
+        Adds a frame to the queue, waiting while it is full unless the writing process has ended.
+        """
+        while self.process.is_alive():
+            try:
+                self.frames.put(frame, timeout=0.05)
+                return
+            except queue.Full:
+                continue
+        raise IOError("The frames could not be written to " + self.path)
+
+    def close(self):
+        """
+        Waits for the waiting frames to be written, and ends the writing process.
+        """
+        if self.process.is_alive():
+            self.put(None)
+        self.process.join()
+        if self.process.exitcode:
+            raise IOError("The frames could not be written to " + self.path)
+
+
+class FrameStack(object):
+    """
+    Memory mapped access to a frame stack.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the frame stack.
+        """
+        self.stack_file = open(path, "rb")
+        start = self.stack_file.read(len(magic) + 4)
+        if start[:len(magic)] != magic:
+            raise ValueError(path + " is not a frame stack")
+        header_length = struct.unpack("<I", start[len(magic):])[0]
+        header = json.loads(self.stack_file.read(header_length).decode("utf-8"))
+        self.width = header["width"]
+        self.height = header["height"]
+        self.colors = header["colors"]
+        self.palette = [tuple(rgb) for rgb in header["palette"]]
+        self.scale = header["scale"]
+        self.first = header["first"]
+        self.every = header["every"]
+        self.offset = len(magic) + 4 + header_length
+        self.frame_size = self.width * self.height
+        self.data = mmap.mmap(self.stack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.length = (len(self.data) - self.offset) // self.frame_size
+        # Number of complete frames. An incomplete last frame, left by an interruption, is ignored.
+
+    def __len__(self):
+        return self.length
+
+    def frame(self, index):
+        """
+        :param index: Index of the frame (0 for the first generation of the stack).
+        :return: List of the rows of pixels of the frame, as bytes of states.
+        """
+        start = self.offset + index * self.frame_size
+        return [self.data[start + y * self.width:start + (y + 1) * self.width] for y in range(0, self.height)]
+
+    def array(self):
+        """
+        :return: A read-only NumPy array of shape (frames, height, width) mapped on the file. Requires NumPy.
+        """
+        return np.frombuffer(self.data, dtype=np.uint8, count=self.length * self.frame_size,
+                             offset=self.offset).reshape(self.length, self.height, self.width)
+
+    def rgb(self, index):
+        """
+        :param index: Index of a frame.
+        :return: A NumPy array of shape (height, width, 3) with the colors of the pixels of the frame. Requires NumPy.
+        """
+        return np.array(self.palette, dtype=np.uint8)[self.array()[index]]
+
+    def close(self):
+        self.data.close()
+        self.stack_file.close()
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Hashlife engine for single color configurations (white/black), where the game is a classic Life-like automaton with
+the rules of color 1. The grid is stored as a quadtree in which identical sub-squares are shared, and
+the results of sub-squares are memoized, so that regular patterns can be advanced by 2^k generations at once.
+
+Unlike get_neighbour, the plane is unbounded: cells leaving the initial square keep living instead of dying at the
+border. Results are the same as process_changes as long as the pattern stays away from the edges of the grid.
+"""
+from collections import OrderedDict
+from Engine_GoL import configuration, rule_sets, rule_table
+
+
+def hashlife_supported(config=configuration):
+    """
+    Checks if a configuration can be simulated with the Hashlife engine.
+    :param config: A dictionary with "colors" and "rules", like configuration.
+    :return: True if there is a single color (plus white) and empty cells cannot be born without neighbours.
+    """
+    return len(config["colors"]) == 2 and 0 not in rule_sets(config["rules"][1])[0]
+
+
+class Node(object):
+    """
+    A square of 2^k X 2^k cells. Level 0 nodes are single cells, other nodes are made of 4 nodes of level k-1:
+    a (top left), b (top right), c (bottom left) and d (bottom right).
+    """
+    __slots__ = ("k", "a", "b", "c", "d", "n")
+
+    def __init__(self, k, a, b, c, d, n):
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.n = n
+        # Number of live cells in the square.
+
+
+class Hashlife(object):
+    """
+    Simulation of a single color grid with the Hashlife algorithm.
+    """
+
+    def __init__(self, grid, max_nodes=1 << 20):
+        """
+        :param grid: 2D list containing the states of the cells (0/1).
+        :param max_nodes: Maximum number of entries in each of the node and result caches. When a cache is full, the
+        least recently used entries are evicted, which keeps the memory bounded on long runs.
+        """
+        if not hashlife_supported():
+            raise ValueError("Hashlife only supports a single color that is not born without neighbours")
+        self.allowed = rule_table().allowed[1]
+        # Lookup table of the rules of color 1: allowed[alive][count] tells if the cell is alive at the next generation.
+        self.max_nodes = max_nodes
+        self.nodes = OrderedDict()
+        # Cache of the nodes built from 4 children, so that identical squares are shared.
+        self.results = OrderedDict()
+        # Cache of the centered results of nodes after 2^j generations.
+        self.off = Node(0, None, None, None, None, 0)
+        self.on = Node(0, None, None, None, None, 1)
+        self.zeros = [self.off]
+        # Empty nodes of each level.
+        self.size = len(grid)
+        self.generation = 0
+        k = 3
+        while (1 << k) < self.size:
+            k += 1
+        self.root = self.build(grid, k, 0, 0)
+        self.origin = (0, 0)
+        # Position of the top left cell of the root node on the grid.
+
+    def join(self, a, b, c, d):
+        """
+        Returns the node made of the 4 given children, reusing the existing one if it is still in the cache.
+        """
+        key = (a, b, c, d)
+        node = self.nodes.get(key)
+        if node is not None:
+            self.nodes.move_to_end(key)
+            return node
+        node = Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+        self.nodes[key] = node
+        if len(self.nodes) > self.max_nodes:
+            self.nodes.popitem(last=False)
+            # Evicted nodes stay valid, they are simply not shared anymore.
+        return node
+
+    def zero(self, k):
+        """
+        Returns the empty node of level k.
+        """
+        while len(self.zeros) <= k:
+            previous = self.zeros[-1]
+            self.zeros.append(Node(previous.k + 1, previous, previous, previous, previous, 0))
+        return self.zeros[k]
+
+    def build(self, grid, k, row, column):
+        """
+        Builds the node of level k whose top left cell is grid[row][column]. Cells outside of the grid are empty.
+        """
+        if row >= len(grid) or column >= len(grid):
+            return self.zero(k)
+        if k == 0:
+            return self.on if grid[row][column] else self.off
+        half = 1 << (k - 1)
+        return self.join(self.build(grid, k - 1, row, column), self.build(grid, k - 1, row, column + half),
+                         self.build(grid, k - 1, row + half, column),
+                         self.build(grid, k - 1, row + half, column + half))
+
+    def build_cells(self, cells, k, row, column):
+        """
+        Builds the node of level k whose top left cell is at (row, column) on the plane, from the positions of its live
+        cells. Only the squares containing live cells are visited, so the cells can be far apart.
+        """
+        if not cells:
+            return self.zero(k)
+        if k == 0:
+            return self.on
+        half = 1 << (k - 1)
+        quarters = ([], [], [], [])
+        for i, j in cells:
+            quarters[2 * (i >= row + half) + (j >= column + half)].append((i, j))
+        return self.join(self.build_cells(quarters[0], k - 1, row, column),
+                         self.build_cells(quarters[1], k - 1, row, column + half),
+                         self.build_cells(quarters[2], k - 1, row + half, column),
+                         self.build_cells(quarters[3], k - 1, row + half, column + half))
+
+    def set_cells(self, cells):
+        """
+        Replaces the live cells of the plane, for example to continue a simulation saved in a checkpoint.
+        :param cells: List of (row, column) positions of the live cells on the plane.
+        """
+        if not cells:
+            self.root = self.zero(3)
+            self.origin = (0, 0)
+            return
+        top = min(i for i, j in cells)
+        left = min(j for i, j in cells)
+        extent = max(max(i for i, j in cells) - top, max(j for i, j in cells) - left) + 1
+        k = 3
+        while (1 << k) < extent:
+            k += 1
+        self.root = self.build_cells(cells, k, top, left)
+        self.origin = (top, left)
+
+    def centre(self, m):
+        """
+        Returns a node of level k+1 with m in its center and empty cells around it.
+        """
+        z = self.zero(m.k - 1)
+        return self.join(self.join(z, z, z, m.a), self.join(z, z, m.b, z),
+                         self.join(z, m.c, z, z), self.join(m.d, z, z, z))
+
+    def is_padded(self, m):
+        """
+        Checks that all the live cells of m are in its central half, so that it can be advanced without losing cells.
+        """
+        return (m.a.n == m.a.d.d.n and m.b.n == m.b.c.c.n and
+                m.c.n == m.c.b.b.n and m.d.n == m.d.a.a.n)
+
+    def life(self, cell, neighbours):
+        """
+        Applies the rules of color 1 to a single cell.
+        :param cell: Level 0 node of the cell.
+        :param neighbours: List of the 8 level 0 nodes around the cell.
+        :return: The level 0 node of the cell at the next generation.
+        """
+        return self.on if self.allowed[cell.n][sum(neighbour.n for neighbour in neighbours)] else self.off
+
+    def life_4x4(self, m):
+        """
+        Returns the 2X2 center of a level 2 node, one generation later.
+        """
+        ad = self.life(m.a.d, [m.a.a, m.a.b, m.b.a, m.a.c, m.b.c, m.c.a, m.c.b, m.d.a])
+        bc = self.life(m.b.c, [m.a.b, m.b.a, m.b.b, m.a.d, m.b.d, m.c.b, m.d.a, m.d.b])
+        cb = self.life(m.c.b, [m.a.c, m.a.d, m.b.c, m.c.a, m.d.a, m.c.c, m.c.d, m.d.c])
+        da = self.life(m.d.a, [m.a.d, m.b.c, m.b.d, m.c.b, m.d.b, m.c.d, m.d.c, m.d.d])
+        return self.join(ad, bc, cb, da)
+
+    def successor(self, m, j):
+        """
+        Returns the center of m (a node of level k-1) 2^j generations later. j is limited to k-2.
+        """
+        if m.n == 0:
+            return m.a
+        j = min(j, m.k - 2)
+        key = (m, j)
+        result = self.results.get(key)
+        if result is not None:
+            self.results.move_to_end(key)
+            return result
+        if m.k == 2:
+            result = self.life_4x4(m)
+        else:
+            join = self.join
+            c1 = self.successor(join(m.a.a, m.a.b, m.a.c, m.a.d), j)
+            c2 = self.successor(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
+            c3 = self.successor(join(m.b.a, m.b.b, m.b.c, m.b.d), j)
+            c4 = self.successor(join(m.a.c, m.a.d, m.c.a, m.c.b), j)
+            c5 = self.successor(join(m.a.d, m.b.c, m.c.b, m.d.a), j)
+            c6 = self.successor(join(m.b.c, m.b.d, m.d.a, m.d.b), j)
+            c7 = self.successor(join(m.c.a, m.c.b, m.c.c, m.c.d), j)
+            c8 = self.successor(join(m.c.b, m.d.a, m.c.d, m.d.c), j)
+            c9 = self.successor(join(m.d.a, m.d.b, m.d.c, m.d.d), j)
+            # 9 overlapping sub-squares of level k-1, advanced by 2^j generations (or 2^(k-3) if j is the maximum).
+            if j < m.k - 2:
+                result = join(join(c1.d, c2.c, c4.b, c5.a), join(c2.d, c3.c, c5.b, c6.a),
+                              join(c4.d, c5.c, c7.b, c8.a), join(c5.d, c6.c, c8.b, c9.a))
+                # The centers of the 9 results already are 2^j generations later.
+            else:
+                result = join(self.successor(join(c1, c2, c4, c5), j), self.successor(join(c2, c3, c5, c6), j),
+                              self.successor(join(c4, c5, c7, c8), j), self.successor(join(c5, c6, c8, c9), j))
+                # Two half jumps of 2^(k-3) generations make the full jump of 2^(k-2) generations.
+        self.results[key] = result
+        if len(self.results) > self.max_nodes:
+            self.results.popitem(last=False)
+        return result
+
+    def jump(self, j):
+        """
+        Advances the simulation by 2^j generations.
+        :param j: Base 2 logarithm of the number of generations.
+        """
+        root = self.root
+        while root.k < j + 2 or not self.is_padded(root):
+            half = 1 << (root.k - 1)
+            root = self.centre(root)
+            self.origin = (self.origin[0] - half, self.origin[1] - half)
+            # The root grows until the pattern cannot reach its border during the jump.
+        self.root = self.successor(self.centre(root), j)
+        # The centered result covers the same cells as root.
+        self.generation += 1 << j
+
+    def advance(self, generations):
+        """
+        Advances the simulation by any number of generations, using a jump for each bit set in its binary writing.
+        :param generations: Number of generations.
+        """
+        j = 0
+        while generations:
+            if generations & 1:
+                self.jump(j)
+            generations >>= 1
+            j += 1
+
+    def population(self, size=None, node=None, row=None, column=None):
+        """
+        :param size: Length of the sides of the grid in which the cells are counted, or None to count the whole plane.
+        :return: The number of live cells, read from the nodes without building the grid: only the nodes crossing the
+        border of the grid are visited.
+        """
+        if node is None:
+            node, row, column = self.root, self.origin[0], self.origin[1]
+        if size is None or node.n == 0:
+            return node.n
+        extent = 1 << node.k
+        if row >= size or column >= size or row + extent <= 0 or column + extent <= 0:
+            return 0
+        if row >= 0 and column >= 0 and row + extent <= size and column + extent <= size:
+            return node.n
+        half = extent >> 1
+        return sum(self.population(size, child, x, y) for child, x, y in (
+            (node.a, row, column), (node.b, row, column + half), (node.c, row + half, column),
+            (node.d, row + half, column + half)))
+
+    def cells(self, node=None, row=None, column=None):
+        """
+        Generates the positions of all live cells on the (unbounded) plane.
+        :return: Iterator of (row, column) tuples.
+        """
+        if node is None:
+            node, row, column = self.root, self.origin[0], self.origin[1]
+        if node.n == 0:
+            return
+        if node.k == 0:
+            yield row, column
+            return
+        half = 1 << (node.k - 1)
+        for child, x, y in ((node.a, row, column), (node.b, row, column + half),
+                            (node.c, row + half, column), (node.d, row + half, column + half)):
+            for cell in self.cells(child, x, y):
+                yield cell
+
+    def to_grid(self, size=None):
+        """
+        Builds a grid of states from the live cells. Cells outside of the grid are not included.
+        :param size: Length of the sides of the grid. By default, the size of the initial grid.
+        :return: A 2D list containing 0's and 1's.
+        """
+        if size is None:
+            size = self.size
+        grid = [[0] * size for _ in range(size)]
+        for row, column in self.cells():
+            if 0 <= row < size and 0 <= column < size:
+                grid[row][column] = 1
+        return grid
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+History of the generations of a simulation, to go back to any recent generation without computing the simulation
+again. Instead of a copy of the grid at every generation, the history keeps a full copy of the grid (a keyframe) every
+few generations, and the list of the cells that changed at each generation in between. A generation is rebuilt from
+the keyframe preceding it and the changes following the keyframe, so its cost depends on the number of changes and not
+on the number of generations. When the history takes more memory than its budget, the oldest keyframe and its changes
+are removed.
+"""
+from array import array
+from collections import deque
+from Seeds_GoL import encode_grid, decode_grid
+
+entry_overhead = 64
+# Approximate memory used by the Python objects of each generation, in addition to its data.
+
+
+class History(object):
+    """
+    Bounded history of the generations of a grid. Generations must be added in order.
+    """
+
+    def __init__(self, grid, generation=0, keyframe_every=64, budget=64 << 20):
+        """
+        :param grid: 2D list containing the states of the first generation.
+        :param generation: Number of the first generation.
+        :param keyframe_every: Number of generations between two keyframes.
+        :param budget: Memory the history may use, in bytes. At least the last keyframe and its changes are kept.
+        """
+        self.size = len(grid)
+        self.keyframe_every = keyframe_every
+        self.budget = budget
+        self.blocks = deque()
+        # Each block is [number of the generation of the keyframe, compressed keyframe, list of changes of the next
+        # generations]. The changes of a generation are an array of cell positions and a bytearray of their new states.
+        self.memory = 0
+        # Memory used by the blocks, in bytes.
+        self.first = self.last = generation
+        # Numbers of the first and last generations kept.
+        self.add_keyframe(generation, grid)
+
+    def add_keyframe(self, generation, grid):
+        """
+        Starts a new block with a copy of the grid.
+        :param generation: Number of the generation.
+        :param grid: 2D list containing the states of the generation.
+        """
+        keyframe = encode_grid(grid)
+        self.blocks.append([generation, keyframe, []])
+        self.memory += len(keyframe) + entry_overhead
+
+    def add(self, generation, changes, grid):
+        """
+        Adds the next generation.
+        :param generation: Number of the generation, following the last one added.
+        :param changes: List of (row, column, new state) tuples of the cells changed since the last generation added,
+        or None if they are not known.
+        :param grid: 2D list containing the states of the generation, or a function returning it. It is only used if a
+        keyframe is stored.
+        """
+        if generation != self.last + 1:
+            raise ValueError("Generation " + str(generation) + " does not follow generation " + str(self.last))
+        block = self.blocks[-1]
+        if changes is None or generation - block[0] >= self.keyframe_every:
+            self.add_keyframe(generation, grid() if callable(grid) else grid)
+        else:
+            positions = array("I", [i * self.size + j for i, j, state in changes])
+            states = bytearray(state for i, j, state in changes)
+            block[2].append((positions, states))
+            self.memory += positions.itemsize * len(positions) + len(states) + entry_overhead
+        self.last = generation
+        while self.memory > self.budget and len(self.blocks) > 1:
+            self.remove_oldest()
+
+    def remove_oldest(self):
+        """
+        Removes the oldest keyframe and the changes following it.
+        """
+        generation, keyframe, deltas = self.blocks.popleft()
+        self.memory -= len(keyframe) + entry_overhead
+        for positions, states in deltas:
+            self.memory -= positions.itemsize * len(positions) + len(states) + entry_overhead
+        self.first = self.blocks[0][0]
+
+    def __contains__(self, generation):
+        return self.first <= generation <= self.last
+
+    def get(self, generation):
+        """
+        Rebuilds a generation from the history.
+        :param generation: Number of the generation, between first and last.
+        :return: A new 2D list containing the states of the generation.
+        """
+        if generation not in self:
+            raise KeyError("Generation " + str(generation) + " is not in the history")
+        for block in reversed(self.blocks):
+            if block[0] <= generation:
+                break
+        grid = decode_grid(block[1], self.size)
+        for positions, states in block[2][0:generation - block[0]]:
+            for k in range(0, len(positions)):
+                grid[positions[k] // self.size][positions[k] % self.size] = states[k]
+        return grid
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of the phases of a simulation: computing the neighbours, applying the rules (or the whole step for the engines
+doing both at once), listing the changed cells, counting the population, writing the population table, redrawing the
+canvas... A PhaseTimer is given to the code to measure, which adds the time of each phase to it; code without a timer
+only pays for a test against None. The phases may be added from several threads (the redraw is measured by the thread
+of the window, the other phases by the thread of the simulation). At regular intervals, the timer computes the
+generations per second and the time per generation of each phase, which can be displayed and written to a metrics
+file, one JSON line per interval.
+
+Example of a line of the metrics file:
+{"time": 1476000000.0, "generation": 1200, "gens_per_sec": 310.5, "phases": {"neighbour": 0.0012, "rules": 0.0009}}
+"""
+import json
+import threading
+import time
+
+clock = getattr(time, "perf_counter", time.time)
+# Most precise clock available.
+phase_names = ["neighbour", "rules", "step", "changes", "population", "log", "history", "checkpoint", "export",
+               "redraw"]
+# Order in which the phases are displayed.
+
+
+class PhaseTimer(object):
+    """
+    Accumulates the time spent in each phase of a simulation.
+    """
+
+    def __init__(self, path=None, every=1.0):
+        """
+        :param path: Path of the metrics file, or None. An existing file is overwritten.
+        :param every: Duration of the intervals, in seconds.
+        """
+        self.every = every
+        self.totals = {}
+        # Time spent in each phase since the timer was created.
+        self.interval_totals = {}
+        # Time spent in each phase during the current interval.
+        self.generations = 0
+        self.interval_generations = 0
+        self.interval_start = clock()
+        self.last = None
+        # Statistics of the last complete interval.
+        self.generation = None
+        # Number of the last generation given to tick.
+        self.metrics_file = open(path, "w") if path is not None else None
+        self.lock = threading.Lock()
+        # Protects the totals of the interval, which another thread may add to while the interval is closed.
+
+    def add(self, phase, start):
+        """
+        Adds the time elapsed since start to a phase.
+        :param phase: Name of the phase.
+        :param start: Value of clock() at the beginning of the phase.
+        :return: The current value of clock(), which can be used as the start of the next phase.
+        """
+        now = clock()
+        with self.lock:
+            self.interval_totals[phase] = self.interval_totals.get(phase, 0.0) + now - start
+        return now
+
+    def tick(self, generation, generations=1):
+        """
+        Counts the generations computed, and closes the current interval if it lasted long enough.
+        :param generation: Number of the current generation, written in the metrics file.
+        :param generations: Number of generations computed since the last call.
+        :return: The statistics of the interval if it was closed, otherwise None.
+        """
+        with self.lock:
+            self.interval_generations += generations
+            self.generation = generation
+            finished = clock() - self.interval_start >= self.every
+        if finished:
+            return self.close_interval(generation)
+        return None
+
+    def close_interval(self, generation):
+        """
+        Computes the statistics of the current interval, writes them to the metrics file and starts a new interval.
+        :param generation: Number of the current generation.
+        :return: Dictionary with the generation, the generations per second and the time per generation of each phase
+        (in seconds).
+        """
+        with self.lock:
+            now = clock()
+            count = max(self.interval_generations, 1)
+            last = {"time": time.time(), "generation": generation,
+                    "gens_per_sec": self.interval_generations / max(now - self.interval_start, 1e-9),
+                    "phases": dict((phase, self.interval_totals[phase] / count) for phase in self.interval_totals)}
+            for phase in self.interval_totals:
+                self.totals[phase] = self.totals.get(phase, 0.0) + self.interval_totals[phase]
+            self.generations += self.interval_generations
+            self.interval_totals = {}
+            self.interval_generations = 0
+            self.interval_start = now
+        self.last = last
+        if self.metrics_file is not None:
+            self.metrics_file.write(json.dumps(last, sort_keys=True) + "\n")
+            self.metrics_file.flush()
+        return last
+
+    def status(self):
+        """
+        :return: A line describing the last interval, such as "310.5 gen/s | neighbour 1.20 ms, rules 0.90 ms".
+        """
+        if self.last is None:
+            return ""
+        phases = self.last["phases"]
+        return "%.1f gen/s | " % self.last["gens_per_sec"] + ", ".join(
+            "%s %.2f ms" % (phase, 1000 * phases[phase]) for phase in phase_names if phase in phases)
+
+    def close(self):
+        """
+        Closes the last interval and the metrics file.
+        """
+        if self.interval_generations:
+            self.close_interval(self.generation)
+        if self.metrics_file is not None:
+            self.metrics_file.close()
+            self.metrics_file = None
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Writer of the population table (data.txt): the number of cells of each color at every iteration. The file is opened
+once for the whole simulation and written through a buffer, instead of being reopened at every iteration.
+"""
+
+
+class PopulationWriter(object):
+    """
+    Streams the population table of a simulation into a file. The format is the same as the data.txt file written by
+    the interface: a header line "Iteration COLOR1 COLOR2 ..." followed by one line per iteration.
+    """
+
+    def __init__(self, path, colors, flush_every=100, position=None):
+        """
+        Opens the file and writes the header.
+        :param path: Path of the population table. An existing file is overwritten.
+        :param colors: List of the colors of the simulation (including white, which is not written).
+        :param flush_every: Number of lines after which the buffer is written to the disk, so that the table can be
+        read while a long simulation is running.
+        :param position: If given, the existing table is continued instead: it is cut at this position (returned by
+        tell), which drops the lines written after it, and no header is written.
+        """
+        self.flush_every = flush_every
+        self.lines = []
+        # Lines waiting to be written.
+        if position is not None:
+            self.graph_file = open(path, "r+")
+            self.graph_file.seek(position)
+            self.graph_file.truncate()
+            return
+        self.graph_file = open(path, "w")
+        self.graph_file.write("Iteration")
+        for color in range(1, len(colors)):
+            self.graph_file.write(" " + str.upper(colors[color].replace(" ", "")))
+        self.graph_file.write("\n")
+
+    def write(self, iteration, population):
+        """
+        Adds the line of an iteration to the table.
+        :param iteration: Number of the iteration.
+        :param population: List of the number of cells of each color, index 0 (white) being ignored.
+        """
+        self.lines.append(str(iteration) + " " + " ".join(str(n) for n in population[1:]) + "\n")
+        if len(self.lines) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the waiting lines to the disk.
+        """
+        if self.lines:
+            self.graph_file.write("".join(self.lines))
+            self.lines = []
+        self.graph_file.flush()
+
+    def tell(self):
+        """
+        :return: The position of the end of the table in the file, from which it can be continued, once the waiting
+        lines are written (see flush).
+        """
+        self.flush()
+        return self.graph_file.tell()
+
+    def close(self):
+        """
+        Writes the waiting lines and closes the file.
+        """
+        if not self.graph_file.closed:
+            self.flush()
+            self.graph_file.close()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Random boards: fills a grid (or a rectangle of it) with random states, with a given probability for each color. The
+fill is reproducible: the same random seed, densities and rectangle always give the same board, on every computer, so
+a random board can be saved as these few values instead of its grid (see the "random" key of the seed library).
+
+The states are generated a row of the rectangle at a time: 16 random bits are drawn at once for every cell of the row
+with getrandbits, and converted into states with a table of 65536 states in which each color has a share proportional
+to its density. This is much faster than calling random.randint for every cell, and the densities can be as low as
+1/65536.
+"""
+import binascii
+import random
+import sys
+from array import array
+from Engine_GoL import configuration
+
+resolution = 1 << 16
+# Number of random values of a cell, which sets the precision of the densities.
+
+
+def new_seed():
+    """
+    :return: A new random seed, drawn from the random source of the operating system.
+    """
+    return random.SystemRandom().randrange(1 << 32)
+
+
+def uniform_densities(n_colors):
+    """
+    :param n_colors: Number of colors, including white.
+    :return: The densities of the former random seed generation, in which every state (including white) is equally
+    likely.
+    """
+    return [1.0 / n_colors] * (n_colors - 1)
+
+
+def parse_densities(text, n_colors):
+    """
+    Reads densities written on the command line or in the interface.
+    :param text: "uniform" (every state, including white, is equally likely), a single density (for example "0.05"
+    for a mostly empty board) shared equally by the colors, or one density per color separated by commas.
+    :param n_colors: Number of colors, including white.
+    :return: The list of the densities of the colors 1 to n_colors - 1.
+    """
+    text = text.strip()
+    if text == "uniform":
+        return uniform_densities(n_colors)
+    values = [float(value) for value in text.split(",")]
+    if len(values) == 1:
+        values = [values[0] / (n_colors - 1)] * (n_colors - 1)
+    if len(values) != n_colors - 1:
+        raise ValueError("One density per color is required (" + str(n_colors - 1) + ")")
+    if any(value < 0 for value in values) or sum(values) > 1.0 + 1e-9:
+        raise ValueError("Densities must be positive and their sum at most 1")
+    return values
+
+
+def state_table(densities):
+    """
+    :param densities: List of the densities of the colors 1, 2...
+    :return: A bytearray of resolution states. A random value v between 0 and resolution - 1 gives the state table[v].
+    """
+    table = bytearray(resolution)
+    start = 0
+    total = 0.0
+    for color, density in enumerate(densities, 1):
+        total += density
+        stop = min(int(round(total * resolution)), resolution)
+        table[start:stop] = bytearray([color]) * (stop - start)
+        start = stop
+    # The values above the last color stay 0 (empty cells).
+    return table
+
+
+def random_fill(grid, seed=None, densities=None, area=None):
+    """
+    Fills a grid with random states, in place.
+    :param grid: 2D list of states.
+    :param seed: Seed of the random generator. If None, a new one is drawn with new_seed.
+    :param densities: List of the densities of the colors 1, 2..., see parse_densities. If None, every state of the
+    configuration (including white) is equally likely.
+    :param area: (first row, first column, number of rows, number of columns) of the rectangle to fill, or None for the
+    whole grid. The cells outside of it are not changed.
+    :return: Dictionary with the "seed", "densities" and "area" used, which gives the same fill again when passed to
+    random_fill as keyword arguments.
+    """
+    if seed is None:
+        seed = new_seed()
+    if densities is None:
+        densities = uniform_densities(len(configuration["colors"]))
+    if area is None:
+        area = (0, 0, len(grid), len(grid))
+    row, column, rows, columns = area
+    if row < 0 or column < 0 or rows < 0 or columns < 0 or row + rows > len(grid) or column + columns > len(grid):
+        raise ValueError("The rectangle is not inside the grid")
+    table = state_table(densities)
+    generator = random.Random(seed)
+    for i in range(row, row + rows):
+        if not columns:
+            break
+        bits = generator.getrandbits(16 * columns)
+        if hasattr(bits, "to_bytes"):
+            values = array("H", bits.to_bytes(2 * columns, "little"))
+        else:
+            values = array("H", binascii.unhexlify("%0*x" % (4 * columns, bits))[::-1])
+            # Python 2 integers have no to_bytes: the bytes are read from the hexadecimal digits, in reverse order.
+        if sys.byteorder == "big":
+            values.byteswap()
+            # The values are read in little-endian order on every computer, so that the boards are the same.
+        grid[i][column:column + columns] = list(map(table.__getitem__, values))
+    return {"seed": seed, "densities": list(densities), "area": list(area)}
+
+
+def random_grid(size, n_colors, seed=None, densities=None, area=None):
+    """
+    :param size: Length of the sides of the grid.
+    :param n_colors: Number of colors, including white.
+    :param seed: Seed of the random generator, or None for a new one.
+    :param densities: Densities of the colors 1 to n_colors - 1, or None for uniform_densities(n_colors).
+    :param area: Rectangle to fill, or None for the whole grid. The rest of the grid is empty.
+    :return: (new 2D list of random states, dictionary of the fill as returned by random_fill).
+    """
+    grid = [[0] * size for _ in range(size)]
+    if densities is None:
+        densities = uniform_densities(n_colors)
+    return grid, random_fill(grid, seed, densities, area)
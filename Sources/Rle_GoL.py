@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Import and export of patterns in the run length encoded (RLE) format used by most Life programs, and its multi-state
+variant. Both directions are streamed: the file is read by chunks and decoded directly into the grid of states, and
+the grid is written run by run, so that no string of the size of the whole board is built.
+
+Format:
+- lines starting with "#" are comments;
+- the header "x = width, y = height, rule = B3/S23" gives the size of the pattern (the rule is optional);
+- the cells follow, row after row: each run is an optional count followed by a tag. "b" (or ".") is an empty cell,
+  "o" a cell of color 1, "A" to "X" the colors 1 to 24 and "pA" to "yX" the colors 25 and above. "$" ends a row and
+  "!" ends the pattern.
+The state numbers are the indexes of the colors in configuration["colors"]. The exporter also writes the colors and
+the rules of each color in "#C" comments ("born/lower/upper", or the B/S notation for rules with several birth values
+or survival values that are not a range), which the importer reads back when present.
+
+Example: python Batch_GoL.py --rle gosper.rle -n 1000
+"""
+import re
+from Engine_GoL import configuration, color_list, generate_empty_grid, make_rule, rule_sets
+
+header_pattern = re.compile(r"\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?", re.IGNORECASE)
+line_length = 70
+# Maximum length of the lines of cells written by the exporter, as recommended by the format.
+
+
+def parse_rule(rule):
+    """
+    Converts a rule in the B/S notation (for example "B3/S23", or "23/3" in the older S/B notation) into the rules of
+    a color.
+    :param rule: The rule string.
+    :return: A rule dictionary (see make_rule), or None if the string is not a rule.
+    """
+    match = re.match(r"^B(\d*)/S(\d*)$", rule, re.IGNORECASE)
+    if match:
+        born, survive = match.group(1), match.group(2)
+    else:
+        match = re.match(r"^(\d*)/(\d*)$", rule)
+        if not match:
+            return None
+        survive, born = match.group(1), match.group(2)
+    return make_rule([int(n) for n in born], [int(n) for n in survive])
+
+
+def format_rule(rules):
+    """
+    :param rules: Rule dictionary of a color (see rule_sets).
+    :return: The rule in the B/S notation.
+    """
+    birth, survival = rule_sets(rules)
+    return "B%s/S%s" % ("".join(str(n) for n in sorted(birth)), "".join(str(n) for n in sorted(survival)))
+
+
+def format_color_rule(rule):
+    """
+    :param rule: Rule dictionary of a color.
+    :return: The rule as written in the "#C rules" comment: "born/lower/upper", or the B/S notation if the rule has
+    "birth" and "survival" lists.
+    """
+    if "birth" in rule:
+        return format_rule(rule)
+    return "%d/%d/%d" % (rule["born"], rule["lower"], rule["upper"])
+
+
+def parse_color_rule(text):
+    """
+    :param text: A rule of the "#C rules" comment, written by format_color_rule.
+    :return: The rule dictionary of the color.
+    """
+    if text.upper().startswith("B"):
+        rule = parse_rule(text)
+        if rule is None:
+            raise ValueError("Invalid rule: " + text)
+        return rule
+    born, lower, upper = text.split("/")
+    return {"born": int(born), "lower": int(lower), "upper": int(upper)}
+
+
+def state_tag(state, multi_state):
+    """
+    :param state: Number of the color.
+    :param multi_state: If True, the tags of the multi-state format are used.
+    :return: The tag of a cell of this color.
+    """
+    if state == 0:
+        return "." if multi_state else "b"
+    if not multi_state:
+        return "o"
+    if state <= 24:
+        return chr(ord("A") + state - 1)
+    return chr(ord("p") + (state - 25) // 24) + chr(ord("A") + (state - 25) % 24)
+
+
+def read_rle(path, size=None, chunk=65536):
+    """
+    Reads a pattern into a new grid of states.
+    :param path: Path of the RLE file.
+    :param size: Length of the sides of the grid. The pattern is centred in it. If None, or smaller than the pattern,
+    the grid has the size of the largest side of the pattern.
+    :param chunk: Number of characters read at once.
+    :return: A seed dictionary with "colors", "rules" and "seed", like those of the seed library. The colors and rules
+    are those written by the exporter if present, otherwise the current ones, completed from color_list if the
+    pattern has more colors. For a single color, the rule of the header is used.
+    """
+    colors = None
+    rules = None
+    header = None
+    with open(path, "r") as rle_file:
+        for line in rle_file:
+            if line.startswith("#"):
+                if line.startswith("#C colors "):
+                    colors = line[len("#C colors "):].strip().split(",")
+                elif line.startswith("#C rules "):
+                    rules = [parse_color_rule(rule) for rule in line[len("#C rules "):].strip().split(",")]
+            elif line.strip():
+                header = header_pattern.match(line)
+                break
+        if header is None:
+            raise ValueError(path + " has no RLE header")
+        width, height = int(header.group(1)), int(header.group(2))
+        if size is None or size < max(width, height):
+            size = max(width, height)
+        grid = generate_empty_grid(size)
+        column = start_column = (size - width) // 2
+        row = (size - height) // 2
+        # Position of the next cell. Rows of the pattern are the second index of the grid, as on the canvas.
+        count = 0
+        prefix = 0
+        states = 1
+        # Highest state found in the pattern.
+        done = False
+        while not done:
+            text = rle_file.read(chunk)
+            if not text:
+                break
+            for char in text:
+                if char.isdigit():
+                    count = 10 * count + ord(char) - ord("0")
+                    continue
+                if char in "bo.":
+                    state = 0 if char != "o" else 1
+                elif "A" <= char <= "X":
+                    state = 24 * prefix + ord(char) - ord("A") + 1
+                    prefix = 0
+                elif "p" <= char <= "y":
+                    prefix = ord(char) - ord("p") + 1
+                    continue
+                elif char == "$":
+                    row += max(count, 1)
+                    column = start_column
+                    count = 0
+                    continue
+                elif char == "!":
+                    done = True
+                    break
+                else:
+                    continue
+                    # Spaces and line breaks can appear anywhere.
+                run = max(count, 1)
+                count = 0
+                if state:
+                    if row >= size or column + run > size:
+                        raise ValueError(path + " contains cells outside of its x and y sizes")
+                    for i in range(column, column + run):
+                        grid[i][row] = state
+                    states = max(states, state)
+                column += run
+    if colors is None:
+        colors = list(configuration["colors"])
+        if states >= len(colors):
+            colors = list(color_list[0:states + 1])
+    if states >= len(colors):
+        raise ValueError(path + " uses more colors than " + str(len(colors) - 1))
+    if rules is None or len(rules) != len(colors):
+        rules = [dict(rule) for rule in configuration["rules"][0:len(colors)]]
+        rules += [{"born": 3, "lower": 2, "upper": 3} for _ in range(len(rules), len(colors))]
+        if len(colors) == 2 and header.group(3):
+            rules[1] = parse_rule(header.group(3)) or rules[1]
+    return {"colors": colors, "rules": rules, "seed": grid}
+
+
+def write_rle(path, grid, colors=None, rules=None):
+    """
+    Writes a grid of states as a pattern. The whole grid is written, so that the pattern keeps its position when it
+    is imported again. A grid with a single color uses the two states format, otherwise the multi-state format.
+    :param path: Path of the RLE file. An existing file is overwritten.
+    :param grid: 2D list of states.
+    :param colors: List of the colors. By default, those of the configuration.
+    :param rules: List of the rules of each color. By default, those of the configuration.
+    """
+    if colors is None:
+        colors = configuration["colors"]
+    if rules is None:
+        rules = configuration["rules"]
+    size = len(grid)
+    multi_state = len(colors) > 2
+    with open(path, "w") as rle_file:
+        rle_file.write("#C colors " + ",".join(colors) + "\n")
+        rle_file.write("#C rules " + ",".join(format_color_rule(rule) for rule in rules) + "\n")
+        rle_file.write("x = %d, y = %d" % (size, size))
+        if not multi_state:
+            rle_file.write(", rule = " + format_rule(rules[1]))
+        rle_file.write("\n")
+        line = []
+        # Runs of the current line of the file.
+        length = [0]
+
+        def add(run, state):
+            """
+            Adds a run of cells to the current line of the file, writing the line once it is full.
+            """
+            token = (str(run) if run > 1 else "") + (state_tag(state, multi_state) if state >= 0 else "$")
+            if length[0] + len(token) > line_length:
+                rle_file.write("".join(line) + "\n")
+                del line[:]
+                length[0] = 0
+            line.append(token)
+            length[0] += len(token)
+
+        empty_rows = 0
+        # Row ends not written yet. They are grouped in a single run, and dropped at the end of the pattern.
+        for row in range(0, size):
+            state = 0
+            run = 0
+            for column in range(0, size):
+                cell = grid[column][row]
+                if cell != state:
+                    if run:
+                        if empty_rows:
+                            add(empty_rows, -1)
+                            empty_rows = 0
+                        add(run, state)
+                    state = cell
+                    run = 0
+                run += 1
+            if state:
+                if empty_rows:
+                    add(empty_rows, -1)
+                    empty_rows = 0
+                add(run, state)
+            # Empty cells at the end of a row are not written.
+            empty_rows += 1
+        rle_file.write("".join(line) + "!\n")
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Seed library. Instead of a single Python dictionary written in seeds.txt, the seeds are kept in three files:
+- seeds.idx, a small JSON index with the name, size, colors, rules (and hybridization mode) of each seed, and the
+  position of its grid in the data file;
+- seeds.N.dat, the grids, each one stored as compressed bytes (one byte per cell);
+- seeds.N.log, the journal of the changes made since the index was written: one JSON line per saved or removed seed.
+Saving or removing a seed only appends to the data file and the journal, so it costs the size of the seed and not
+the size of the library. When the journal or the grids of replaced seeds become too large, the library is compacted:
+a new data file and a new index are written, and the index is renamed over the old one. N is increased at each
+compaction, so that an interruption always leaves either the old or the new library complete.
+Opening the library only reads the index and the journal; a grid is decoded when its seed is imported. The first time
+the library is opened, the seeds of seeds.txt (or default.txt if there is no seeds.txt) are migrated into it.
+Random boards saved with their "random" key (the random seed, densities and rectangle of Random_GoL.random_fill) take
+no space in the data file: their grid is generated again when they are imported.
+"""
+import ast
+import json
+import os
+import zlib
+from os.path import exists, getsize, join
+from Random_GoL import random_fill
+
+
+def replace_file(source, destination):
+    """
+    Renames a file over another one, as os.replace, which Python 2 does not have. On Windows, Python 2 can only rename
+    a file once the destination is removed, which leaves a moment without it.
+    :param source: Path of the new file.
+    :param destination: Path of the file to replace.
+    """
+    if hasattr(os, "replace"):
+        os.replace(source, destination)
+    else:
+        if os.name == "nt" and exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+        # On the other systems, rename already replaces the destination atomically.
+
+
+def read_seed_file(path):
+    """
+    Reads a file of seeds in the original format (a Python dictionary, like seeds.txt and default.txt).
+    :param path: Path of the file.
+    :return: The dictionary of seeds.
+    """
+    with open(path, "r") as seed_file:
+        return ast.literal_eval(seed_file.read())
+
+
+def encode_grid(grid):
+    """
+    :param grid: 2D list of states.
+    :return: The compressed bytes of the grid, one byte per cell, row after row.
+    """
+    cells = bytearray()
+    for row in grid:
+        cells.extend(bytearray(row))
+    return zlib.compress(bytes(cells))
+
+
+def seed_data(seed):
+    """
+    :param seed: Dictionary with "colors", "rules", "seed" (the grid) and optionally "hybrid" and "random".
+    :return: The compressed grid stored in the data file, empty for a random board that can be generated again.
+    """
+    if "random" in seed:
+        return b""
+    return encode_grid(seed["seed"])
+
+
+def decode_grid(data, size):
+    """
+    :param data: Bytes returned by encode_grid.
+    :param size: The length of the grid's sides.
+    :return: The 2D list of states.
+    """
+    cells = bytearray(zlib.decompress(data))
+    return [list(cells[i * size:(i + 1) * size]) for i in range(0, size)]
+
+
+class SeedStore(object):
+    """
+    Seed library behaving like the former seed_store dictionary: store[name] returns {"colors", "rules", "seed"},
+    store[name] = seed saves a seed and del store[name] removes it. Every change is appended to the journal
+    immediately.
+    """
+
+    def __init__(self, directory, name="seeds", source="seeds.txt", backup="default.txt"):
+        """
+        Opens the library, migrating the seeds of the original text files if it does not exist yet.
+        :param directory: Directory of the library files.
+        :param name: Base name of the library files (name.idx and name.N.dat).
+        :param source: File of seeds in the original format, migrated when the library is created.
+        :param backup: File of seeds used instead of source if source does not exist or cannot be read.
+        """
+        self.directory = directory
+        self.name = name
+        self.index_path = join(directory, name + ".idx")
+        self.backup_path = join(directory, backup)
+        self.index = {}
+        # Metadata of each seed, by name.
+        self.generation = 0
+        # Number of the current data file and journal. It changes each time the library is compacted.
+        self.data_path = None
+        self.journal_path = None
+        self.journal_length = 0
+        # Number of records in the journal.
+        if exists(self.index_path):
+            self.load()
+        else:
+            try:
+                seeds = read_seed_file(join(directory, source))
+            except (IOError, OSError, ValueError, SyntaxError):
+                seeds = read_seed_file(self.backup_path)
+            self.replace(seeds)
+
+    def set_generation(self, generation):
+        """
+        Sets the number of the current data file and journal.
+        :param generation: The number of the compaction.
+        """
+        self.generation = generation
+        self.data_path = join(self.directory, "%s.%d.dat" % (self.name, generation))
+        self.journal_path = join(self.directory, "%s.%d.log" % (self.name, generation))
+        self.journal_length = 0
+
+    def load(self):
+        """
+        Reads the index from the disk and applies the changes recorded in the journal.
+        """
+        with open(self.index_path, "r") as index_file:
+            content = json.load(index_file)
+        self.index = content["seeds"]
+        self.set_generation(content["generation"])
+        if exists(self.journal_path):
+            self.replay()
+
+    def replay(self):
+        """
+        Applies the records of the journal to the index. A last record left incomplete by an interruption is removed
+        from the journal, so that the next records are appended after the last complete one.
+        """
+        data_size = getsize(self.data_path)
+        with open(self.journal_path, "rb+") as journal_file:
+            complete = 0
+            # Position following the last complete record.
+            for line in journal_file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                if "entry" in record:
+                    if record["entry"]["offset"] + record["entry"]["length"] > data_size:
+                        break
+                        # The grid of this seed did not reach the disk.
+                    self.index[record["name"]] = record["entry"]
+                else:
+                    self.index.pop(record["name"], None)
+                complete += len(line)
+                self.journal_length += 1
+            journal_file.truncate(complete)
+
+    def log(self, name, entry=None):
+        """
+        Appends a record to the journal.
+        :param name: Name of the seed.
+        :param entry: Metadata of the saved seed, or None if the seed is removed.
+        """
+        record = {"name": name}
+        if entry is not None:
+            record["entry"] = entry
+        with open(self.journal_path, "ab") as journal_file:
+            journal_file.write(json.dumps(record).encode("utf-8") + b"\n")
+        self.journal_length += 1
+
+    def write_index(self):
+        """
+        Writes the index to the disk. The new index is written next to the old one and then renamed over it, so that
+        an interruption leaves the old index intact.
+        """
+        with open(self.index_path + ".tmp", "w") as index_file:
+            json.dump({"version": 1, "generation": self.generation, "seeds": self.index}, index_file)
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        replace_file(self.index_path + ".tmp", self.index_path)
+
+    def rewrite(self, entries):
+        """
+        Writes a new data file and the index pointing to it, then deletes the old data file and journal. Until the new
+        index replaces the old one, the old index, data file and journal are left untouched.
+        :param entries: Iterator of (name, metadata, compressed grid) tuples.
+        """
+        data_path = join(self.directory, "%s.%d.dat" % (self.name, self.generation + 1))
+        index = {}
+        with open(data_path, "wb") as data_file:
+            for name, entry, data in entries:
+                entry = dict(entry)
+                entry["offset"] = data_file.tell()
+                entry["length"] = len(data)
+                data_file.write(data)
+                index[name] = entry
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        old_paths = (self.data_path, self.journal_path)
+        self.index = index
+        self.set_generation(self.generation + 1)
+        self.write_index()
+        for path in old_paths:
+            if path is not None and exists(path):
+                os.remove(path)
+
+    def replace(self, seeds):
+        """
+        Replaces the whole content of the library.
+        :param seeds: Dictionary of seeds in the original format.
+        """
+        self.rewrite((name, self.metadata(seeds[name]), seed_data(seeds[name])) for name in seeds)
+
+    def restore(self):
+        """
+        Replaces the whole content of the library with the seeds of the backup file (default.txt).
+        """
+        self.replace(read_seed_file(self.backup_path))
+
+    def metadata(self, seed):
+        """
+        :param seed: Dictionary with "colors", "rules", "seed" (the grid) and optionally "hybrid".
+        :return: The entry of the seed in the index, without its position in the data file.
+        """
+        entry = {"size": len(seed["seed"]), "colors": seed["colors"], "rules": seed["rules"]}
+        for key in ("hybrid", "random"):
+            if key in seed:
+                entry[key] = seed[key]
+        return entry
+
+    def add(self, name, seed):
+        """
+        Saves a seed. Its grid is appended to the data file and its metadata to the journal, an existing seed with the
+        same name is replaced.
+        :param name: Name of the seed.
+        :param seed: Dictionary with "colors", "rules", "seed" (the grid) and optionally "hybrid" and "random".
+        """
+        data = seed_data(seed)
+        with open(self.data_path, "ab") as data_file:
+            offset = data_file.tell()
+            data_file.write(data)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+            # The grid must be on the disk before the journal refers to it.
+        entry = self.metadata(seed)
+        entry["offset"] = offset
+        entry["length"] = len(data)
+        self.log(name, entry)
+        self.index[name] = entry
+        self.compact_if_needed()
+
+    def info(self, name):
+        """
+        :param name: Name of a seed.
+        :return: The metadata of the seed (size, colors, rules...), without decoding its grid.
+        """
+        return self.index[name]
+
+    def compact_if_needed(self):
+        """
+        Grids of replaced or removed seeds stay in the data file (for example the AutoSave, replaced at every
+        simulation). When they take more space than the seeds themselves, or when the journal has more records than
+        twice the number of seeds, the library is compacted.
+        """
+        used = sum(entry["length"] for entry in self.index.values())
+        if getsize(self.data_path) > 2 * used + 65536 or self.journal_length > max(256, 2 * len(self.index)):
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the data file with only the grids of the current seeds.
+        """
+        with open(self.data_path, "rb") as data_file:
+            def entries():
+                for name in list(self.index):
+                    data_file.seek(self.index[name]["offset"])
+                    yield name, self.index[name], data_file.read(self.index[name]["length"])
+            self.rewrite(entries())
+
+    def __getitem__(self, name):
+        """
+        Reads and decodes the grid of a seed.
+        :return: The seed dictionary, with "colors", "rules", "seed" (and "hybrid" and "random" if they were saved).
+        """
+        entry = self.index[name]
+        if "random" in entry:
+            grid = [[0] * entry["size"] for _ in range(entry["size"])]
+            random_fill(grid, **entry["random"])
+        else:
+            with open(self.data_path, "rb") as data_file:
+                data_file.seek(entry["offset"])
+                grid = decode_grid(data_file.read(entry["length"]), entry["size"])
+        seed = {"colors": entry["colors"], "rules": entry["rules"], "seed": grid}
+        for key in ("hybrid", "random"):
+            if key in entry:
+                seed[key] = entry[key]
+        return seed
+
+    def __setitem__(self, name, seed):
+        self.add(name, seed)
+
+    def __delitem__(self, name):
+        del self.index[name]
+        self.log(name)
+        self.compact_if_needed()
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Binary population table: the same data as data.txt (the number of cells of each color at every iteration) stored as
+fixed-width records, so that long runs take less space and can be read by memory mapping the file, without parsing.
+
+File layout:
+- the 8 bytes b"GOLSER1\\n";
+- the length of the header, as a 4 bytes little-endian unsigned integer;
+- the header, a JSON dictionary with the colors, rules, hybridization mode, number of the first iteration and size
+  in bytes of each count, padded with spaces so that the records start at a multiple of 8 bytes;
+- one record per iteration: the count of each color except white, as little-endian unsigned integers.
+The number of records is given by the size of the file, so that the file stays readable if a run is interrupted.
+
+Example: python Series_GoL.py to-text data.gol data.txt
+"""
+import json
+import mmap
+import struct
+import sys
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+magic = b"GOLSER1\n"
+count_formats = {4: "I", 8: "Q"}
+# struct format of the counts for each possible size.
+
+
+class SeriesWriter(object):
+    """
+    Streams the population table of a simulation into a binary file. It can be used in place of PopulationWriter.
+    """
+
+    def __init__(self, path, colors, rules=None, hybridization=False, first_iteration=1, count_size=4,
+                 flush_every=1000, position=None):
+        """
+        Opens the file and writes the header.
+        :param path: Path of the binary table. An existing file is overwritten.
+        :param colors: List of the colors of the simulation (including white, which is not written).
+        :param rules: List of the rules of each color, saved in the header.
+        :param hybridization: Hybridization mode, saved in the header.
+        :param first_iteration: Number of the iteration of the first record.
+        :param count_size: Size of each count in bytes: 4 (up to 4294967295 cells) or 8.
+        :param flush_every: Number of records after which the buffer is written to the disk.
+        :param position: If given, the existing table is continued instead: it is cut at this position (returned by
+        tell), which drops the records written after it, and its header is kept.
+        """
+        self.record = struct.Struct("<" + count_formats[count_size] * (len(colors) - 1))
+        self.flush_every = flush_every
+        self.buffer = []
+        if position is not None:
+            self.series_file = open(path, "r+b")
+            self.series_file.seek(position)
+            self.series_file.truncate()
+            return
+        header = json.dumps({"colors": colors, "rules": rules, "hybrid": hybridization,
+                             "first_iteration": first_iteration, "count_size": count_size}).encode("utf-8")
+        header += b" " * (-(len(magic) + 4 + len(header)) % 8)
+        self.series_file = open(path, "wb")
+        self.series_file.write(magic + struct.pack("<I", len(header)) + header)
+
+    def write(self, iteration, population):
+        """
+        Adds the record of an iteration. Records must be written for consecutive iterations.
+        :param iteration: Number of the iteration (not stored, it is given by the position of the record).
+        :param population: List of the number of cells of each color, index 0 (white) being ignored.
+        """
+        self.buffer.append(self.record.pack(*population[1:]))
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the waiting records to the disk.
+        """
+        if self.buffer:
+            self.series_file.write(b"".join(self.buffer))
+            self.buffer = []
+        self.series_file.flush()
+
+    def tell(self):
+        """
+        :return: The position of the end of the table in the file, from which it can be continued, once the waiting
+        records are written (see flush).
+        """
+        self.flush()
+        return self.series_file.tell()
+
+    def close(self):
+        """
+        Writes the waiting records and closes the file.
+        """
+        if not self.series_file.closed:
+            self.flush()
+            self.series_file.close()
+
+
+class SeriesReader(object):
+    """
+    Memory mapped access to a binary population table.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the binary table.
+        """
+        self.series_file = open(path, "rb")
+        start = self.series_file.read(len(magic) + 4)
+        if start[:len(magic)] != magic:
+            raise ValueError(path + " is not a binary population table")
+        header_length = struct.unpack("<I", start[len(magic):])[0]
+        header = json.loads(self.series_file.read(header_length).decode("utf-8"))
+        self.colors = header["colors"]
+        self.rules = header["rules"]
+        self.hybridization = header["hybrid"]
+        self.first_iteration = header["first_iteration"]
+        self.count_size = header["count_size"]
+        self.offset = len(magic) + 4 + header_length
+        # Position of the first record.
+        self.record = struct.Struct("<" + count_formats[self.count_size] * (len(self.colors) - 1))
+        self.data = mmap.mmap(self.series_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.length = (len(self.data) - self.offset) // self.record.size
+        # Number of complete records. An incomplete last record, left by an interruption, is ignored.
+
+    def __len__(self):
+        return self.length
+
+    def rows(self, start=0, stop=None):
+        """
+        Reads a range of records.
+        :param start: Index of the first record (0 for the first iteration of the file).
+        :param stop: Index following the last record. By default, the end of the file.
+        :return: List of lists of counts, one list per iteration.
+        """
+        if stop is None or stop > self.length:
+            stop = self.length
+        return [list(self.record.unpack_from(self.data, self.offset + index * self.record.size))
+                for index in range(start, stop)]
+
+    def array(self):
+        """
+        :return: A read-only NumPy array of shape (iterations, colors - 1) mapped on the file. Any range of iterations
+        or any color can be sliced from it without reading the rest of the file. Requires NumPy.
+        """
+        return np.frombuffer(self.data, dtype="<u%d" % self.count_size, count=self.length * (len(self.colors) - 1),
+                             offset=self.offset).reshape(self.length, len(self.colors) - 1)
+
+    def close(self):
+        self.data.close()
+        self.series_file.close()
+
+
+def text_to_series(text_path, series_path, rules=None, hybridization=False, count_size=4):
+    """
+    Converts a population table from the text format (data.txt) into the binary format. The text file is read line by
+    line. The color names are those of the header of the text file, in lower case.
+    :param text_path: Path of the text table.
+    :param series_path: Path of the binary table to write.
+    :param rules: Rules saved in the header of the binary table, since the text format does not contain them.
+    :param hybridization: Hybridization mode saved in the header.
+    :param count_size: Size of each count in bytes (4 or 8).
+    """
+    with open(text_path, "r") as text_file:
+        colors = ["white"] + [str.lower(color) for color in text_file.readline().split()[1:]]
+        writer = None
+        for line in text_file:
+            fields = [int(field) for field in line.split()]
+            if not fields:
+                continue
+            if writer is None:
+                writer = SeriesWriter(series_path, colors, rules, hybridization, fields[0], count_size)
+            writer.write(fields[0], [0] + fields[1:])
+        if writer is None:
+            writer = SeriesWriter(series_path, colors, rules, hybridization, 1, count_size)
+        writer.close()
+
+
+def series_to_text(series_path, text_path, chunk=10000):
+    """
+    Converts a binary population table into the text format (data.txt).
+    :param series_path: Path of the binary table.
+    :param text_path: Path of the text table to write.
+    :param chunk: Number of records read at once.
+    """
+    reader = SeriesReader(series_path)
+    with open(text_path, "w") as text_file:
+        text_file.write("Iteration")
+        for color in range(1, len(reader.colors)):
+            text_file.write(" " + str.upper(reader.colors[color].replace(" ", "")))
+        text_file.write("\n")
+        for start in range(0, len(reader), chunk):
+            text_file.write("".join(str(reader.first_iteration + start + k) + " " + " ".join(str(n) for n in row) +
+                                    "\n" for k, row in enumerate(reader.rows(start, start + chunk))))
+    reader.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-text", "to-binary"):
+        sys.exit("usage: python Series_GoL.py to-text|to-binary input output")
+    if sys.argv[1] == "to-text":
+        series_to_text(sys.argv[2], sys.argv[3])
+    else:
+        text_to_series(sys.argv[2], sys.argv[3])
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Common interface to all the engines. A Simulation holds a grid of states and computes its generations with the engine
+chosen by name, so that the interface and the command line runner do not need to know how each engine works.
+"""
+from Engine_GoL import configuration, get_neighbour, process_changes, rule_table
+from Array_GoL import numpy_available, to_array, get_neighbour_array, process_changes_array, array_changes, \
+    array_population
+from Active_GoL import ActiveGrid
+from Hashlife_GoL import Hashlife, hashlife_supported
+from Bitboard_GoL import BitboardGrid
+from Tiled_GoL import TiledGrid
+from Sparse_GoL import SparseGrid, sparse_supported
+from Compact_GoL import CompactGrid
+from Cycle_GoL import CycleDetector
+from Metrics_GoL import clock
+
+engine_names = ["auto", "hashlife-auto", "reference", "array", "active", "hashlife", "bitboard", "tiled", "sparse",
+                "compact"]
+
+
+def grid_changes(before, after):
+    """
+    Lists the cells that differ between two grids of states.
+    :param before: 2D list of the states before.
+    :param after: 2D list of the states after.
+    :return: List of (row, column, new state) tuples.
+    """
+    changes = []
+    for i in range(0, len(after)):
+        if before[i] != after[i]:
+            # Whole rows are compared first, since most rows do not change.
+            for j in range(0, len(after[i])):
+                if before[i][j] != after[i][j]:
+                    changes.append((i, j, after[i][j]))
+    return changes
+
+
+def choose_engine():
+    """
+    Chooses the fastest bounded engine: the array engine if NumPy is installed, otherwise the bitboard engine. Both give
+    the same grids as the reference engine. The Hashlife and sparse engines, which simulate an unbounded plane, are
+    never chosen: they must be asked for by name, or with "hashlife-auto" (see Simulation).
+    :return: The name of the engine.
+    """
+    if numpy_available:
+        return "array"
+    return "bitboard"
+
+
+class Simulation(object):
+    """
+    A grid of states and the engine computing its generations.
+    """
+
+    def __init__(self, grid, hybridization=False, engine="reference", processes=None, track_changes=False,
+                 detect_cycles=False, history=4096, timer=None):
+        """
+        :param grid: 2D list containing the states of the cells. The reference and active engines modify it in place.
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        :param engine: Name of the engine, one of engine_names. "auto" uses choose_engine. "hashlife-auto" switches to
+        Hashlife for single color configurations, whose grids may then differ at the border, and uses choose_engine
+        otherwise. Engines that cannot be used (Hashlife with several colors, array engine without NumPy, sparse engine
+        with a color born without neighbours) fall back to the reference engine. The Hashlife and sparse engines
+        simulate an unbounded plane, of which the grid is a view.
+        :param processes: Number of processes of the tiled engine.
+        :param track_changes: If True, each step lists the cells that changed in the changes attribute, so that a
+        display only needs to redraw those cells.
+        :param detect_cycles: If True, the simulation checks at each generation if the grid repeats an earlier one.
+        The cycle attribute then gives its first generation and its period. This implies track_changes.
+        :param history: Number of generations compared by the cycle detection.
+        :param timer: PhaseTimer to which the time of each phase (neighbour, rules or step, changes, population) is
+        added, or None.
+        """
+        if engine == "hashlife-auto":
+            engine = "hashlife" if hashlife_supported() else "auto"
+        if engine == "auto":
+            engine = choose_engine()
+        if (engine == "hashlife" and not hashlife_supported()) or (engine == "array" and not numpy_available) or \
+                (engine == "sparse" and not sparse_supported()):
+            engine = "reference"
+        if engine not in engine_names:
+            raise ValueError("Unknown engine: " + str(engine))
+        self.engine = engine
+        self.hybridization = hybridization
+        self.size = len(grid)
+        self.generation = 0
+        self.track_changes = track_changes or detect_cycles
+        self.changes = None
+        # List of (row, column, new state) tuples of the cells changed by the last step, if track_changes is True.
+        self.cycles = None
+        # CycleDetector, if detect_cycles is True.
+        self.timer = timer
+        self.history_length = history
+        self.view = (0, 0)
+        # Plane coordinates of the cell shown at grid[0][0], for the sparse engine.
+        if engine == "array":
+            self.state = to_array(grid)
+        elif engine == "active":
+            self.state = ActiveGrid(grid, hybridization)
+        elif engine == "hashlife":
+            self.state = Hashlife(grid)
+        elif engine == "bitboard":
+            self.state = BitboardGrid(grid, hybridization)
+        elif engine == "tiled":
+            self.state = TiledGrid(grid, hybridization, processes)
+        elif engine == "sparse":
+            self.state = SparseGrid(grid, hybridization)
+        elif engine == "compact":
+            self.state = CompactGrid(grid, hybridization)
+        else:
+            self.state = grid
+        if detect_cycles:
+            self.cycles = CycleDetector(grid, history)
+            self.cycles.record(0, self.population())
+
+    def cycle(self):
+        """
+        :return: (first generation, period) of the cycle reached by the grid, or None if no cycle was detected (yet).
+        """
+        if self.cycles is None:
+            return None
+        return self.cycles.cycle
+
+    def step(self, generations=1, hybridization=None):
+        """
+        Computes the next generations.
+        :param generations: Number of generations to compute.
+        :param hybridization: New hybridization mode. If None, the current one is kept.
+        """
+        if hybridization is not None:
+            self.hybridization = hybridization
+        if self.cycles is not None and generations > 1:
+            for _ in range(generations):
+                self.step()
+            return
+            # Cycles are detected generation by generation.
+        timer = self.timer
+        if timer is not None:
+            start = clock()
+        own_changes = generations == 1 and self.engine in ("active", "sparse", "compact")
+        # These engines list the cells changed by a single step themselves, so the grid is not copied before it.
+        if self.track_changes and not own_changes:
+            before = self.snapshot()
+            if timer is not None:
+                start = timer.add("changes", start)
+        if self.engine == "hashlife":
+            if self.state.allowed != rule_table().allowed[1]:
+                self.state = Hashlife(self.to_grid())
+                # The quadtree results are only valid for the rules it was built with.
+            self.state.advance(generations)
+        elif self.engine == "tiled":
+            self.state.step(generations, self.hybridization)
+        else:
+            for _ in range(generations):
+                if self.engine in ("active", "bitboard", "sparse", "compact"):
+                    self.state.step(self.hybridization)
+                    continue
+                if self.engine == "array":
+                    neighbours = get_neighbour_array(self.state)
+                else:
+                    neighbours = get_neighbour(self.state)
+                if timer is not None:
+                    start = timer.add("neighbour", start)
+                if self.engine == "array":
+                    self.state = process_changes_array(neighbours, self.state, self.hybridization)
+                else:
+                    self.state = process_changes(neighbours, self.state, self.hybridization)
+                if timer is not None:
+                    start = timer.add("rules", start)
+        if timer is not None and self.engine not in ("array", "reference"):
+            start = timer.add("step", start)
+            # The other engines compute the neighbours and apply the rules at once.
+        if self.track_changes:
+            if self.engine == "active" and generations == 1:
+                self.changes = self.state.changes
+            elif self.engine == "compact" and generations == 1:
+                self.changes = self.state.changes()
+            elif self.engine == "sparse" and generations == 1:
+                row, column = self.view
+                self.changes = [(i - row, j - column, state) for i, j, state in self.state.changes
+                                if 0 <= i - row < self.size and 0 <= j - column < self.size]
+                # Only the changes inside the view.
+            else:
+                self.changes = self.changes_since(before)
+            if timer is not None:
+                timer.add("changes", start)
+        self.generation += generations
+        if self.cycles is not None:
+            self.cycles.update(self.changes)
+            self.cycles.record(self.generation, self.population())
+
+    def snapshot(self):
+        """
+        Returns a copy of the current generation, in the form used to compute the changes of the next step. The array
+        and bitboard engines create new arrays/planes at each step, so they do not need to be copied.
+        """
+        if self.engine == "array":
+            return self.state
+        if self.engine == "bitboard":
+            return self.state.planes
+        return [list(row) for row in self.to_grid()]
+
+    def changes_since(self, before):
+        """
+        Lists the cells that changed since a snapshot.
+        :param before: Value returned by snapshot.
+        :return: List of (row, column, new state) tuples.
+        """
+        if self.engine == "array":
+            return array_changes(before, self.state)
+        if self.engine == "bitboard":
+            return self.state.changes_since(before)
+        return grid_changes(before, self.to_grid())
+
+    def population(self):
+        """
+        :return: List of the number of cells of each color. Index 0 (empty cells) is always 0.
+        """
+        if self.timer is None:
+            return self.count_population()
+        start = clock()
+        counts = self.count_population()
+        self.timer.add("population", start)
+        return counts
+
+    def count_population(self):
+        """
+        Counts the cells of each color with the fastest method of the engine.
+        :return: List of the number of cells of each color. Index 0 (empty cells) is always 0.
+        """
+        if self.engine in ("active", "bitboard", "tiled", "compact"):
+            return self.state.population()
+            # These engines count the cells while stepping (or from the changes), without scanning the grid again.
+        if self.engine == "sparse":
+            return self.state.population(self.size, self.view)
+        if self.engine == "hashlife":
+            return [0, self.state.population(self.size)]
+            # Only the cells of the grid are counted, as with the other engines, not those that left it.
+        if self.engine == "array":
+            return array_population(self.state, len(configuration["colors"]))
+        counts = [0] * len(configuration["colors"])
+        for row in self.state:
+            for color in range(1, len(configuration["colors"])):
+                counts[color] += row.count(color)
+        return counts
+
+    def to_grid(self):
+        """
+        :return: A 2D list containing the states of the current generation (a GridView behaving like one, for the
+        compact engine).
+        """
+        if self.engine == "array":
+            return self.state.tolist()
+        if self.engine == "active":
+            return self.state.grid
+        if self.engine == "reference":
+            return self.state
+        if self.engine == "hashlife":
+            return self.state.to_grid(self.size)
+        if self.engine == "sparse":
+            return self.state.to_grid(self.size, self.view)
+        return self.state.to_grid()
+
+    def set_view(self, row, column):
+        """
+        Moves the view of the sparse engine on the plane. The cycle detection, which works on the view, starts again.
+        :param row: Plane row shown at grid[0][0].
+        :param column: Plane column shown at grid[0][0].
+        """
+        if self.engine != "sparse":
+            raise ValueError("Only the sparse engine can move its view")
+        self.view = (row, column)
+        if self.cycles is not None:
+            self.cycles = CycleDetector(self.to_grid(), self.history_length)
+            self.cycles.record(self.generation, self.population())
+
+    def set_cell(self, row, column, state):
+        """
+        Changes the state of a cell of the sparse engine between two generations.
+        :param row: Row of the cell in the view.
+        :param column: Column of the cell in the view.
+        :param state: New state.
+        """
+        if self.engine != "sparse":
+            raise ValueError("Only the sparse engine can change a cell between generations")
+        self.state.set(row + self.view[0], column + self.view[1], state)
+        if self.cycles is not None:
+            self.cycles.update([(row, column, state)])
+
+    def plane_cells(self):
+        """
+        :return: List of (row, column, state) tuples of all the live cells of the plane, in plane coordinates, for the
+        Hashlife and sparse engines, whose plane extends beyond the grid. None for the other engines.
+        """
+        if self.engine == "sparse":
+            return [(i, j, state) for (i, j), state in self.state.cells.items()]
+        if self.engine == "hashlife":
+            return [(i, j, 1) for i, j in self.state.cells()]
+        return None
+
+    def restore(self, generation, view=(0, 0), cells=None):
+        """
+        Continues a saved simulation (see Checkpoint_GoL): sets the number of the current generation and, for the
+        Hashlife and sparse engines, the live cells of the whole plane. The cycle detection starts again.
+        :param generation: Number of the current generation.
+        :param view: Plane coordinates of the cell shown at grid[0][0], for the sparse engine.
+        :param cells: List of (row, column, state) tuples of the live cells of the plane, as returned by plane_cells, or
+        None to keep the cells of the grid.
+        """
+        self.generation = generation
+        if cells is not None and self.engine == "sparse":
+            self.view = tuple(view)
+            self.state.set_cells(cells)
+        elif cells is not None and self.engine == "hashlife":
+            self.state.set_cells([(i, j) for i, j, state in cells])
+        if self.cycles is not None:
+            self.cycles = CycleDetector(self.to_grid(), self.history_length)
+            self.cycles.record(self.generation, self.population())
+
+    def close(self):
+        """
+        Releases the resources of the engine (the worker processes of the tiled engine).
+        """
+        if self.engine == "tiled":
+            self.state.close()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Sparse engine: only the live cells are stored, in a dictionary mapping their (row, column) coordinates to their color,
+and the neighbours are only counted around them. The plane is unbounded: cells are not destroyed at the border of the
+grid, and the cost of a generation depends on the number of live cells, not on the size of the grid. The grid of the
+interface is a view on a part of the plane.
+"""
+from Engine_GoL import configuration, rule_sets, rule_table
+
+offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+# Positions of the 8 neighbours of a cell.
+
+
+def sparse_supported(config=configuration):
+    """
+    :param config: Configuration dictionary with "colors" and "rules".
+    :return: True if the rules can be used on an unbounded plane, i.e. if no color is born without neighbours (which
+    would fill the whole plane).
+    """
+    return all(0 not in rule_sets(config["rules"][x])[0] for x in range(1, len(config["colors"])))
+
+
+class SparseGrid(object):
+    """
+    Unbounded plane of live cells.
+    """
+
+    def __init__(self, grid, hybridization=False):
+        """
+        :param grid: 2D list containing the initial states. The cell grid[i][j] is placed at coordinates (i, j).
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        """
+        self.cells = {}
+        # Color of each live cell, by (row, column) coordinates.
+        for i in range(0, len(grid)):
+            for j in range(0, len(grid[i])):
+                if grid[i][j]:
+                    self.cells[(i, j)] = grid[i][j]
+        self.size = len(grid)
+        self.hybridization = hybridization
+        self.changes = []
+        # List of (row, column, new state) tuples of the cells changed by the last step, in plane coordinates.
+        self.counts = [0] * len(configuration["colors"])
+        for color in self.cells.values():
+            self.counts[color] += 1
+        self.table = None
+        self.results = {}
+        # Next state for each (state, neighbour counts) already met, valid as long as the rules do not change.
+
+    def step(self, hybridization=None):
+        """
+        Computes the next generation.
+        :param hybridization: New hybridization mode. If None, the current one is kept.
+        """
+        if hybridization is not None and hybridization != self.hybridization:
+            self.hybridization = hybridization
+            self.results = {}
+        table = rule_table()
+        if table is not self.table:
+            self.table = table
+            self.results = {}
+            self.counts = [0] * len(configuration["colors"])
+            for color in self.cells.values():
+                self.counts[color] += 1
+        n_colors = len(configuration["colors"])
+        cells = self.cells
+        neighbours = {}
+        # Number of neighbours of each color, for every cell next to a live cell.
+        for (i, j), color in cells.items():
+            for di, dj in offsets:
+                key = (i + di, j + dj)
+                counts = neighbours.get(key)
+                if counts is None:
+                    counts = neighbours[key] = [0] * n_colors
+                counts[color] += 1
+        for key in cells:
+            if key not in neighbours:
+                neighbours[key] = [0] * n_colors
+                # Isolated live cells must be evaluated too.
+        new_cells = {}
+        changes = []
+        results = self.results
+        for key, counts in neighbours.items():
+            old = cells.get(key, 0)
+            pattern = (old, tuple(counts))
+            state = results.get(pattern)
+            if state is None:
+                state = results[pattern] = table.next_state(old, counts, self.hybridization)
+            if state:
+                new_cells[key] = state
+            if state != old:
+                changes.append((key[0], key[1], state))
+                self.counts[old] -= 1
+                self.counts[state] += 1
+        self.counts[0] = 0
+        self.cells = new_cells
+        self.changes = changes
+
+    def set(self, row, column, state):
+        """
+        Changes the state of a cell.
+        :param row: Row of the cell in plane coordinates.
+        :param column: Column of the cell in plane coordinates.
+        :param state: New state.
+        """
+        old = self.cells.pop((row, column), 0)
+        if state:
+            self.cells[(row, column)] = state
+        self.counts[old] -= 1
+        self.counts[state] += 1
+        self.counts[0] = 0
+
+    def set_cells(self, cells):
+        """
+        Replaces the live cells of the plane, for example to continue a simulation saved in a checkpoint.
+        :param cells: List of (row, column, state) tuples in plane coordinates.
+        """
+        self.cells = dict(((i, j), state) for i, j, state in cells if state)
+        self.counts = [0] * len(configuration["colors"])
+        for color in self.cells.values():
+            self.counts[color] += 1
+
+    def population(self, size=None, view=(0, 0)):
+        """
+        :param size: Length of the sides of the grid in which the cells are counted, or None to count the whole plane.
+        :param view: Plane coordinates of the first cell of the grid.
+        :return: List of the number of cells of each color. Index 0 is always 0.
+        """
+        if size is None:
+            return list(self.counts)
+        counts = [0] * len(self.counts)
+        for (i, j), color in self.cells.items():
+            if 0 <= i - view[0] < size and 0 <= j - view[1] < size:
+                counts[color] += 1
+        return counts
+
+    def bounds(self):
+        """
+        :return: (first row, first column, last row, last column) of the live cells, or None if there is none.
+        """
+        if not self.cells:
+            return None
+        rows = [key[0] for key in self.cells]
+        columns = [key[1] for key in self.cells]
+        return min(rows), min(columns), max(rows), max(columns)
+
+    def to_grid(self, size=None, view=(0, 0)):
+        """
+        Builds a grid of states showing a part of the plane.
+        :param size: Length of the sides of the grid. By default, the size of the initial grid.
+        :param view: Plane coordinates of the cell shown at grid[0][0].
+        :return: A 2D list of states.
+        """
+        if size is None:
+            size = self.size
+        grid = [[0] * size for _ in range(size)]
+        for (i, j), color in self.cells.items():
+            if 0 <= i - view[0] < size and 0 <= j - view[1] < size:
+                grid[i - view[0]][j - view[1]] = color
+        return grid
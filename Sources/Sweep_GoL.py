@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Rule space sweep: runs every combination of born/lower/upper rules of each color, hybridization modes and seeds in a
+pool of processes, and collects the final and peak population of each color in a single result table.
+
+Example: python Sweep_GoL.py Fighting Fighting2 --born 1-4 --lower 1-3 --upper 2-5 --hybrid both -n 200
+
+Each result is written on its own line as soon as it is known, so an interrupted sweep can be resumed by running the
+same command again: the combinations already in the result table are skipped.
+"""
+import argparse
+import itertools
+import multiprocessing
+import sys
+from os.path import exists, getsize
+from Engine_GoL import configuration
+from Simulation_GoL import Simulation, engine_names
+from Batch_GoL import load_seed
+
+sweep_seeds = {}
+# Seeds used by the worker processes, set once per process by init_worker.
+
+
+def parse_ranges(text):
+    """
+    Parses rule ranges given on the command line.
+    :param text: Comma separated ranges, one per color, such as "1-4,3". A range is either a single value or
+    "first-last". The last range is used for all the following colors.
+    :return: A list of lists of values.
+    """
+    ranges = []
+    for part in text.split(","):
+        bounds = part.split("-")
+        ranges.append(list(range(int(bounds[0]), int(bounds[-1]) + 1)))
+    return ranges
+
+
+def color_rules(born, lower, upper):
+    """
+    :param born: List of possible born values.
+    :param lower: List of possible lower values.
+    :param upper: List of possible upper values.
+    :return: The list of all rule dictionaries of a color for which lower <= upper.
+    """
+    return [{"born": b, "lower": l, "upper": u} for b, l, u in itertools.product(born, lower, upper) if l <= u]
+
+
+def make_jobs(seeds, born, lower, upper, hybrids):
+    """
+    Generates the cartesian product of the seeds, hybridization modes and rules of each color.
+    :param seeds: Dictionary of the seeds to use, by name.
+    :param born: List of born ranges (one per color, the last one repeats), as returned by parse_ranges.
+    :param lower: List of lower ranges.
+    :param upper: List of upper ranges.
+    :param hybrids: List of hybridization modes.
+    :return: Iterator of (seed name, hybridization, rules) tuples. The rules contain one dictionary per color, the rule
+    of color 0 being that of the seed.
+    """
+    for name in sorted(seeds):
+        n_colors = len(seeds[name]["colors"])
+        choices = []
+        for x in range(1, n_colors):
+            choices.append(color_rules(born[min(x - 1, len(born) - 1)], lower[min(x - 1, len(lower) - 1)],
+                                       upper[min(x - 1, len(upper) - 1)]))
+        for hybridization in hybrids:
+            for rules in itertools.product(*choices):
+                yield name, hybridization, [seeds[name]["rules"][0]] + list(rules)
+
+
+def job_key(name, hybridization, rules):
+    """
+    :return: The string identifying a combination in the result table, e.g. "Canon 0 3/2/3,3/2/3".
+    """
+    return "%s %d %s" % (name, int(hybridization), ",".join("%d/%d/%d" % (rule["born"], rule["lower"], rule["upper"])
+                                                           for rule in rules[1:]))
+
+
+def init_worker(seeds):
+    """
+    Initializes a worker process with the seeds, so that they are not sent again with every job.
+    """
+    sweep_seeds.update(seeds)
+
+
+def run_job(job):
+    """
+    Runs one combination of the sweep. Used by the worker processes.
+    :param job: Tuple (seed name, hybridization, rules, number of generations, engine).
+    :return: The line of the result table for this combination.
+    """
+    name, hybridization, rules, generations, engine = job
+    seed = sweep_seeds[name]
+    configuration["colors"] = seed["colors"]
+    configuration["rules"] = rules
+    simulation = Simulation([list(row) for row in seed["seed"]], hybridization, engine)
+    peak = simulation.population()
+    for _ in range(0, generations):
+        simulation.step()
+        peak = [max(a, b) for a, b in zip(peak, simulation.population())]
+    final = simulation.population()
+    simulation.close()
+    return "%s %s %s %s\n" % (job_key(name, hybridization, rules),
+                              ",".join(str.upper(color.replace(" ", "")) for color in seed["colors"][1:]),
+                              ",".join(str(n) for n in final[1:]), ",".join(str(n) for n in peak[1:]))
+
+
+def read_done(output):
+    """
+    Reads the combinations already present in a result table. An incomplete last line, left by an interruption, is
+    removed from the file.
+    :param output: Path of the result table.
+    :return: The set of keys of the finished combinations.
+    """
+    done = set()
+    if not exists(output):
+        return done
+    with open(output, "r") as result_file:
+        content = result_file.read()
+    if content and not content.endswith("\n"):
+        content = content[:content.rfind("\n") + 1]
+        with open(output, "w") as result_file:
+            result_file.write(content)
+    for line in content.splitlines()[1:]:
+        fields = line.split()
+        done.add(" ".join(fields[0:3]))
+    return done
+
+
+def sweep(seeds, born, lower, upper, hybrids, generations, output, engine="auto", processes=None):
+    """
+    Runs the sweep and appends the results to the result table.
+    :param seeds: Dictionary of the seeds to use, by name.
+    :param born: List of born ranges, as returned by parse_ranges.
+    :param lower: List of lower ranges.
+    :param upper: List of upper ranges.
+    :param hybrids: List of hybridization modes.
+    :param generations: Number of generations of each simulation.
+    :param output: Path of the result table.
+    :param engine: Name of the engine. By default, the fastest bounded engine (see Simulation_GoL.choose_engine), so
+    that the populations are counted on the grid as with the reference engine; the Hashlife and sparse engines are only
+    used when asked for. The tiled engine cannot be used, since the workers cannot start processes.
+    :param processes: Number of worker processes. By default, the number of CPUs.
+    :return: The number of combinations run.
+    """
+    done = read_done(output)
+    new_table = not exists(output) or not getsize(output)
+    jobs = [(name, hybridization, rules, generations, engine)
+            for name, hybridization, rules in make_jobs(seeds, born, lower, upper, hybrids)
+            if job_key(name, hybridization, rules) not in done]
+    with open(output, "a") as result_file:
+        if new_table:
+            result_file.write("Seed Hybrid Rules Colors Final Peak\n")
+        pool = multiprocessing.Pool(processes, init_worker, (seeds,))
+        try:
+            for n, line in enumerate(pool.imap_unordered(run_job, jobs, chunksize=4)):
+                result_file.write(line)
+                result_file.flush()
+                # Each result is saved immediately, which makes the sweep resumable.
+                sys.stderr.write("\r%d/%d" % (n + 1, len(jobs)))
+            sys.stderr.write("\n")
+        finally:
+            pool.terminate()
+            pool.join()
+    return len(jobs)
+
+
+def main(argv=None):
+    """
+    Entry point of the sweep runner.
+    :param argv: List of the command line arguments. By default, sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Runs a Game of Life simulation for every combination of rules.")
+    parser.add_argument("seeds", nargs="+", help="Names of the seeds in the seed library or the file of seeds.")
+    parser.add_argument("-s", "--seeds-file",
+                        help="File of seeds (default: the seed library of the current directory).")
+    parser.add_argument("--born", default="3", help="Born ranges, e.g. 1-4 or 1-4,3 for different colors.")
+    parser.add_argument("--lower", default="2", help="Lower ranges.")
+    parser.add_argument("--upper", default="3", help="Upper ranges.")
+    parser.add_argument("--hybrid", choices=["off", "on", "both"], default="off", help="Hybridization modes.")
+    parser.add_argument("-n", "--generations", type=int, default=400, help="Number of generations (default: 400).")
+    parser.add_argument("-o", "--output", default="sweep.txt", help="Result table (default: sweep.txt).")
+    parser.add_argument("-e", "--engine", choices=[name for name in engine_names if name != "tiled"], default="auto",
+                        help="Engine (default: auto, the fastest engine giving the same grids as the reference "
+                             "engine; hashlife and sparse are only used when asked for).")
+    parser.add_argument("-p", "--processes", type=int, help="Number of processes (default: number of CPUs).")
+    args = parser.parse_args(argv)
+    try:
+        seeds = dict((name, load_seed(name, args.seeds_file)) for name in args.seeds)
+        born, lower, upper = parse_ranges(args.born), parse_ranges(args.lower), parse_ranges(args.upper)
+    except (IOError, KeyError, ValueError, SyntaxError) as error:
+        parser.error(str(error))
+    hybrids = {"off": [False], "on": [True], "both": [False, True]}[args.hybrid]
+    sweep(seeds, born, lower, upper, hybrids, args.generations, args.output, args.engine, args.processes)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-process engine for very large grids. The grid is split into strips of rows, each one computed by its own
+process. The grid is stored twice in shared memory: at each generation the processes read the current grid and write
+the next one into the other buffer, then wait for each other before swapping. The rows just above and below a strip
+(its halo) are read from the shared grid once every process has finished the previous generation.
+"""
+import multiprocessing
+from Engine_GoL import configuration, rule_table
+
+
+def step_rows(source, target, size, start, stop, hybridization):
+    """
+    Computes the next generation of the rows start to stop-1 of a grid stored as a flat shared array.
+    :param source: Flat array of size*size states of the current generation.
+    :param target: Flat array in which the states of the next generation are written.
+    :param size: The length of the grid's sides.
+    :param start: First row of the strip.
+    :param stop: Row following the last row of the strip.
+    :param hybridization: Boolean defining if the colors hybridize or compete.
+    :return: List of the number of cells of each color in the new rows.
+    """
+    rows = [[0] * (size + 2)]
+    for x in range(start - 1, stop + 1):
+        if 0 <= x < size:
+            rows.append([0] + source[x * size:(x + 1) * size] + [0])
+        else:
+            rows.append([0] * (size + 2))
+    # Local copy of the strip and its halo, surrounded by dead cells so that the borders need no special case.
+    n_colors = len(configuration["colors"])
+    table = rule_table()
+    # Compiled again in the worker process when the configuration it receives changes.
+    population = [0] * n_colors
+    for i in range(start, stop):
+        above, row, below = rows[i - start + 1], rows[i - start + 2], rows[i - start + 3]
+        for j in range(1, size + 1):
+            counts = [0] * n_colors
+            for state in (above[j - 1], above[j], above[j + 1], row[j - 1], row[j + 1],
+                          below[j - 1], below[j], below[j + 1]):
+                if state:
+                    counts[state] += 1
+            new_state = table.next_state(row[j], counts, hybridization)
+            target[i * size + j - 1] = new_state
+            population[new_state] += 1
+    return population
+
+
+def tile_worker(buffers, size, start, stop, barrier, connection):
+    """
+    Main loop of a worker process. It waits for commands from the TiledGrid on its connection; a command is a tuple
+    (current buffer, number of generations, colors, rules, hybridization) and None stops the worker. The answer is
+    the index of the buffer holding the last generation and the population of the strip in that generation.
+    """
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        current, generations, configuration["colors"], configuration["rules"], hybridization = message
+        # The configuration is sent with every command, since the worker has its own copy of the module.
+        for _ in range(generations):
+            population = step_rows(buffers[current], buffers[1 - current], size, start, stop, hybridization)
+            barrier.wait()
+            # No process starts the next generation before all the strips (and halos) of this one are written.
+            current = 1 - current
+        connection.send((current, population))
+    connection.close()
+
+
+class TiledGrid(object):
+    """
+    Grid of states stepped by a pool of processes, each one owning a strip of rows.
+    """
+
+    def __init__(self, grid, hybridization=False, processes=None):
+        """
+        :param grid: 2D list containing the states of the cells.
+        :param hybridization: Boolean defining if the colors hybridize or compete.
+        :param processes: Number of worker processes. By default, the number of CPUs.
+        """
+        self.size = len(grid)
+        self.hybridization = hybridization
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        processes = max(1, min(processes, self.size))
+        self.buffers = [multiprocessing.RawArray("B", self.size * self.size) for _ in range(2)]
+        for i in range(0, self.size):
+            self.buffers[0][i * self.size:(i + 1) * self.size] = grid[i]
+        self.current = 0
+        # Index of the buffer holding the current generation.
+        self.counts = [0] * len(configuration["colors"])
+        for row in grid:
+            for color in range(1, len(configuration["colors"])):
+                self.counts[color] += row.count(color)
+        # Number of cells of each color, summed from the counts sent back by the workers after each step.
+        self.barrier = multiprocessing.Barrier(processes)
+        # Kept on the object, since the workers may only attach to it after the constructor returns.
+        self.workers = []
+        for k in range(0, processes):
+            start = k * self.size // processes
+            stop = (k + 1) * self.size // processes
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=tile_worker, args=(self.buffers, self.size, start, stop,
+                                                                       self.barrier, worker_connection))
+            worker.daemon = True
+            worker.start()
+            worker_connection.close()
+            # The worker has its own copy of its end of the pipe. Once the copy of this process is closed, a worker
+            # that dies closes the pipe, and recv raises EOFError instead of waiting forever.
+            self.workers.append((worker, connection))
+
+    def step(self, generations=1, hybridization=None):
+        """
+        Computes the next generations.
+        :param generations: Number of generations to compute before returning.
+        :param hybridization: New hybridization mode. If None, the current one is kept.
+        """
+        if hybridization is not None:
+            self.hybridization = hybridization
+        if generations < 1:
+            return
+        for worker, connection in self.workers:
+            connection.send((self.current, generations, configuration["colors"], configuration["rules"],
+                             self.hybridization))
+        self.counts = [0] * len(configuration["colors"])
+        for worker, connection in self.workers:
+            self.current, population = connection.recv()
+            for color in range(1, len(population)):
+                self.counts[color] += population[color]
+
+    def population(self):
+        """
+        :return: List of the number of cells of each color (index 0 is left to 0).
+        """
+        return list(self.counts)
+
+    def to_grid(self):
+        """
+        :return: A 2D list containing the states of the current generation.
+        """
+        buffer = self.buffers[self.current]
+        return [buffer[i * self.size:(i + 1) * self.size] for i in range(0, self.size)]
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        for worker, connection in self.workers:
+            connection.send(None)
+            connection.close()
+        for worker, connection in self.workers:
+            worker.join()
+        self.workers = []
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Viewport of the canvas: the part of the grid that is shown, and the zoom. The canvas has a bounded size, whatever the
+size of the grid, and only the cells inside it are drawn. The zoom goes from several pixels per cell down to several
+cells per pixel; below one pixel per cell, each pixel shows a block of cells, with the dominant state of the block or
+the density of its live cells. The blocks are counted for the whole canvas at once (with NumPy if it is installed),
+instead of cell by cell.
+
+As in the rest of the interface, the first index of the grid is the horizontal axis of the canvas: the cell
+grid[i][j] is drawn at x = i, y = j (in cells). The image of the canvas is built at one pixel per unit (a cell, or a
+block of cells when zoomed out), then enlarged when there are several pixels per cell.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+levels = [(16, 1), (10, 1), (8, 1), (5, 1), (4, 1), (3, 1), (2, 1), (1, 1), (1, 2), (1, 3), (1, 4), (1, 6), (1, 8),
+          (1, 12), (1, 16), (1, 24), (1, 32), (1, 64)]
+# Zoom levels, from the closest to the farthest, as (pixels per cell, cells per pixel) pairs.
+modes = ["dominant", "density"]
+# "dominant": each pixel of a block shows its most frequent state (white included). "density": each pixel shows the
+# most frequent live color of its block, paler as the block is emptier.
+shades = 8
+# Number of shades of each color in the density mode.
+
+
+def blend(code, fraction):
+    """
+    :param code: "#rrggbb" code of a color.
+    :param fraction: Weight of the color, between 0 (white) and 1 (the color itself).
+    :return: The "#rrggbb" code of the color mixed with white.
+    """
+    channels = [int(code[k:k + 2], 16) for k in (1, 3, 5)]
+    return "#%02x%02x%02x" % tuple(int(round(255 - (255 - value) * fraction)) for value in channels)
+
+
+class Viewport(object):
+    """
+    Part of a square grid shown on the canvas, and the zoom.
+    """
+
+    def __init__(self, size, max_pixels=800, pixels=10):
+        """
+        :param size: Length of the sides of the grid.
+        :param max_pixels: Maximum length of the sides of the canvas, in pixels.
+        :param pixels: Preferred number of pixels per cell. If the grid does not fit in the canvas with it, the view
+        starts zoomed out to show the whole grid.
+        """
+        self.size = size
+        self.extent = max(min(pixels * size, max_pixels), 1)
+        # Length of the sides of the canvas, in pixels. Small grids keep their former canvas of 10 pixels per cell.
+        self.origin = [0, 0]
+        # Coordinates of the cell shown at the top left corner of the canvas.
+        self.mode = "dominant"
+        self.palettes = {}
+        # Palettes of the density mode, by codes of the states.
+        self.level = levels.index((pixels, 1)) if (pixels, 1) in levels else 0
+        if self.shown() < size:
+            self.fit()
+
+    @property
+    def pixels(self):
+        """
+        Number of pixels per cell (1 when zoomed out).
+        """
+        return levels[self.level][0]
+
+    @property
+    def block(self):
+        """
+        Number of cells per pixel (1 when zoomed in).
+        """
+        return levels[self.level][1]
+
+    def shown(self):
+        """
+        :return: Number of cells shown along a side of the canvas, including the last one if it is only partly shown.
+        """
+        return -(-self.extent * self.block // self.pixels)
+
+    def fit(self):
+        """
+        Zooms out enough to show the whole grid, and moves the view to its top left corner.
+        """
+        self.level = 0
+        while self.shown() < self.size and self.level < len(levels) - 1:
+            self.level += 1
+        self.origin = [0, 0]
+
+    def clamp(self):
+        """
+        Keeps the view on the grid.
+        """
+        limit = max(self.size - self.shown(), 0)
+        self.origin = [min(max(value, 0), limit) for value in self.origin]
+
+    def visible(self):
+        """
+        :return: (first row, first column, end row, end column) of the cells shown, the ends being excluded.
+        """
+        shown = self.shown()
+        return (self.origin[0], self.origin[1], min(self.origin[0] + shown, self.size),
+                min(self.origin[1] + shown, self.size))
+
+    def units(self):
+        """
+        :return: (horizontal, vertical) number of units (cells or blocks of cells) shown, one pixel of the image each.
+        """
+        first_i, first_j, end_i, end_j = self.visible()
+        block = self.block
+        return -(-(end_i - first_i) // block), -(-(end_j - first_j) // block)
+
+    def cell_at(self, x, y):
+        """
+        Maps a point of the canvas to a cell of the grid. When zoomed out, it is the top left cell of the block.
+        :param x: Horizontal coordinate, in pixels.
+        :param y: Vertical coordinate, in pixels.
+        :return: (row, column) of the cell, or None if there is no cell at this point.
+        """
+        if not (0 <= x < self.extent and 0 <= y < self.extent):
+            return None
+        row = self.origin[0] + int(x) // self.pixels * self.block
+        column = self.origin[1] + int(y) // self.pixels * self.block
+        if row >= self.size or column >= self.size:
+            return None
+        return row, column
+
+    def cell_box(self, row, column):
+        """
+        :param row: Row of a cell.
+        :param column: Column of a cell.
+        :return: (x0, y0, x1, y1) rectangle of pixels showing the cell (or its block), or None if it is not shown.
+        """
+        first_i, first_j, end_i, end_j = self.visible()
+        if not (first_i <= row < end_i and first_j <= column < end_j):
+            return None
+        pixels = self.pixels
+        x = (row - first_i) // self.block * pixels
+        y = (column - first_j) // self.block * pixels
+        return x, y, min(x + pixels, self.extent), min(y + pixels, self.extent)
+
+    def zoom(self, steps, x=None, y=None):
+        """
+        Zooms in or out, keeping the cell under a point of the canvas in place.
+        :param steps: Number of levels to zoom in (positive) or out (negative).
+        :param x: Horizontal coordinate of the point, in pixels. By default, the centre of the canvas.
+        :param y: Vertical coordinate of the point, in pixels.
+        :return: True if the zoom changed.
+        """
+        level = min(max(self.level - steps, 0), len(levels) - 1)
+        if level == self.level:
+            return False
+        if x is None or y is None:
+            x = y = self.extent // 2
+        anchor = [self.origin[0] + x * self.block // self.pixels, self.origin[1] + y * self.block // self.pixels]
+        self.level = level
+        self.origin = [anchor[0] - x * self.block // self.pixels, anchor[1] - y * self.block // self.pixels]
+        self.clamp()
+        return True
+
+    def pan(self, rows, columns):
+        """
+        Moves the view.
+        :param rows: Number of cells to move right (negative to move left).
+        :param columns: Number of cells to move down (negative to move up).
+        :return: True if the view moved.
+        """
+        old = list(self.origin)
+        self.origin = [self.origin[0] + rows, self.origin[1] + columns]
+        self.clamp()
+        return self.origin != old
+
+    def pan_pixels(self, dx, dy):
+        """
+        Moves the view by a number of pixels, as when the canvas is dragged.
+        :return: True if the view moved.
+        """
+        return self.pan(dx * self.block // self.pixels, dy * self.block // self.pixels)
+
+    def palette(self, codes):
+        """
+        :param codes: "#rrggbb" codes of the states.
+        :return: The codes of the units in the density mode: palette[state * (shades + 1) + shade], shade 0 being
+        white.
+        """
+        key = tuple(codes)
+        if key not in self.palettes:
+            self.palettes[key] = [blend(code, shade / float(shades)) for code in codes
+                                  for shade in range(0, shades + 1)]
+        return self.palettes[key]
+
+    def unit_index(self, counts):
+        """
+        :param counts: Number of cells of each state in a block, index 0 counting the parts of the block outside of
+        the grid as white.
+        :return: Index of the color of the block: a state in the dominant mode, an index of palette in the density
+        mode. Ties go to the highest state.
+        """
+        if self.mode == "dominant":
+            return max(range(0, len(counts)), key=lambda x: (counts[x], x))
+        area = self.block * self.block
+        live = area - counts[0]
+        if not live:
+            return 0
+        color = max(range(1, len(counts)), key=lambda x: (counts[x], x))
+        return color * (shades + 1) + -(-live * shades // area)
+
+    def block_indices(self, grid, n_colors):
+        """
+        Computes the color of every block shown at once.
+        :param grid: 2D list of states.
+        :param n_colors: Number of states.
+        :return: indices[v][u], the index of the color (see unit_index) of the block u, v (in units), i.e. the rows of
+        the image.
+        """
+        first_i, first_j, end_i, end_j = self.visible()
+        block = self.block
+        area = block * block
+        units_i, units_j = self.units()
+        if np is not None:
+            region = np.zeros((units_i * block, units_j * block), dtype=np.uint8)
+            region[0:end_i - first_i, 0:end_j - first_j] = np.frombuffer(
+                b"".join([bytes(bytearray(row[first_j:end_j])) for row in grid[first_i:end_i]]),
+                dtype=np.uint8).reshape(end_i - first_i, end_j - first_j)
+            # Converting the rows to bytes first is much faster than letting NumPy read the lists.
+            blocks = region.reshape(units_i, block, units_j, block)
+            counts = np.array([(blocks == x).sum(axis=(1, 3)) for x in range(0, n_colors)], dtype=np.int64)
+            counts[0] = area - counts[1:].sum(axis=0)
+            # The parts of the border blocks outside of the grid count as white, as in unit_index.
+            if self.mode == "dominant":
+                indices = n_colors - 1 - np.argmax(counts[::-1], axis=0)
+            else:
+                live = area - counts[0]
+                color = n_colors - 1 - np.argmax(counts[:0:-1], axis=0)
+                indices = np.where(live > 0, color * (shades + 1) + (live * shades + area - 1) // area, 0)
+            return indices.T.tolist()
+        counts = [[[0] * n_colors for _ in range(0, units_i)] for _ in range(0, units_j)]
+        for i in range(first_i, end_i):
+            u = (i - first_i) // block
+            for j, state in enumerate(grid[i][first_j:end_j]):
+                counts[j // block][u][state] += 1
+        for line in counts:
+            for cell_counts in line:
+                cell_counts[0] = area - sum(cell_counts[1:])
+        return [[self.unit_index(cell_counts) for cell_counts in line] for line in counts]
+
+    def image_rows(self, grid, codes):
+        """
+        Builds the image of the units shown, at one pixel per unit.
+        :param grid: 2D list of states.
+        :param codes: "#rrggbb" codes of the states.
+        :return: List of the rows of the image, each written "{#rrggbb #rrggbb ...}" as expected by PhotoImage.put.
+        """
+        first_i, first_j, end_i, end_j = self.visible()
+        if end_i <= first_i or end_j <= first_j:
+            return []
+        if self.block == 1:
+            lines = zip(*[row[first_j:end_j] for row in grid[first_i:end_i]])
+            # The rows of the image are the columns of the grid.
+            colors = codes
+        else:
+            lines = self.block_indices(grid, len(codes))
+            colors = codes if self.mode == "dominant" else self.palette(codes)
+        return ["{" + " ".join([colors[index] for index in line]) + "}" for line in lines]
+
+    def unit_code(self, grid, row, column, codes):
+        """
+        Computes the color of the unit showing a cell, to redraw it after the cell changed.
+        :param grid: 2D list of states.
+        :param row: Row of the cell.
+        :param column: Column of the cell.
+        :param codes: "#rrggbb" codes of the states.
+        :return: The "#rrggbb" code of the unit.
+        """
+        block = self.block
+        if block == 1:
+            return codes[grid[row][column]]
+        first_i, first_j = self.origin
+        start_i = first_i + (row - first_i) // block * block
+        start_j = first_j + (column - first_j) // block * block
+        counts = [0] * len(codes)
+        for i in range(start_i, min(start_i + block, self.size)):
+            for state in grid[i][start_j:min(start_j + block, self.size)]:
+                counts[state] += 1
+        counts[0] = block * block - sum(counts[1:])
+        colors = codes if self.mode == "dominant" else self.palette(codes)
+        return colors[self.unit_index(counts)]
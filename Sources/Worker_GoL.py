@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Background simulation: a thread computes the generations, writes the population table and the history, and puts the
+changes of each generation in a bounded queue of frames. The interface only takes the frames and draws them, so it
+stays responsive during slow generations. When the engine is faster than the display, all the frames waiting in the
+queue are merged and drawn at once, so the intermediate frames are skipped, while every generation is still written in
+the population table. When the queue is full, the thread waits for the interface to catch up.
+"""
+import threading
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+from Simulation_GoL import Simulation
+from Metrics_GoL import clock
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Thread running a simulation. Stop it with stop(); it ends at the end of the generation being computed.
+    """
+
+    def __init__(self, grid, generations, hybridization=False, engine="reference", delay=0.0, population_log=None,
+                 history=None, stop_on_cycle=False, timer=None, max_frames=8, simulation=None, exporter=None):
+        """
+        :param grid: 2D list containing the states of the first generation. It is not modified.
+        :param generations: Number of generations to compute.
+        :param hybridization: Hybridization mode. The hybridization attribute can be changed while the thread runs.
+        :param engine: Name of the engine.
+        :param delay: Minimum time between two generations, in seconds.
+        :param population_log: PopulationWriter or SeriesWriter receiving the population of every generation. It is
+        closed when the thread ends.
+        :param history: History receiving every generation, or None.
+        :param stop_on_cycle: If True, the thread ends when the grid comes back to an earlier generation.
+        :param timer: PhaseTimer measuring the phases of the generations, or None.
+        :param max_frames: Number of frames the thread can compute ahead of the display.
+        :param simulation: Simulation to continue (created with detect_cycles=True), for example the plane of the sparse
+        engine kept from the previous simulation. If None, a new one is created from grid and engine.
+        :param exporter: FrameExporter receiving the grid of every generation, from the first one, or None. It is
+        closed when the thread ends.
+        """
+        threading.Thread.__init__(self)
+        self.daemon = True
+        if simulation is None:
+            simulation = Simulation([list(row) for row in grid], hybridization, engine, track_changes=True,
+                                    detect_cycles=True)
+        simulation.timer = timer
+        self.simulation = simulation
+        self.first = simulation.generation
+        # Generation of the simulation when the thread starts. Frames and tables count generations from there.
+        self.generations = generations
+        self.hybridization = hybridization
+        self.delay = delay
+        self.population_log = population_log
+        self.history = history
+        self.stop_on_cycle = stop_on_cycle
+        self.exporter = exporter
+        self.frames = queue.Queue(max_frames)
+        # Each frame is a (generation, list of (row, column, new state) tuples, cycle, grid) tuple. The grid is None,
+        # unless the view was moved: the frame then contains the whole grid instead of the changes.
+        self.view = None
+        # New view requested by the interface, applied between two generations.
+        self.stop_event = threading.Event()
+        self.error = None
+        # Exception that ended the thread, if any.
+
+    def run(self):
+        simulation = self.simulation
+        try:
+            if self.exporter is not None:
+                self.exporter.add(0, simulation.to_grid())
+            while simulation.generation - self.first < self.generations and not self.stop_event.is_set():
+                start = clock()
+                population = simulation.population()
+                phase_start = clock()
+                if self.population_log is not None:
+                    self.population_log.write(simulation.generation - self.first + 1, population)
+                    # The line of iteration n contains the population before the n-th generation, as in data.txt.
+                if simulation.timer is not None:
+                    simulation.timer.add("log", phase_start)
+                simulation.step(1, self.hybridization)
+                changes = simulation.changes
+                grid = None
+                view, self.view = self.view, None
+                if view is not None:
+                    simulation.set_view(view[0], view[1])
+                    changes = None
+                    grid = simulation.to_grid()
+                    # The history stores a full copy of the grid when the view moves.
+                generation = simulation.generation - self.first
+                phase_start = clock()
+                if self.history is not None:
+                    self.history.add(generation, changes, simulation.to_grid)
+                if simulation.timer is not None:
+                    phase_start = simulation.timer.add("history", phase_start)
+                if self.exporter is not None:
+                    self.exporter.add(generation, simulation.to_grid())
+                    # Only copies the grid: the frame is drawn and written by the process of the exporter.
+                    if simulation.timer is not None:
+                        simulation.timer.add("export", phase_start)
+                if simulation.timer is not None:
+                    simulation.timer.tick(generation)
+                cycle = simulation.cycle()
+                if cycle is not None:
+                    cycle = (max(cycle[0] - self.first, 0), cycle[1])
+                self.put((generation, changes, cycle, grid))
+                if self.stop_on_cycle and simulation.cycle() is not None:
+                    break
+                self.stop_event.wait(max(0.0, self.delay - (clock() - start)))
+                # Returns at once if the delay has already passed, or as soon as the thread is stopped.
+        except Exception as error:
+            self.error = error
+        finally:
+            if self.population_log is not None:
+                self.population_log.close()
+            if self.exporter is not None:
+                try:
+                    self.exporter.close()
+                except IOError as error:
+                    self.error = error
+            simulation.close()
+
+    def put(self, frame):
+        """
+        Adds a frame to the queue, waiting while it is full unless the thread is stopped.
+        """
+        while not self.stop_event.is_set():
+            try:
+                self.frames.put(frame, timeout=0.05)
+                return
+            except queue.Full:
+                continue
+
+    def take(self):
+        """
+        Takes all the frames waiting in the queue and merges them.
+        :return: (last generation, list of (row, column, new state) tuples of the cells that changed since the last
+        frame taken, cycle, None) or None if no frame is waiting. If the view was moved, the list of changes is None
+        and the last item is the whole grid.
+        """
+        merged = {}
+        grid = None
+        frame = None
+        while True:
+            try:
+                frame = self.frames.get_nowait()
+            except queue.Empty:
+                break
+            if frame[3] is not None:
+                grid = frame[3]
+                merged = {}
+            else:
+                for i, j, state in frame[1]:
+                    merged[(i, j)] = state
+        if frame is None:
+            return None
+        if grid is not None:
+            for (i, j), state in merged.items():
+                grid[i][j] = state
+            return frame[0], None, frame[2], grid
+        return frame[0], [(i, j, merged[(i, j)]) for i, j in merged], frame[2], None
+
+    def stop(self):
+        """
+        Asks the thread to end after the generation being computed. No frame is added after this call.
+        """
+        self.stop_event.set()
+
+    def move_view(self, row, column):
+        """
+        Asks the thread to move the view of the sparse engine after the generation being computed.
+        """
+        self.view = (row, column)
+
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def finished(self):
+        """
+        :return: True if the thread has ended and all its frames have been taken.
+        """
+        return not self.is_alive() and self.frames.empty()